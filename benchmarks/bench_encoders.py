@@ -0,0 +1,118 @@
+"""
+
+    Encoder benchmark.
+
+    Saves the same scene with every ``Gif`` converter, into memory.
+    Converters that need programs which aren't installed are skipped.
+
+    The ``encode-`` cases render the frames up front, and only time
+    turning them into a GIF, to compare the encoders on their own.
+
+    Usage: python benchmarks/bench_encoders.py [size] [fps]
+
+"""
+
+import sys
+import shutil
+
+from io import BytesIO
+from common import measure
+from bench_scenes import twisting_rects
+
+from glc import Gif
+from glc.config import IMAGEMAGICK_BINARY, FFMPEG_BINARY
+
+
+# converter, extra options, programs it needs
+CONVERTERS = (
+    ("native", {}, ()),
+    ("native", {"global_palette": True}, ()),
+    ("imageio", {}, ()),
+    ("imageio", {"global_palette": True}, ()),
+    ("imagemagick", {}, (IMAGEMAGICK_BINARY, FFMPEG_BINARY)),
+    ("imagemagick_tempfiles", {}, (IMAGEMAGICK_BINARY,))
+)
+
+# converters that can be handed frames that are already rendered
+ENCODERS = ("native", "imageio")
+
+
+def available(programs):
+    return all(shutil.which(program) for program in programs)
+
+
+def case_name(converter, options):
+    if options.get("global_palette"):
+        return converter + "+palette"
+    return converter
+
+
+def make_gif(converter, options, size, fps):
+    gif = Gif(BytesIO(), width=size, height=size, fps=fps, duration=1, converter=converter, **options)
+    twisting_rects(gif)
+    return gif
+
+
+def setup_case(converter, options, size, fps):
+    gif = make_gif(converter, options, size, fps)
+
+    def run():
+        # a fresh file every time, so runs don't pile up
+        gif.filename = BytesIO()
+        gif.save()
+
+    return run, len(gif.frame_times()), "frames"
+
+
+def setup_encode_case(converter, size, fps):
+    gif = make_gif(converter, {}, size, fps)
+    frames = gif.render()
+    save = getattr(gif, "save_with_" + converter)
+
+    def run():
+        save(iter(frames))
+
+    return run, len(frames), "frames"
+
+
+def cases(quick=False):
+    size = 200 if quick else 400
+    fps = 10 if quick else 30
+    found = []
+
+    for converter, options, programs in CONVERTERS:
+        if not available(programs):
+            continue
+
+        def setup(converter=converter, options=options):
+            return setup_case(converter, options, size, fps)
+
+        found.append(("{}/{}".format(case_name(converter, options), size), setup))
+
+    for converter in ENCODERS:
+        def setup(converter=converter):
+            return setup_encode_case(converter, size, fps)
+
+        found.append(("encode-{}/{}".format(converter, size), setup))
+
+    return found
+
+
+def main(size=400, fps=30):
+    for converter, options, programs in CONVERTERS:
+        name = case_name(converter, options)
+
+        if not available(programs):
+            print("{:<24} skipped, needs {}".format(name, ", ".join(programs)))
+            continue
+
+        result = measure(lambda: setup_case(converter, options, size, fps), repeat=1)
+        print("{:<24} {:>10.1f} frames/s".format(name, result["rate"]))
+
+    for converter in ENCODERS:
+        result = measure(lambda: setup_encode_case(converter, size, fps), repeat=1)
+        print("{:<24} {:>10.1f} frames/s".format("encode-" + converter, result["rate"]))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
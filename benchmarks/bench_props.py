@@ -0,0 +1,109 @@
+"""
+
+    Property evaluation benchmark.
+
+    Compares reading shape properties through the plain
+    ``glc.value_parser.get_*`` functions (which check the type
+    and parse the value on every call) against the compiled
+    evaluators that shapes use.
+
+    No drawing happens here, so this only measures the
+    cost of property evaluation itself.
+
+    Usage: python benchmarks/bench_props.py [shape_count] [frame_count]
+
+"""
+
+import sys
+import time
+
+from glc import value_parser
+from glc.color import Color
+from glc.shapes import Circle
+
+
+def make_shapes(count):
+    shapes = []
+
+    for i in range(count):
+        shapes.append(Circle(
+            x=i % 500,
+            y=[0, 500],
+            radius="25",
+            start=[0, 90, 180],
+            end=lambda t: 360 * t,
+            fill=["red", "#00ff00", 0xff0000ff],
+            stroke=Color(0, 0, 0, 1),
+            centered="yes"
+        ))
+
+    for shape in shapes:
+        shape.compile()
+
+    return shapes
+
+
+def read_parsed(shape, t):
+    props = shape.props
+    value_parser.get_number(props.get("x"), t, 100)
+    value_parser.get_number(props.get("y"), t, 100)
+    value_parser.get_number(props.get("radius"), t, 50)
+    value_parser.get_number(props.get("start"), t, 0)
+    value_parser.get_number(props.get("end"), t, 360)
+    value_parser.get_color(props.get("fill"), t, None)
+    value_parser.get_color(props.get("stroke"), t, None)
+    value_parser.get_bool(props.get("centered"), t, False)
+
+
+def read_compiled(shape, t):
+    shape.get_number("x", t, 100)
+    shape.get_number("y", t, 100)
+    shape.get_number("radius", t, 50)
+    shape.get_number("start", t, 0)
+    shape.get_number("end", t, 360)
+    shape.get_color("fill", t, None)
+    shape.get_color("stroke", t, None)
+    shape.get_bool("centered", t, False)
+
+
+def bench(func, shapes, frame_count):
+    start = time.perf_counter()
+
+    for frame in range(frame_count):
+        t = frame / frame_count
+        for shape in shapes:
+            func(shape, t)
+
+    return time.perf_counter() - start
+
+
+def cases(quick=False):
+    shape_count = 500 if quick else 5000
+    frame_count = 5 if quick else 30
+    found = []
+
+    for name, func in (("value_parser", read_parsed), ("compiled", read_compiled)):
+        def setup(func=func):
+            shapes = make_shapes(shape_count)
+            # 8 properties per shape per frame
+            return lambda: bench(func, shapes, frame_count), shape_count * frame_count * 8, "props"
+
+        found.append(("{}/{}".format(name, shape_count), setup))
+
+    return found
+
+
+def main(shape_count=5000, frame_count=30):
+    shapes = make_shapes(shape_count)
+
+    parsed = bench(read_parsed, shapes, frame_count)
+    compiled = bench(read_compiled, shapes, frame_count)
+
+    print("{} shapes, {} frames".format(shape_count, frame_count))
+    print("value_parser: {:.3f}s ({:.1f} frames/s)".format(parsed, frame_count / parsed))
+    print("compiled:     {:.3f}s ({:.1f} frames/s)".format(compiled, frame_count / compiled))
+    print("speedup:      {:.2f}x".format(parsed / compiled))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,142 @@
+"""
+
+    Scene benchmark.
+
+    Renders scenes taken from ``examples/`` at a few resolutions,
+    scaled to fit, going through ``Animation.iter_frames`` like
+    the converters do. Nothing is encoded or written out.
+
+    Usage: python benchmarks/bench_scenes.py [size] [fps]
+
+"""
+
+import sys
+
+from math import sin, cos, pi
+from common import consume, measure
+
+from glc import Animation
+from glc.color import Color, hsva, rgba, sinebow
+from glc.utils import rad
+
+
+def cafe_wall(a):
+    a.set_loop().set_ease("linear")
+    l = a.render_list
+    w = a.w // 10
+    h = a.h // 10
+    for y in range(0, a.h, h):
+        for x in range(-w * 2, a.w + w * 2, w + w):
+            l.rect(
+                x=x + w * 0.5 + sin(((y - h) * 2.6 / a.h) * 2 * pi) * 20 + 20,
+                y=y + h * 0.5,
+                w=h, h=h,
+                fill="black", stroke="grey",
+                line_width=2,
+                translation_x=[-w, w]
+            )
+        l.line(x0=0, y0=y, x1=a.w, y1=y, stroke="grey", line_width=2)
+
+
+def twisting_rects(a):
+    l = a.render_list
+    l.rect(x=a.w / 2, y=a.h / 2, w=a.w, h=a.h, fill=rgba(20 / 255, 50 / 255, 10 / 255))
+    res = a.w / 10
+    y = 0
+    while y < a.h:
+        x = 0
+        while x < a.w:
+            l.rect(
+                translation_x=x, translation_y=y,
+                x=res / 2, y=res / 2,
+                w=[res * 2, 0], h=[0, res * 2],
+                phase=1.99 * (y + x) * 0.2,
+                fill=hsva(((x + y) / 5) * 90 + 50, 0.8, 1),
+                stroke=False
+            )
+            x += res * 0.7
+        y += res * 0.5
+
+
+def isosquares(a):
+    a.set_bg_color(Color("black"))
+    l = a.render_list
+    res = a.h
+    phase_shift = rad(40)
+    for y in range(res - 1, 0, -4):
+        l.rect(
+            x=a.w * 0.5, y=y,
+            w=a.w / 3 + cos(y / res * 2 * pi) * a.w / 6,
+            h=a.w / 3 + sin(y / res * 2 * pi) * a.w / 6,
+            fill=sinebow(y / 2, 0.3, 0.3, 0.3, 0, 1 * phase_shift, 2 * phase_shift),
+            stroke=Color("0x30000000"),
+            line_width=4,
+            scale_y=0.5,
+            rotation=[0, 360],
+            phase=y / res * 0.1
+        )
+
+
+def flowing_leaves(a):
+    a.set_loop().set_ease("linear")
+    l = a.render_list
+    r = a.w // 40
+    for x in range(r * 2, a.w - r, r * 2):
+        for y in range(r * 2, a.h - r, r * 2):
+            c = l.container(x=x, y=y, rotation=[0, 360], phase=(x + y) / a.w)
+            l.oval(x=0, y=0, rx=r, ry=r * 0.5, stroke=False, fill="orange", parent=c)
+            l.oval(x=0, y=0, rx=r, ry=r * 0.5, stroke="white", fill=False, start=0, end=180, line_width=3, parent=c)
+
+
+def text_party(a):
+    a.set_ease("back")
+    l = a.render_list
+    for x in range(a.w // 5, a.w, a.w // 3):
+        for y in range(a.h // 10, a.h - a.h // 10, a.h // 7):
+            l.text(
+                x=x, y=y,
+                size=a.h / 10,
+                text="(>o_o)>,<(o_o<),<(o_o<),\\(-O-)/ ".split(","),
+                translation_y=[0, 10],
+                rotation=[-10, 0, 10],
+                phase=(x + y) * 0.00345
+            )
+
+
+SCENES = (cafe_wall, twisting_rects, isosquares, flowing_leaves, text_party)
+
+
+def make_animation(scene, size, fps, duration=1):
+    a = Animation(width=size, height=size, fps=fps, duration=duration)
+    scene(a)
+    return a
+
+
+def cases(quick=False):
+    sizes = (250,) if quick else (250, 500, 1000)
+    fps = 10 if quick else 30
+    found = []
+
+    for scene in SCENES:
+        for size in sizes:
+            def setup(scene=scene, size=size):
+                a = make_animation(scene, size, fps)
+                return lambda: consume(a.iter_frames("rgba_reuse")), len(a.frame_times()), "frames"
+
+            found.append(("{}/{}".format(scene.__name__, size), setup))
+
+    return found
+
+
+def main(size=500, fps=30):
+    for scene in SCENES:
+        def setup():
+            a = make_animation(scene, size, fps)
+            return lambda: consume(a.iter_frames("rgba_reuse")), len(a.frame_times()), "frames"
+
+        result = measure(setup, repeat=1)
+        print("{:<16} {:>10.1f} frames/s".format(scene.__name__, result["rate"]))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,165 @@
+"""
+
+    Shape drawing benchmark.
+
+    Renders every shape class in ``glc.shapes`` on its own,
+    at a few different amounts of shapes, with animated
+    position, rotation and colors.
+
+    The instanced shapes (``Circles``, ``Rects``) are
+    a single shape with that many instances instead.
+
+    The ``Images`` cases draw lots of different small images,
+    with and without packing them into an atlas first.
+
+    Usage: python benchmarks/bench_shapes.py [count] [frame_count]
+
+"""
+
+import os
+import sys
+import atexit
+import tempfile
+
+from common import frame_times, measure, render_frames
+
+from glc import RenderList, shapes
+from glc.color import hsva
+
+import numpy
+import imageio
+
+
+SIZE = 300
+
+# shapes that draw nothing without some props of their own
+EXTRA_PROPS = {
+    "Path": {"path": [0, 0, 50, 50, -50, 50, -20, 10]},
+    "CurvePath": {"points": [[0, 0], [50, 20], [20, 60], [-30, 40]]},
+    "Text": {"text": "glc.py"}
+}
+
+# how many different images the Images cases cycle through
+IMAGE_COUNT = 16
+
+_image_paths = {}
+
+
+def image_path(index=0):
+    # small images, each written once, for the Image shape
+    if index not in _image_paths:
+        pixels = numpy.zeros((32, 32, 4), numpy.uint8)
+        pixels[8:24, 8:24] = (255, index * 16 % 256, 0, 255)
+        fd, path = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        imageio.imwrite(path, pixels)
+        atexit.register(os.remove, path)
+        _image_paths[index] = path
+
+    return _image_paths[index]
+
+
+def shape_classes():
+    classes = []
+
+    for name in dir(shapes):
+        value = getattr(shapes, name)
+        if isinstance(value, type) and issubclass(value, shapes.Shape):
+            if value not in (shapes.Shape, shapes.Instances):
+                classes.append(value)
+
+    return sorted(classes, key=lambda cls: cls.__name__)
+
+
+def add_shapes(render_list, cls, count):
+    if issubclass(cls, shapes.Instances):
+        positions = numpy.random.default_rng(0).uniform(0, SIZE, (2, count))
+        render_list.add(cls(
+            x=[positions[0], positions[0][::-1]],
+            y=positions[1],
+            rotation=[0, 360],
+            fill=numpy.linspace(0, 1, count * 4).reshape(count, 4),
+            stroke=True
+        ))
+        return
+
+    for i in range(count):
+        props = dict(
+            translation_x=[-SIZE / 4, SIZE / 4],
+            translation_y=(i * 37) % SIZE - SIZE / 2,
+            rotation=[0, 360],
+            phase=i / count,
+            fill=hsva(i * 360 / count, 0.8, 1),
+            stroke="black"
+        )
+        props.update(EXTRA_PROPS.get(cls.__name__, {}))
+
+        if cls is shapes.Image:
+            render_list.image(img=image_path(), **props)
+        else:
+            render_list.add(cls(**props))
+
+
+def add_images(render_list, count):
+    for i in range(count):
+        render_list.image(
+            img=image_path(i % IMAGE_COUNT),
+            x=(i * 37) % SIZE,
+            y=[0, SIZE],
+            phase=i / count,
+            rotation=[0, 360]
+        )
+
+
+def setup_images(count, frame_count, atlas):
+    render_list = RenderList(width=SIZE, height=SIZE, atlas=atlas)
+    add_images(render_list, count)
+    times = frame_times(frame_count)
+    render_list.prepare_timeline(times)
+    return lambda: render_frames(render_list, times), frame_count, "frames"
+
+
+def cases(quick=False):
+    counts = (1, 10) if quick else (1, 10, 100)
+    frame_count = 5 if quick else 20
+    found = []
+
+    for cls in shape_classes():
+        for count in counts:
+            def setup(cls=cls, count=count):
+                render_list = RenderList(width=SIZE, height=SIZE)
+                add_shapes(render_list, cls, count)
+                times = frame_times(frame_count)
+                render_list.prepare_timeline(times)
+                return lambda: render_frames(render_list, times), frame_count, "frames"
+
+            found.append(("{}/{}".format(cls.__name__, count), setup))
+
+    for atlas in (False, True):
+        for count in counts:
+            def setup(count=count, atlas=atlas):
+                return setup_images(count, frame_count, atlas)
+
+            found.append(("Images{}/{}".format("+atlas" if atlas else "", count), setup))
+
+    return found
+
+
+def main(count=10, frame_count=20):
+    for cls in shape_classes():
+        def setup():
+            render_list = RenderList(width=SIZE, height=SIZE)
+            add_shapes(render_list, cls, count)
+            times = frame_times(frame_count)
+            return lambda: render_frames(render_list, times), frame_count, "frames"
+
+        result = measure(setup, repeat=1)
+        print("{:<16} {:>10.1f} frames/s".format(cls.__name__, result["rate"]))
+
+    for atlas in (False, True):
+        result = measure(lambda: setup_images(count, frame_count, atlas), repeat=1)
+        print("{:<16} {:>10.1f} frames/s".format("Images+atlas" if atlas else "Images", result["rate"]))
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:3]))
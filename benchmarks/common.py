@@ -0,0 +1,67 @@
+"""
+
+    Helpers shared by the benchmarks.
+
+    Every benchmark module has a ``cases(quick)`` function, which
+    returns a list of ``(name, setup)`` pairs. ``setup()`` builds
+    whatever the case needs, and returns ``(run, count, unit)``:
+    a function to time, and how many ``unit`` (like frames)
+    one call to it goes through.
+
+"""
+
+import gc
+import sys
+import time
+import resource
+
+
+def peak_rss():
+    """Returns the peak resident set size of this process so far, in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def measure(setup, repeat=3):
+    """Times a case, keeping its fastest run.
+
+    Returns
+    -------
+    dict
+        ``seconds`` for the fastest run, ``rate`` in units per
+        second, the ``unit`` itself, and ``peak_rss`` in bytes.
+    """
+    run, count, unit = setup()
+    best = None
+
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        "seconds": best,
+        "rate": count / best if best else float("inf"),
+        "unit": unit,
+        "peak_rss": peak_rss()
+    }
+
+
+def frame_times(frame_count):
+    return [frame / frame_count for frame in range(frame_count)]
+
+
+def render_frames(render_list, times):
+    """Renders the given times, the way converters ask for frames."""
+    for t in times:
+        render_list.render(t, frame_format="rgba_reuse")
+
+
+def consume(frames):
+    for _ in frames:
+        pass
@@ -0,0 +1,145 @@
+"""
+
+    Runs the benchmarks, and compares them against a baseline.
+
+    Each case runs in a process of its own, so the peak memory
+    reported for it is its own, and cases can't slow each other down.
+
+    Usage:
+
+        python benchmarks/run.py                       # everything
+        python benchmarks/run.py shapes scenes --quick
+        python benchmarks/run.py --filter Circle --save baseline.json
+        python benchmarks/run.py --compare baseline.json
+
+    Comparing exits with status 1 if any case got slower than
+    the threshold allows.
+
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import importlib
+import subprocess
+
+from common import measure
+
+
+SUITES = ("shapes", "scenes", "props", "encoders")
+
+
+def suite_cases(suite, quick):
+    module = importlib.import_module("bench_" + suite)
+    return module.cases(quick)
+
+
+def run_case(suite, name, quick, repeat):
+    for case_name, setup in suite_cases(suite, quick):
+        if case_name == name:
+            return measure(setup, repeat)
+    raise KeyError("no case {}/{}".format(suite, name))
+
+
+def run_isolated(suite, name, quick, repeat):
+    command = [sys.executable, os.path.abspath(__file__), "--case", suite, name, "--repeat", str(repeat)]
+    if quick:
+        command.append("--quick")
+
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines() or ["exited with status {}".format(process.returncode)]
+        return {"error": lines[-1]}
+
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def format_rate(result):
+    unit = "fps" if result["unit"] == "frames" else result["unit"] + "/s"
+    return "{:>12.1f} {}".format(result["rate"], unit)
+
+
+def compare(result, base, threshold):
+    """Returns the change in speed against ``base``, and whether it's a regression."""
+    if "error" in result or base is None or "error" in base:
+        return None, False
+    change = result["rate"] / base["rate"] - 1
+    return change, change < -threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the glc.py benchmarks.")
+    parser.add_argument("suites", nargs="*", help="which suites to run ({}), defaults to all".format(", ".join(SUITES)))
+    parser.add_argument("--quick", action="store_true", help="fewer and smaller cases")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest one counts")
+    parser.add_argument("--filter", default="", help="only run cases with this in their name")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="how much slower counts as a regression")
+    parser.add_argument("--case", nargs=2, metavar=("SUITE", "NAME"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error("unknown suite {!r}, pick from {}".format(suite, ", ".join(SUITES)))
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.quick, args.repeat)))
+        return 0
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+
+    for suite in args.suites or SUITES:
+        print("# " + suite)
+
+        for name, _ in suite_cases(suite, args.quick):
+            key = "{}/{}".format(suite, name)
+            if args.filter not in key:
+                continue
+
+            result = results[key] = run_isolated(suite, name, args.quick, args.repeat)
+
+            if "error" in result:
+                print("{:<32} failed: {}".format(name, result["error"]))
+                continue
+
+            line = "{:<32} {} {:>10.1f} MB".format(name, format_rate(result), result["peak_rss"] / (1 << 20))
+
+            change, regressed = compare(result, baseline.get(key), args.threshold)
+            if change is not None:
+                line += " {:>+8.1%}".format(change)
+            if regressed:
+                line += "  slower"
+                regressions.append(key)
+
+            print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "quick": args.quick,
+                "results": results
+            }, f, indent=2)
+
+    if regressions:
+        print("{} case(s) got slower than the baseline:".format(len(regressions)))
+        for key in regressions:
+            print("  " + key)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
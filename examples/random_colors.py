@@ -0,0 +1,22 @@
+from example_util import get_filename
+from glc import Gif
+from glc.color import random_hsva
+
+
+# the same seed always picks the same colors and shakes the same way
+with Gif(get_filename(__file__), seed=42) as a:
+    a.set_size(300, 300).set_duration(2).set_fps(20)
+    l = a.render_list
+    rng = l.rng
+
+    for _ in range(30):
+        l.circle(
+            x=rng.uniform(0, a.w),
+            y=[rng.uniform(0, a.h), rng.uniform(0, a.h)],
+            radius=rng.uniform(10, 30),
+            fill=random_hsva(0, 360, 0.5, 1, 0.8, 1, rng=rng),
+            stroke=False,
+            shake=2
+        )
+
+    a.save()
@@ -11,8 +11,92 @@
 """
 
 from .render_list import RenderList
+from .render_cache import scene_hash
+from queue import Queue, Empty
+from threading import Thread, Event
 
+import os
+import sys
 import imageio
+import multiprocessing
+
+
+# render list owned by each worker process
+# set up by _init_worker, which runs once per worker
+_worker_render_list = None
+_worker_frame_format = None
+
+
+def _init_worker(render_list, frame_format):
+    global _worker_render_list, _worker_frame_format
+    # after a fork the inherited surface is the parent's, copied on write,
+    # so drawing on it copies its pages one at a time as they're touched
+    # size() makes a new surface and context that are this process's from the start
+    render_list.size(render_list.width, render_list.height)
+    _worker_render_list = render_list
+    _worker_frame_format = frame_format
+
+
+def _render_worker_frame(t):
+    return _worker_render_list.render(t, frame_format=_worker_frame_format)
+
+
+def _can_fork():
+    # macOS can fork, but it isn't safe with its system frameworks,
+    # which cairo uses for fonts, so Python stopped defaulting to it there
+    return sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods()
+
+
+def _render_ahead(frames, size):
+    # runs the frames generator on another thread, so the next frames
+    # are rendered while the consumer is still encoding the current one
+    # the queue is bounded, so rendering can't get too far ahead
+    queue = Queue(size)
+    stop = Event()
+    done = object()
+    errors = []
+
+    def produce():
+        try:
+            for frame in frames:
+                if stop.is_set():
+                    break
+                queue.put(frame)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            queue.put(done)
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            frame = queue.get()
+            if frame is done:
+                break
+            yield frame
+    finally:
+        # unblock the producer if the consumer stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                queue.get_nowait()
+            except Empty:
+                thread.join(0.01)
+
+    if errors:
+        raise errors[0]
+
+
+def _without_regions(frames):
+    # frames that weren't rendered one after the other
+    # in this process have nothing to compare against
+    try:
+        for frame in frames:
+            yield frame, None
+    finally:
+        frames.close()
 
 
 class Animation:
@@ -36,6 +120,31 @@ class Animation:
         The overall easing function of the animation. Defaults to ``'sine'``.
     loop : bool
         Whether the animation should loop. Defaults to ``True``.
+    workers : int
+        How many processes should render frames. ``None`` or ``0``
+        uses one per CPU core. Defaults to 1, which renders in
+        this process.
+
+        Only available on Linux, where worker processes can be
+        safely forked; elsewhere rendering always happens in this process.
+    pipeline : int
+        How many frames can be rendered ahead of the converter,
+        on a background thread, so that rendering and encoding overlap.
+        Defaults to 0, which renders each frame only when it's asked for.
+    frame_cache : bool
+        Whether frames that look exactly like an earlier one should
+        be reused instead of rendered again, like the second half of
+        a looping animation. Reused frames are kept in memory until
+        they're needed for the last time. Defaults to ``False``.
+
+        Frames can only be matched if every shape is drawn with the
+        same eased time, so functions used as properties should only
+        depend on the time they're given.
+    render_cache : :class:`glc.render_cache.RenderCache`
+        Where encoded animations are kept, looked up by a hash of
+        everything that decides what they look like. Saving an animation
+        that was already saved with the same scene and settings just
+        reuses the stored file. Defaults to ``None``, which always renders.
 
     Attributes
     ----------
@@ -53,6 +162,10 @@ class Animation:
 
         self.duration = kwargs.pop("duration", 2.0)
         self.fps = kwargs.pop("fps", 30)
+        self.workers = kwargs.pop("workers", 1)
+        self.pipeline = kwargs.pop("pipeline", 0)
+        self.frame_cache = kwargs.pop("frame_cache", False)
+        self.render_cache = kwargs.pop("render_cache", None)
 
         self.transparent = False
 
@@ -157,6 +270,59 @@ class Animation:
         self.render_list.duration = duration
         return self
 
+    def set_workers(self, workers):
+        """Sets how many processes should be used to render frames.
+
+        Parameters
+        ----------
+        workers : int
+            The amount of worker processes. ``None`` or ``0``
+            uses one per CPU core.
+
+        Returns
+        -------
+        self : :class:`Animation`
+            For method chaining.
+        """
+
+        self.workers = workers
+        return self
+
+    def set_pipeline(self, size):
+        """Sets how many frames can be rendered ahead of the converter.
+
+        Parameters
+        ----------
+        size : int
+            The maximum amount of frames waiting to be encoded.
+            0 disables rendering ahead.
+
+        Returns
+        -------
+        self : :class:`Animation`
+            For method chaining.
+        """
+
+        self.pipeline = size
+        return self
+
+    def set_frame_cache(self, frame_cache=True):
+        """Sets whether frames that were already rendered should be reused.
+
+        Parameters
+        ----------
+        frame_cache : bool
+            Whether to reuse frames. Defaults to ``True``.
+
+        Returns
+        -------
+        self : :class:`Animation`
+            For method chaining.
+        """
+
+        self.frame_cache = frame_cache
+        return self
+
     def set_default_style(self, name, value):
         """Sets a default style to the specified value.
 
@@ -201,6 +367,53 @@ class Animation:
         self.set_default_style("bg_color", color)
         return self
 
+    def set_render_cache(self, render_cache):
+        """Sets where encoded animations are kept. See :class:`Animation`.
+
+        Parameters
+        ----------
+        render_cache : :class:`glc.render_cache.RenderCache`
+            The cache to use, or ``None`` to not use one.
+
+        Returns
+        -------
+        self : :class:`Animation`
+            For method chaining.
+        """
+        self.render_cache = render_cache
+        return self
+
+    def scene_hash(self, **settings):
+        """Returns a hash of this animation and the given output settings.
+
+        See :func:`glc.render_cache.scene_hash`.
+
+        Returns
+        -------
+        str
+        """
+        return scene_hash(self, **settings)
+
+    def set_seed(self, seed):
+        """Sets the seed for everything random in the animation, like shaking.
+
+        The same seed always renders the same frames. Random things picked
+        while building the scene should come from :attr:`RenderList.rng`,
+        after the seed is set.
+
+        Parameters
+        ----------
+        seed : int or str
+            The seed to use.
+
+        Returns
+        -------
+        self : :class:`Animation`
+            For method chaining.
+        """
+        self.render_list.set_seed(seed)
+        return self
+
     def set_emoji_path(self, path):
         """Defines where the library will try to find emoji images.
 
@@ -221,29 +434,167 @@ class Animation:
         self.render_list.emoji_path = path
         return self
 
-    def render(self):
-        """Renders all the necessary frames for this animation to numpy arrays.
+    def frame_times(self):
+        """Returns the times at which each frame of this animation is rendered.
 
         Returns
         -------
-        frames : list of numpy arrays
+        times : list of floats
+            One value in the range 0.0 to 1.0 for each frame, in order.
         """
-        frames = []
-
         total_frames = self.duration * self.fps
         speed = 1 / total_frames
-        t = 0
+        times = [0]
+
+        while round(len(times) * speed * 10000) / 10000 < 1:
+            times.append(len(times) * speed)
+
+        return times
 
-        rendering = True
+    def iter_frames(self, frame_format=None, regions=False):
+        """Renders the frames for this animation one at a time.
 
-        while rendering:
-            frames.append(self.render_list.render(t))
-            t += speed
+        Unlike :meth:`render`, this never holds more than the frame
+        currently being rendered, so it's what the converters use.
+
+        Parameters
+        ----------
+        frame_format : str
+            The format of the frames, see :class:`RenderList`.
+            With ``'rgba_reuse'`` or ``'bgra'``, each frame is only
+            valid until the next one is requested.
+            Defaults to the render list's ``frame_format``.
+        regions : bool
+            Whether to also yield the box around the part of each frame
+            that can differ from the previous one, as returned by
+            :meth:`RenderList.get_dirty_box`. It's only known when the
+            render list has ``partial_redraw`` set and frames are rendered
+            one by one in this process, and is ``None`` otherwise.
+            Defaults to ``False``.
+
+        Yields
+        ------
+        frame : numpy array
+            Or ``(frame, region)`` tuples, if ``regions`` is set.
+        """
+        times = self.frame_times()
+        self.render_list.prepare_timeline(times)
+
+        if self.frame_cache:
+            frames = self._iter_frames_cached(times, frame_format)
+            yield from _without_regions(frames) if regions else frames
+        else:
+            yield from self._iter_frames(times, frame_format, regions)
 
-            if round(t * 10000) / 10000 >= 1:
-                rendering = False
+    def _iter_frames(self, times, frame_format, regions=False):
+        workers = self.workers or os.cpu_count() or 1
+        workers = min(workers, len(times))
 
-        return frames
+        if workers > 1 and _can_fork():
+            # workers already render while the frames are being consumed
+            frames = self._iter_frames_parallel(times, workers, frame_format)
+        elif self.pipeline > 0:
+            frames = _render_ahead(self._iter_frames_pipelined(times, frame_format), self.pipeline)
+        else:
+            for t in times:
+                frame = self.render_list.render(t, frame_format=frame_format)
+                yield (frame, self.render_list.get_dirty_box()) if regions else frame
+            return
+
+        yield from _without_regions(frames) if regions else frames
+
+    def frame_sources(self, times=None):
+        """Finds which frames look exactly like an earlier one.
+
+        Parameters
+        ----------
+        times : list of floats
+            The times of the frames. Defaults to :meth:`frame_times`.
+
+        Returns
+        -------
+        sources : list of ints
+            For each frame, the index of the first frame that looks the same.
+            Frames that only look like themselves point to their own index.
+        """
+        if times is None:
+            times = self.frame_times()
+
+        first = {}
+        sources = []
+
+        for index, t in enumerate(times):
+            key = self.render_list.frame_key(t)
+            if key is None:
+                sources.append(index)
+            else:
+                sources.append(first.setdefault(key, index))
+
+        return sources
+
+    def _iter_frames_cached(self, times, frame_format):
+        sources = self.frame_sources(times)
+        last_use = {}
+        for index, source in enumerate(sources):
+            last_use[source] = index
+
+        if frame_format is None:
+            frame_format = self.render_list.frame_format
+
+        # only the frames that look different get rendered
+        rendered = self._iter_frames([t for i, t in enumerate(times) if sources[i] == i], frame_format)
+        cache = {}
+
+        try:
+            for index, source in enumerate(sources):
+                if source == index:
+                    frame = next(rendered)
+                    if last_use[index] > index:
+                        # reused buffers get overwritten by the next frame
+                        cache[index] = frame.copy() if frame_format in ("rgba_reuse", "bgra") else frame
+                else:
+                    frame = cache[source]
+                    if last_use[source] == index:
+                        del cache[source]
+
+                yield frame
+        finally:
+            # lets workers or the render-ahead thread shut down
+            rendered.close()
+
+    def _iter_frames_pipelined(self, times, frame_format):
+        # frames sitting in the queue must not share memory
+        # with the surface or with each other
+        if frame_format is None:
+            frame_format = self.render_list.frame_format
+
+        for t in times:
+            if frame_format == "bgra":
+                yield self.render_list.render(t, frame_format="bgra").copy()
+            else:
+                yield self.render_list.render(t, frame_format="rgba")
+
+    def _iter_frames_parallel(self, times, workers, frame_format):
+        # forking means shapes don't need to be picklable
+        # (lambdas are everywhere in scenes), only the frames do
+        ctx = multiprocessing.get_context("fork")
+        chunksize = max(1, len(times) // (workers * 4))
+
+        with ctx.Pool(workers, _init_worker, (self.render_list, frame_format)) as pool:
+            # imap hands back frames in order as soon as they're ready
+            yield from pool.imap(_render_worker_frame, times, chunksize)
+
+    def render(self):
+        """Renders all the necessary frames for this animation to numpy arrays.
+
+        This keeps every frame in memory. Use :meth:`iter_frames`
+        if you just need to go through them once.
+
+        Returns
+        -------
+        frames : list of numpy arrays
+        """
+        return list(self.iter_frames("rgba"))
 
     def render_at(self, t):
         """Renders one frame at time t to a numpy array.
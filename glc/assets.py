@@ -0,0 +1,451 @@
+"""
+
+    glc.assets
+    ==========
+
+    Decoded images, kept around so they're only loaded once.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from collections.abc import Sequence
+from weakref import WeakSet
+from hashlib import sha1
+from .utils import LRUCache, surface_from_array
+
+import os
+import json
+import math
+import cairo
+import numpy
+import imageio
+
+
+# how many bytes of decoded images the default cache keeps in memory
+ASSET_CACHE_SIZE = 256 * 1024 * 1024
+
+
+def decode_image(source):
+    """Decodes every frame of an image into Cairo surfaces.
+
+    Parameters
+    ----------
+    source : str or file-like object
+        Anything ``imageio.get_reader`` can read.
+
+    Returns
+    -------
+    (surfaces, durations) : tuple
+        A list with one :class:`cairo.ImageSurface` per frame, and a list
+        with the duration of each frame in milliseconds, if the format has them.
+    """
+    reader = imageio.get_reader(source)
+    surfaces = []
+    durations = []
+
+    try:
+        for index, im in enumerate(reader):
+            duration = _frame_duration(reader, index)
+            if duration is not None:
+                durations.append(duration)
+
+            surfaces.append(surface_from_array(im))
+    finally:
+        reader.close()
+
+    return surfaces, durations
+
+
+def _frame_duration(reader, index):
+    # get frame durations here (for gifs)
+    # FreeImage keeps them under ANIMATION, Pillow calls them duration
+    try:
+        meta = reader.get_meta_data(index)
+    except Exception:
+        return None
+
+    if "ANIMATION" in meta:
+        return meta["ANIMATION"].get("FrameTime")
+    return meta.get("duration")
+
+
+def gif_durations(path):
+    """Reads the duration of each frame of a GIF, without decoding any of them.
+
+    Only the small blocks in between the frames are read,
+    the pixel data is skipped over.
+
+    Parameters
+    ----------
+    path : str
+        Path to the GIF.
+
+    Returns
+    -------
+    list of int or ``None``
+        The durations in milliseconds, the same ones :func:`decode_image`
+        gets, or ``None`` if ``path`` isn't a GIF file.
+    """
+    if not isinstance(path, str) or not os.path.isfile(path):
+        return None
+
+    durations = []
+    delay = None
+
+    with open(path, "rb") as f:
+        header = f.read(13)
+        if len(header) < 13 or not header.startswith(b"GIF"):
+            return None
+
+        # global color table
+        if header[10] & 0x80:
+            f.seek(3 << ((header[10] & 7) + 1), os.SEEK_CUR)
+
+        # see https://www.w3.org/Graphics/GIF/spec-gif89a.txt
+        while True:
+            introducer = f.read(1)
+
+            if introducer == b"\x21":
+                label = f.read(1)
+                data = _read_sub_blocks(f, keep=label == b"\xf9")
+                # graphic control extension, for the next image
+                if label == b"\xf9" and len(data) >= 3:
+                    delay = int.from_bytes(data[1:3], "little") * 10
+            elif introducer == b"\x2c":
+                descriptor = f.read(9)
+                if len(descriptor) < 9:
+                    break
+                # local color table
+                if descriptor[8] & 0x80:
+                    f.seek(3 << ((descriptor[8] & 7) + 1), os.SEEK_CUR)
+                # minimum code size, then the pixel data
+                f.read(1)
+                _read_sub_blocks(f)
+
+                # like imageio, frames with no delay don't get a duration
+                if delay is not None:
+                    durations.append(delay)
+                delay = None
+            else:
+                # the trailer, or the end of a truncated file
+                break
+
+    return durations
+
+
+def _read_sub_blocks(f, keep=False):
+    data = bytearray()
+
+    while True:
+        size = f.read(1)
+        if not size or not size[0]:
+            return bytes(data)
+        if keep:
+            data += f.read(size[0])
+        else:
+            f.seek(size[0], os.SEEK_CUR)
+
+
+def _surface_bytes(surface):
+    return surface.get_stride() * surface.get_height()
+
+
+class AssetCache:
+
+    """Keeps decoded images in memory, and optionally on disk.
+
+    Images are looked up by their path, along with the file's size
+    and modification time, so editing a file loads it again.
+    When the decoded images take up more than ``max_bytes``,
+    the ones used least recently are dropped first.
+
+    If ``directory`` is set, decoded frames are also saved there as raw
+    premultiplied pixels in Cairo's own layout. Other processes, and
+    later runs, map those files into memory instead of decoding the
+    image again.
+
+    There's one cache shared by every :class:`RenderList` by default,
+    :data:`default_cache`.
+
+    Parameters
+    ----------
+    max_bytes : int
+        How much memory the decoded images can take up, in bytes.
+        Defaults to :data:`ASSET_CACHE_SIZE`.
+    directory : str
+        Where to save decoded images. Defaults to ``None``,
+        which keeps them in memory only.
+
+    Attributes
+    ----------
+    size : int
+        How many bytes the images currently in memory take up.
+    """
+
+    def __init__(self, max_bytes=ASSET_CACHE_SIZE, directory=None):
+        self.directory = directory
+        self._entries = LRUCache(max_bytes, self._evict)
+        self._atlases = WeakSet()
+
+    @property
+    def max_bytes(self):
+        return self._entries.max_size
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._entries.max_size = value
+
+    @property
+    def size(self):
+        return self._entries.size
+
+    def add_atlas(self, atlas):
+        """Makes an atlas drop the surfaces this cache drops.
+
+        Otherwise the atlas would keep them alive, and they would
+        never really leave memory. The cache doesn't keep the atlas alive.
+
+        Parameters
+        ----------
+        atlas : :class:`glc.atlas.Atlas`
+            The atlas the surfaces of this cache are packed into.
+        """
+        self._atlases.add(atlas)
+
+    def _evict(self, key, entry):
+        surfaces = entry[0]
+        for atlas in list(self._atlases):
+            atlas.discard(surfaces)
+
+    def _key(self, source):
+        if isinstance(source, str) and os.path.isfile(source):
+            stat = os.stat(source)
+            return os.path.abspath(source), stat.st_size, stat.st_mtime_ns
+
+        try:
+            hash(source)
+        except TypeError:
+            # file objects and such can't be looked up again
+            return None
+
+        return source
+
+    def load_image(self, source):
+        """Returns the decoded frames of an image, decoding it only if needed.
+
+        See :func:`decode_image` for the parameters.
+        The surfaces are shared, so they shouldn't be drawn on.
+
+        Returns
+        -------
+        (surfaces, durations) : tuple
+        """
+        key = self._key(source)
+
+        if key is None:
+            return decode_image(source)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        loaded = self._load_from_disk(key)
+        if loaded is None:
+            loaded = decode_image(source)
+            self._save_to_disk(key, *loaded)
+
+        surfaces, durations = loaded
+        self._entries.put(key, loaded, sum(_surface_bytes(surface) for surface in surfaces))
+        return surfaces, durations
+
+    def load_emoji(self, path):
+        """Returns the surface for an emoji image, decoding it only if needed."""
+        return self.load_image(path)[0][0]
+
+    def clear(self):
+        """Drops every image kept in memory. Files on disk are left alone."""
+        for entry in self._entries.values():
+            self._evict(None, entry)
+        self._entries.clear()
+
+    # disk cache
+
+    def _disk_path(self, key):
+        name = sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def _load_from_disk(self, key):
+        if self.directory is None:
+            return None
+
+        path = self._disk_path(key)
+
+        try:
+            with open(path + ".json") as f:
+                meta = json.load(f)
+            # copy-on-write, since cairo wants a writable buffer
+            # but nothing should ever end up in the file
+            data = numpy.load(path + ".npy", mmap_mode="c")
+        except (OSError, ValueError):
+            return None
+
+        width, height, stride = meta["width"], meta["height"], meta["stride"]
+        surfaces = [
+            cairo.ImageSurface.create_for_data(frame, cairo.FORMAT_ARGB32, width, height, stride)
+            for frame in data
+        ]
+
+        return surfaces, meta["durations"]
+
+    def _save_to_disk(self, key, surfaces, durations):
+        if self.directory is None or not surfaces:
+            return
+
+        first = surfaces[0]
+        shape = first.get_width(), first.get_height(), first.get_stride()
+        if any((s.get_width(), s.get_height(), s.get_stride()) != shape for s in surfaces):
+            return
+
+        width, height, stride = shape
+        data = numpy.empty((len(surfaces), height, stride), numpy.uint8)
+        for frame, surface in zip(data, surfaces):
+            surface.flush()
+            frame[...] = numpy.frombuffer(surface.get_data(), numpy.uint8).reshape(height, stride)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._disk_path(key)
+        # written under another name first, so other processes
+        # never see half of a file
+        temp = "{}.{}.tmp".format(path, os.getpid())
+
+        with open(temp, "wb") as f:
+            numpy.save(f, data)
+        os.replace(temp, path + ".npy")
+
+        with open(temp, "w") as f:
+            json.dump({"width": width, "height": height, "stride": stride, "durations": durations}, f)
+        os.replace(temp, path + ".json")
+
+
+class LazyFrames(Sequence):
+
+    """The frames of an image, decoded only when they're needed.
+
+    Works like a list of :class:`cairo.ImageSurface`, but a frame is only
+    decoded the first time it's accessed, along with a few of the frames
+    after it, since most images are read in order. Only the frames used
+    most recently stay in memory.
+
+    Going back to an earlier frame makes the reader decode the image from
+    its first frame again, so when that happens, the frames leading up to
+    the one asked for are kept as well (as many as ``max_frames`` allows).
+    Playing the frames backwards then only goes back to the start every
+    ``max_frames`` or so frames, instead of on every one.
+
+    Each process opens the image on its own, so this
+    can be used by worker processes too.
+
+    Parameters
+    ----------
+    source : str
+        Path to the image, or anything else ``imageio.get_reader`` can open again.
+    read_ahead : int
+        How many frames to decode after the one asked for. Defaults to 4.
+    max_frames : int
+        How many frames can stay in memory at once. Defaults to 32.
+
+    Attributes
+    ----------
+    durations : list of int
+        The duration of each frame of a GIF in milliseconds,
+        read when it's opened, see :func:`gif_durations`.
+        Same as the ones from :func:`decode_image`. Empty for other
+        formats, as reading theirs would decode every frame.
+    """
+
+    def __init__(self, source, read_ahead=4, max_frames=32):
+        self.source = source
+        self.read_ahead = read_ahead
+        self.max_frames = max(max_frames, read_ahead + 1)
+
+        self._frames = LRUCache(self.max_frames)
+        self._reader = None
+        self._pid = None
+        # index of the frame the reader decodes next
+        self._position = 0
+
+        self._length = self._get_reader().get_length()
+        durations = gif_durations(source) if math.isfinite(self._length) else None
+        self.durations = durations or []
+
+    def _get_reader(self):
+        # readers don't survive a fork, so each process opens its own
+        if self._reader is None or self._pid != os.getpid():
+            self._reader = imageio.get_reader(self.source)
+            self._pid = os.getpid()
+            self._position = 0
+        return self._reader
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("frame index out of range")
+
+        surface = self._frames.get(index)
+        if surface is not None:
+            return surface
+
+        reader = self._get_reader()
+        start = index
+        end = min(index + self.read_ahead + 1, self._length)
+
+        if index < self._position:
+            # the reader has to start over from the first frame anyway,
+            # so the ones it goes through on the way are worth keeping
+            start = max(0, end - self.max_frames)
+
+        for i in range(start, end):
+            if i not in self._frames:
+                self._frames.put(i, surface_from_array(reader.get_data(i)))
+
+        self._position = end
+        return self._frames.get(index)
+
+    def close(self):
+        """Closes the image and drops every decoded frame."""
+        if self._reader is not None and self._pid == os.getpid():
+            self._reader.close()
+        self._reader = None
+        self._frames.clear()
+
+
+def lazy_frames(source, read_ahead=4, max_frames=32):
+    """Returns the frames of an image, decoded only when they're needed.
+
+    See :class:`LazyFrames` for the parameters.
+
+    Returns
+    -------
+    :class:`LazyFrames` or ``None``
+        ``None`` if the amount of frames can't be known
+        up front, in which case the image should just be decoded.
+    """
+    frames = LazyFrames(source, read_ahead, max_frames)
+
+    if not math.isfinite(frames._length):
+        frames.close()
+        return None
+
+    return frames
+
+
+default_cache = AssetCache()
@@ -0,0 +1,238 @@
+"""
+
+    glc.atlas
+    =========
+
+    Packing many small images into a few big surfaces.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+import cairo
+
+
+class AtlasRegion:
+
+    """A rectangle inside one of the pages of an :class:`Atlas`.
+
+    It can be used most places where a surface is expected, as it has
+    :meth:`get_width` and :meth:`get_height`, and :func:`glc.utils.draw_image`
+    knows how to draw it.
+
+    Attributes
+    ----------
+    page : :class:`cairo.ImageSurface`
+        The surface this region lives in.
+    pattern : :class:`cairo.SurfacePattern`
+        The pattern for the page, shared by all of its regions.
+    x : int
+        Horizontal position of the region in the page.
+    y : int
+        Vertical position of the region in the page.
+    width : int
+        Width of the region.
+    height : int
+        Height of the region.
+    """
+
+    __slots__ = ("page", "pattern", "x", "y", "width", "height", "_surface")
+
+    def __init__(self, page, pattern, x, y, width, height):
+        self.page = page
+        self.pattern = pattern
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self._surface = None
+
+    def get_width(self):
+        return self.width
+
+    def get_height(self):
+        return self.height
+
+    def paint(self, context, alpha=1):
+        """Paints this region at the origin of the context.
+
+        Only the region is painted, not the rest of its page.
+        """
+        context.save()
+
+        # moves the page so the region is at the origin
+        # the pattern is used right away, so changing it for every draw is fine
+        self.pattern.set_matrix(cairo.Matrix(x0=self.x, y0=self.y))
+        context.set_source(self.pattern)
+        context.rectangle(0, 0, self.width, self.height)
+
+        if alpha >= 1:
+            context.fill()
+        else:
+            context.clip()
+            context.paint_with_alpha(alpha)
+
+        context.restore()
+
+    def to_surface(self):
+        """Returns a surface with just the contents of this region.
+
+        The surface is made once and then reused.
+        Useful for things that need a surface of their own, like tinting.
+        """
+        if self._surface is None:
+            self._surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, self.width, self.height)
+            ctx = cairo.Context(self._surface)
+            ctx.set_source_surface(self.page, -self.x, -self.y)
+            ctx.set_operator(cairo.OPERATOR_SOURCE)
+            ctx.paint()
+        return self._surface
+
+
+class Atlas:
+
+    """Packs small surfaces into a few big ones, called pages.
+
+    Drawing many images from the same page means Cairo keeps
+    using one source pattern, instead of switching between
+    lots of small surfaces.
+
+    Surfaces are placed in rows (shelves), each one going into the
+    first row with room for it. A transparent gutter is kept around
+    every surface, so scaled drawing doesn't pick up its neighbors.
+    Drawing a surface a lot smaller than it is can still reach past a
+    thin gutter, so a wider one is needed for that.
+
+    Packed surfaces are copies. The originals are still kept by whoever
+    made them, like an :class:`glc.assets.AssetCache`, until they're dropped.
+
+    The atlas keeps every surface added to it alive, so that adding it
+    again finds the same region, and pages only ever grow: space taken
+    by a surface isn't reused. When the surfaces come from an
+    :class:`glc.assets.AssetCache`, call :meth:`glc.assets.AssetCache.add_atlas`
+    so surfaces the cache drops are dropped here too (a
+    :class:`glc.RenderList` does this for its own atlas). The space they
+    took up in the pages is still kept, so an atlas used with images
+    that keep getting evicted and loaded again should be cleared from
+    time to time with :meth:`clear`.
+
+    Parameters
+    ----------
+    page_size : int
+        Width and height of each page, in pixels. Defaults to 1024.
+    max_size : int
+        Surfaces wider or taller than this aren't packed,
+        and are used as they are. Defaults to 256.
+    gutter : int
+        Empty pixels left around each surface. Defaults to 1.
+
+    Attributes
+    ----------
+    pages : list of :class:`cairo.ImageSurface`
+        The surfaces everything is packed into.
+    patterns : list of :class:`cairo.SurfacePattern`
+        A pattern for each page, which its regions are drawn with.
+    """
+
+    def __init__(self, page_size=1024, max_size=256, gutter=1):
+        self.page_size = page_size
+        self.max_size = min(max_size, page_size - 2 * gutter)
+        self.gutter = gutter
+
+        self.pages = []
+        self.patterns = []
+        self._shelves = []
+        self._regions = {}
+
+    def add(self, surface):
+        """Packs a surface into the atlas, if it's small enough.
+
+        Adding the same surface again returns the same region.
+
+        Parameters
+        ----------
+        surface : :class:`cairo.ImageSurface`
+            The surface to pack. It's copied, so it can be changed or dropped later.
+
+        Returns
+        -------
+        :class:`AtlasRegion` or :class:`cairo.ImageSurface`
+            Where the surface ended up, or the surface itself if it's too big.
+        """
+        if isinstance(surface, AtlasRegion):
+            return surface
+
+        entry = self._regions.get(id(surface))
+        # the entry keeps the surface alive, so its id can't be reused
+        if entry is not None and entry[0] is surface:
+            return entry[1]
+
+        width, height = surface.get_width(), surface.get_height()
+        if width > self.max_size or height > self.max_size:
+            return surface
+
+        page_index, x, y = self._place(width + 2 * self.gutter, height + 2 * self.gutter)
+        page = self.pages[page_index]
+        x += self.gutter
+        y += self.gutter
+
+        ctx = cairo.Context(page)
+        ctx.set_source_surface(surface, x, y)
+        ctx.rectangle(x, y, width, height)
+        ctx.fill()
+        page.flush()
+
+        region = AtlasRegion(page, self.patterns[page_index], x, y, width, height)
+        self._regions[id(surface)] = (surface, region)
+        return region
+
+    def discard(self, surfaces):
+        """Forgets the given surfaces, so the atlas no longer keeps them alive.
+
+        Regions already handed out keep working. The space they
+        take up in the pages isn't reused.
+        """
+        for surface in surfaces:
+            entry = self._regions.get(id(surface))
+            if entry is not None and entry[0] is surface:
+                del self._regions[id(surface)]
+
+    def clear(self):
+        """Drops every page and every surface added so far.
+
+        Regions already handed out keep their pages alive, and keep working.
+        """
+        self.pages = []
+        self.patterns = []
+        self._shelves = []
+        self._regions.clear()
+
+    def add_all(self, surfaces):
+        """Packs a list of surfaces. See :meth:`add`.
+
+        Returns
+        -------
+        list
+            The regions (or surfaces) for each of them, in order.
+        """
+        return [self.add(surface) for surface in surfaces]
+
+    def _place(self, width, height):
+        for page_index, shelves in enumerate(self._shelves):
+            for shelf in shelves:
+                y, shelf_height, used = shelf
+                if height <= shelf_height and used + width <= self.page_size:
+                    shelf[2] += width
+                    return page_index, used, y
+
+            top = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if top + height <= self.page_size:
+                shelves.append([top, height, width])
+                return page_index, 0, top
+
+        page = cairo.ImageSurface(cairo.FORMAT_ARGB32, self.page_size, self.page_size)
+        self.pages.append(page)
+        self.patterns.append(cairo.SurfacePattern(page))
+        self._shelves.append([[0, height, width]])
+        return len(self.pages) - 1, 0, 0
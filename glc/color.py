@@ -11,6 +11,8 @@
 """
 
 from string import hexdigits
+from functools import lru_cache
+from numbers import Integral
 from colorsys import rgb_to_hsv, hsv_to_rgb, rgb_to_hls, hls_to_rgb
 from math import floor, sin
 from .utils import clamp, randrange
@@ -109,11 +111,11 @@ class Color:
 
     def __init__(self, r=None, g=None, b=None, a=None):
         if isinstance(r, str):
-            self.r, self.g, self.b, self.a = str2color(r)
+            self.r, self.g, self.b, self.a = parse_color(r)
         elif isinstance(r, Color):
             self.r, self.g, self.b, self.a = r
         elif isinstance(r, int) and all((c is None for c in [g, b, a])):
-            self.r, self.g, self.b, self.a = int2color(r)
+            self.r, self.g, self.b, self.a = parse_color(r)
         elif isinstance(r, (tuple, list)):
             l = len(r)
             if l == 3:
@@ -354,13 +356,17 @@ def gray(shade, alpha=1.0):
     return Color(shade, shade, shade, alpha)
 
 
-def random_rgba(min_red, max_red, min_green, max_green, min_blue, max_blue, min_alpha=None, max_alpha=None):
+def random_rgba(min_red, max_red, min_green, max_green, min_blue, max_blue, min_alpha=None, max_alpha=None, rng=None):
     """Creates a random color using the passed in ranges for red, green, blue and alpha.
 
     All the color components here should go from 0.0 to 1.0.
 
     If ``min_alp`` and ``max_alp`` are left as ``None``, then alpha is simply set to 1.0.
 
+    Pass a :class:`random.Random` as ``rng``, like :attr:`glc.RenderList.rng`,
+    to get the same colors for the same seed. Otherwise the colors come
+    from the :mod:`random` module, and change on every run.
+
     Returns
     -------
     color : :class:`Color`
@@ -369,23 +375,27 @@ def random_rgba(min_red, max_red, min_green, max_green, min_blue, max_blue, min_
 
     alpha = 1.0
     if min_alpha is not None and max_alpha is not None:
-        alpha = randrange(min_alpha, max_alpha)
+        alpha = randrange(min_alpha, max_alpha, rng)
 
     return Color(
-        randrange(min_red, max_red),
-        randrange(min_green, max_green),
-        randrange(min_blue, max_blue),
+        randrange(min_red, max_red, rng),
+        randrange(min_green, max_green, rng),
+        randrange(min_blue, max_blue, rng),
         alpha
     )
 
 
-def random_gray(min_shade, max_shade, min_alpha=None, max_alpha=None):
+def random_gray(min_shade, max_shade, min_alpha=None, max_alpha=None, rng=None):
     """Creates a random shade of grey.
 
     All the color components here should go from 0.0 to 1.0.
 
     If ``min_alp`` and ``max_alp`` are left as ``None``, then alpha is simply set to 1.0.
 
+    Pass a :class:`random.Random` as ``rng``, like :attr:`glc.RenderList.rng`,
+    to get the same colors for the same seed. Otherwise the colors come
+    from the :mod:`random` module, and change on every run.
+
     Returns
     -------
     color : :class:`Color`
@@ -394,12 +404,12 @@ def random_gray(min_shade, max_shade, min_alpha=None, max_alpha=None):
 
     alpha = 1.0
     if min_alpha is not None and max_alpha is not None:
-        alpha = randrange(min_alpha, max_alpha)
+        alpha = randrange(min_alpha, max_alpha, rng)
 
-    return gray(randrange(min_shade, max_shade), alpha)
+    return gray(randrange(min_shade, max_shade, rng), alpha)
 
 
-def random_hsva(min_hue, max_hue, min_saturation, max_saturation, min_value, max_value, min_alpha=None, max_alpha=None):
+def random_hsva(min_hue, max_hue, min_saturation, max_saturation, min_value, max_value, min_alpha=None, max_alpha=None, rng=None):
     """Creates a random color using the passed in ranges for hue, saturation, value and alpha.
 
     All the color components here should go from 0.0 to 1.0,
@@ -407,6 +417,10 @@ def random_hsva(min_hue, max_hue, min_saturation, max_saturation, min_value, max
 
     If ``min_alp`` and ``max_alp`` are left as ``None``, then alpha is simply set to 1.0.
 
+    Pass a :class:`random.Random` as ``rng``, like :attr:`glc.RenderList.rng`,
+    to get the same colors for the same seed. Otherwise the colors come
+    from the :mod:`random` module, and change on every run.
+
     Returns
     -------
     color : :class:`Color`
@@ -415,12 +429,12 @@ def random_hsva(min_hue, max_hue, min_saturation, max_saturation, min_value, max
 
     alpha = 1.0
     if min_alpha is not None and max_alpha is not None:
-        alpha = randrange(min_alpha, max_alpha)
+        alpha = randrange(min_alpha, max_alpha, rng)
 
     return hsva(
-        randrange(min_hue, max_hue),
-        randrange(min_saturation, max_saturation),
-        randrange(min_value, max_value),
+        randrange(min_hue, max_hue, rng),
+        randrange(min_saturation, max_saturation, rng),
+        randrange(min_value, max_value, rng),
         alpha
     )
 
@@ -470,6 +484,45 @@ def int2color(color):
     return Color().set_int(color)
 
 
+# colors given as strings or integers are parsed once and then remembered
+# the cache is bounded, so colors generated on the fly can't grow it forever
+COLOR_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def _parse_hashable(value):
+    if isinstance(value, str):
+        return tuple(str2color(value))
+    return tuple(int2color(value))
+
+
+def parse_color(value):
+    """Parses a color, caching the result for strings and integers.
+
+    See :func:`str2color` and :func:`int2color` for the accepted values.
+    Sequences of 3 or 4 channels from 0.0 to 1.0, like lists, tuples or
+    numpy arrays, are taken as they are, since there's nothing to parse.
+
+    Returns
+    -------
+    (red, green, blue, alpha) : tuple with 4 floats
+    """
+    # numpy integers count as integers too
+    if isinstance(value, (str, Integral)):
+        return _parse_hashable(value)
+
+    channels = tuple(float(channel) for channel in value)
+    if len(channels) == 3:
+        return channels + (1.0,)
+    if len(channels) == 4:
+        return channels
+    raise ValueError("colors need 3 or 4 channels, got {}".format(len(channels)))
+
+
+parse_color.cache_info = _parse_hashable.cache_info
+parse_color.cache_clear = _parse_hashable.cache_clear
+
+
 def str2color(string):
     """Creates a color based on a string.
 
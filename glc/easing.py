@@ -12,6 +12,8 @@
 
 from math import pi, sin, cos, sqrt
 
+import numpy
+
 
 # all easing functions here are ease in-out
 # TODO: more control
@@ -108,3 +110,123 @@ EASING_FUNCTIONS = {
     "back": back,
     "elastic": elastic
 }
+
+
+# the same functions, over numpy arrays of t values
+# used to ease every frame of an animation at once
+
+
+def linear_array(t):
+    return numpy.array(t, numpy.float64)
+
+
+def sine_array(t):
+    t = t * pi
+    return 0.5 - numpy.cos(t) * 0.5
+
+
+def quadratic_array(t):
+    tt = 2 * t * t
+    return numpy.where(t <= 0.5, tt, -tt + (4 * t) - 1)
+
+
+def cubic_array(t):
+    tt = 2 * t - 2
+    return numpy.where(t <= 0.5, t * t * t * 4, 0.5 * (tt * tt * tt) + 1)
+
+
+def quartic_array(t):
+    tt = t - 1
+    return numpy.where(t <= 0.5, 8 * (t * t * t * t), -8 * (tt * tt * tt * tt) + 1)
+
+
+def quintic_array(t):
+    t = t * 2
+    tt = t - 2
+    return numpy.where(t < 1, (t * t * t * t * t) / 2, (tt * tt * tt * tt * tt + 2) / 2)
+
+
+def bounce_array(t):
+    a = 0.36363636363636365
+    b = 0.7272727272727273
+    c = 0.9
+
+    tt = t * t
+
+    return numpy.select(
+        [t < a, t < b, t < c],
+        [
+            7.5625 * tt,
+            9.075 * tt - 9.9 * t + 3.4,
+            12.066481994459833 * tt - 19.63545706371191 * t + 8.898060941828255
+        ],
+        10.8 * tt - 20.52 * t + 10.72
+    )
+
+
+def circular_array(t):
+    # each branch is only valid for its own half
+    with numpy.errstate(invalid="ignore"):
+        low = 0.5 * (1 - numpy.sqrt(1 - 4 * t * t))
+        high = 0.5 * (numpy.sqrt((3 - 2 * t) * (2 * t - 1)) + 1)
+    return numpy.where(t <= 0.5, low, high)
+
+
+def exponential_array(t):
+    eased = numpy.where(t <= 0.5, 0.5 * numpy.power(2.0, (20 * t) - 10), -0.5 * numpy.power(2.0, 10 - (t * 20)) + 1)
+    return numpy.where((t == 0) | (t == 1), t, eased)
+
+
+def back_array(t):
+    f = numpy.where(t <= 0.5, 2 * t, 1 - (2 * t - 1))
+    g = (f * f * f) - f * numpy.sin(f * pi)
+    return numpy.where(t <= 0.5, 0.5 * g, 0.5 * (1 - g) + 0.5)
+
+
+def elastic_array(t):
+    low = 0.5 * numpy.sin(13 * (pi * 0.5) * 2 * t) * numpy.power(2.0, 10 * (2 * t - 1))
+    high = 0.5 * numpy.sin(-13 * (pi * 0.5) * ((2 * t - 1) + 1)) * numpy.power(2.0, -10 * (2 * t - 1)) + 1
+    return numpy.where(t <= 0.5, low, high)
+
+
+ARRAY_EASING_FUNCTIONS = {
+    "linear": linear_array,
+    "sine": sine_array,
+    "quadratic": quadratic_array,
+    "cubic": cubic_array,
+    "quartic": quartic_array,
+    "quintic": quintic_array,
+    "bounce": bounce_array,
+    "circular": circular_array,
+    "exponential": exponential_array,
+    "back": back_array,
+    "elastic": elastic_array
+}
+
+
+def ease_array(ease, t):
+    """Applies an easing function to every value in an array.
+
+    Parameters
+    ----------
+    ease : callable or string
+        The name of one of the easing functions here, or a
+        function taking a single ``t``. Unknown names leave
+        the values as they are, like :meth:`Shape.interpolate` does.
+    t : numpy array
+        The values to ease.
+
+    Returns
+    -------
+    numpy array
+        The eased values, as floats.
+    """
+    t = numpy.asarray(t, numpy.float64)
+
+    if callable(ease):
+        return numpy.array([ease(value) for value in t.tolist()], numpy.float64).reshape(t.shape)
+
+    if ease in ARRAY_EASING_FUNCTIONS:
+        return ARRAY_EASING_FUNCTIONS[ease](t)
+
+    return t.copy()
@@ -0,0 +1,169 @@
+"""
+
+    glc.fonts
+    =========
+
+    Fonts and text layouts, made once and reused on every frame.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from .utils import LRUCache
+
+import cairo
+
+
+# how many scaled fonts and laid out strings are remembered
+FONT_CACHE_SIZE = 256
+LAYOUT_CACHE_SIZE = 1024
+
+# font sizes are rounded to multiples of this, so text with
+# an animated size only needs a few hundred layouts at most
+SIZE_STEP = 0.25
+
+
+def font_weight(weight):
+    """Returns the Cairo font weight for ``'bold'`` or ``'normal'``."""
+    if weight == "bold":
+        return cairo.FONT_WEIGHT_BOLD
+    return cairo.FONT_WEIGHT_NORMAL
+
+
+class TextLayout:
+
+    """The glyphs and measurements of a string in a given font.
+
+    Glyph positions start at the origin, so drawing the text is
+    just a call to ``context.glyph_path(layout.glyphs)``.
+
+    Parameters
+    ----------
+    scaled_font : :class:`cairo.ScaledFont`
+        The font to lay the text out with.
+    text : str
+        The text to lay out.
+
+    Attributes
+    ----------
+    font_extents : tuple
+        ``(ascent, descent, height, max_x_advance, max_y_advance)`` of the font.
+    extents : tuple
+        ``(x_bearing, y_bearing, width, height, x_advance, y_advance)`` of the text.
+    glyphs : list of :class:`cairo.Glyph`
+        The glyphs for the whole text.
+    chars : list of tuples
+        ``(char, glyphs, extents)`` for each character on its own,
+        each laid out at the origin.
+    """
+
+    __slots__ = ("font_extents", "extents", "glyphs", "chars")
+
+    def __init__(self, scaled_font, text):
+        self.font_extents = tuple(scaled_font.extents())
+        self.extents = tuple(scaled_font.text_extents(text))
+        self.glyphs = scaled_font.text_to_glyphs(0, 0, text, False)
+
+        chars = {}
+        for char in set(text):
+            chars[char] = (char, scaled_font.text_to_glyphs(0, 0, char, False), tuple(scaled_font.text_extents(char)))
+        self.chars = [chars[char] for char in text]
+
+
+class FontCache:
+
+    """Keeps font faces, scaled fonts and text layouts around.
+
+    Every :class:`RenderList` uses :data:`default_cache` unless told
+    otherwise, so all of their :class:`Text` shapes share it.
+
+    The scaled fonts are only used to lay text out. Drawing sets the
+    face and size instead, since the scaled font cairo draws with
+    depends on the current transformation, which usually changes
+    from frame to frame. Cairo keeps those around on its own.
+
+    Scaled fonts and layouts are dropped least recently used first.
+
+    Parameters
+    ----------
+    size_step : float
+        Font sizes are rounded to multiples of this before laying text out,
+        and the difference is made up by scaling when drawing. Text with an
+        animated size then keeps reusing a few layouts, instead of getting a
+        new one on every frame. 0 uses sizes as they are. Defaults to
+        :data:`SIZE_STEP`.
+    max_fonts : int
+        How many scaled fonts to keep. Defaults to :data:`FONT_CACHE_SIZE`.
+    max_layouts : int
+        How many layouts to keep. Defaults to :data:`LAYOUT_CACHE_SIZE`.
+    """
+
+    def __init__(self, size_step=SIZE_STEP, max_fonts=FONT_CACHE_SIZE, max_layouts=LAYOUT_CACHE_SIZE):
+        self.size_step = size_step
+
+        self._faces = {}
+        self._fonts = LRUCache(max_fonts)
+        self._layouts = LRUCache(max_layouts)
+
+    def bucket(self, size):
+        """Returns the size text of size ``size`` is laid out at. See ``size_step``."""
+        if not self.size_step:
+            return size
+        return max(self.size_step, round(size / self.size_step) * self.size_step)
+
+    def get_face(self, family, weight="normal", slant=cairo.FONT_SLANT_NORMAL):
+        """Returns the font face for a family, weight and slant.
+
+        Returns
+        -------
+        :class:`cairo.ToyFontFace`
+        """
+        key = (family, weight, slant)
+        face = self._faces.get(key)
+
+        if face is None:
+            face = self._faces[key] = cairo.ToyFontFace(family, slant, font_weight(weight))
+
+        return face
+
+    def get_scaled_font(self, family, weight, size, slant=cairo.FONT_SLANT_NORMAL):
+        """Returns a font of the given size, with no other transformations.
+
+        Good for measuring and laying out text, see :class:`TextLayout`.
+
+        Returns
+        -------
+        :class:`cairo.ScaledFont`
+        """
+        key = (family, weight, slant, size)
+        font = self._fonts.get(key)
+
+        if font is None:
+            face = self.get_face(family, weight, slant)
+            font = cairo.ScaledFont(face, cairo.Matrix(xx=size, yy=size), cairo.Matrix(), cairo.FontOptions())
+            self._fonts.put(key, font)
+
+        return font
+
+    def get_layout(self, family, weight, size, text):
+        """Returns the :class:`TextLayout` for ``text``, laying it out only if needed.
+
+        The size is used as it is, see :meth:`bucket`.
+        """
+        key = (family, weight, size, text)
+        layout = self._layouts.get(key)
+
+        if layout is None:
+            layout = TextLayout(self.get_scaled_font(family, weight, size), text)
+            self._layouts.put(key, layout)
+
+        return layout
+
+    def clear(self):
+        self._faces.clear()
+        self._fonts.clear()
+        self._layouts.clear()
+
+
+default_cache = FontCache()
@@ -11,14 +11,29 @@
 from subprocess import Popen, DEVNULL, PIPE
 from .config import IMAGEMAGICK_BINARY, FFMPEG_BINARY
 from .animation import Animation
+from .gif_encoder import GifWriter
+from .palette import Palette, sample_pixels
 from .utils import clamp
-from io import IOBase
+from io import IOBase, BytesIO
+from PIL import Image
 
 import os
+import sys
 import shlex
+import numpy
 import imageio
 
 
+# names for the ``quantizer`` option of the imageio converter.
+# 'wu' is kept for older scripts, imageio used median cut for it
+QUANTIZERS = {
+    "wu": Image.Quantize.MEDIANCUT,
+    "median_cut": Image.Quantize.MEDIANCUT,
+    "max_coverage": Image.Quantize.MAXCOVERAGE,
+    "fast_octree": Image.Quantize.FASTOCTREE
+}
+
+
 class Gif(Animation):
 
     """Animation rendered to a gif file.
@@ -33,17 +48,25 @@ class Gif(Animation):
         GIF palette size, should be a power of two, and in the 2-256 range.
         Defaults to 256.
     converter : str
-        The converter to use. Right now, there are three converters:
+        The converter to use. Right now, there are four converters:
         - ``'imagemagick'``
         - ``'imagemagick_tempfiles'``
         - ``'imageio'``
+        - ``'native'``
 
-        The ``imagemagick[_tempfiles]`` converters are the
-        only ones that support transparent gifs.
+        The ``imagemagick[_tempfiles]`` and ``native`` converters
+        are the only ones that support transparent gifs.
 
         Defaults to ``'imageio'``.
     converter_opts : dict
         Dictionary with extra options for the converters.
+    global_palette : bool
+        Whether every frame should use the same palette, built from
+        frames sampled across the whole animation. This avoids colors
+        flickering between frames. Only used by the ``imageio`` and
+        ``native`` converters, and since imageio gives every frame its
+        own colors, the ``native`` converter is used in place of
+        ``imageio`` when this is set. Defaults to ``False``.
     """
 
     def __init__(self, filename, *args, **kwargs):
@@ -57,6 +80,8 @@ class Gif(Animation):
         self.converter = kwargs.get("converter", "imageio")
         self.converter_opts = kwargs.get("converter_opts", dict())
 
+        self.global_palette = kwargs.get("global_palette", False)
+
     def set_converter_opts(self, **kwargs):
         """Sets the options for the current converter."""
         self.converter_opts.update(kwargs)
@@ -67,16 +92,31 @@ class Gif(Animation):
 
         Uses the specified converter, unless that doesn't exist,
         in which case imageio is the default.
+
+        With a ``render_cache`` set, a GIF that was already made from
+        the same scene and settings is reused instead of rendered again.
         """
         # TODO: add warning about this?
         if self.color_count not in (2, 4, 8, 16, 32, 64, 128, 256):
             self.color_count = 1 << (clamp(self.color_count, 2, 256) - 1).bit_length()
 
-        frames = self.render()
+        result = key = None
 
-        func_name = "save_with_%s" % self.converter.lower()
-        func = getattr(self, func_name, self.save_with_imageio)
-        result = func(frames)
+        if self.render_cache is not None:
+            key = self.scene_hash(
+                format="gif",
+                converter=self.converter.lower(),
+                converter_opts=self.converter_opts,
+                color_count=self.color_count,
+                global_palette=self.global_palette,
+                transparent=self.transparent
+            )
+            result = self.render_cache.load(key)
+
+        if result is None:
+            result = self.encode()
+            if key is not None:
+                self.render_cache.store(key, result)
 
         if isinstance(self.filename, IOBase):
             self.filename.write(result)
@@ -84,6 +124,72 @@ class Gif(Animation):
             with open(self.filename, "wb") as f:
                 f.write(result)
 
+    def encode(self):
+        """Renders and encodes this animation with the specified converter.
+
+        Returns
+        -------
+        The GIF file as bytes
+        """
+        func_name = "save_with_%s" % self.converter.lower()
+        func = getattr(self, func_name, self.save_with_imageio)
+
+        if func == self.save_with_imageio and self.global_palette:
+            # pillow gives every frame its own color table, so
+            # the shared palette only survives the built-in encoder
+            func = self.save_with_native
+
+        if func == self.save_with_imagemagick:
+            # ffmpeg can read cairo's pixel layout as is
+            result = func(self.iter_frames("bgra"), "bgra")
+        elif func == self.save_with_imagemagick_tempfiles:
+            # every frame is written out before the next one is rendered
+            result = func(self.iter_frames("rgba_reuse"))
+        elif func == self.save_with_native:
+            palette = self.build_palette() if self.global_palette else None
+            # the writer only compares the parts that were redrawn
+            result = func(self.iter_frames("rgba_reuse", regions=True), palette)
+        elif func == self.save_with_imageio:
+            # frames are quantized into copies as they come in
+            result = func(self.iter_frames("rgba_reuse"))
+        else:
+            result = func(self.iter_frames())
+
+        return result
+
+    def build_palette(self, frame_count=None):
+        """Builds a palette suited to every frame of this animation.
+
+        Only some of the frames, evenly spread over the animation,
+        are rendered to pick the colors from.
+
+        Parameters
+        ----------
+        frame_count : int
+            How many frames to look at. Defaults to the ``palette_frames``
+            converter option, or 16 if that's not set.
+
+        Returns
+        -------
+        palette : :class:`glc.palette.Palette`
+            Palette with at most ``color_count - 1`` colors,
+            leaving room for a transparent index.
+        """
+        if frame_count is None:
+            frame_count = self.converter_opts.get("palette_frames", 16)
+
+        times = self.frame_times()
+        times = times[::max(1, -(-len(times) // frame_count))]
+        max_samples = (1 << 17) // len(times)
+
+        # sample each frame as it's rendered instead of keeping them around
+        pixels = numpy.concatenate([
+            sample_pixels([self.render_list.render(t, frame_format="rgba_reuse")], max_samples)
+            for t in times
+        ])
+
+        return Palette.from_pixels(pixels, self.color_count - 1)
+
     def save_with_imagemagick_tempfiles(self, frames):
         """Writes this animation to a GIF file using ImageMagick, using temporary files.
 
@@ -92,8 +198,9 @@ class Gif(Animation):
 
         Parameters
         ----------
-        frames : list of numpy arrays
-            Container with the frames necessary to render this animation to a file.
+        frames : iterable of numpy arrays
+            The frames necessary to render this animation to a file.
+            They're consumed one at a time.
 
         Returns
         -------
@@ -136,7 +243,7 @@ class Gif(Animation):
 
         return out
 
-    def save_with_imagemagick(self, frames):
+    def save_with_imagemagick(self, frames, frame_format="rgba"):
         """Writes this animation to a GIF file using ImageMagick and FFmpeg.
 
         This converter supports transparent backgrounds.
@@ -144,8 +251,13 @@ class Gif(Animation):
 
         Parameters
         ----------
-        frames : list of numpy arrays
-            Container with the frames necessary to render this animation to a file.
+        frames : iterable of numpy arrays
+            The frames necessary to render this animation to a file.
+            They're consumed one at a time.
+        frame_format : str
+            The pixel layout of the frames, either ``'rgba'``
+            or ``'bgra'`` (see :class:`RenderList`).
+            Defaults to ``'rgba'``.
 
         Returns
         -------
@@ -164,6 +276,11 @@ class Gif(Animation):
 
         delay = 100.0 / self.fps
 
+        if frame_format == "bgra":
+            pix_fmt = "bgra" if sys.byteorder == "little" else "argb"
+        else:
+            pix_fmt = "rgba"
+
         # NOTE: for the last -vcodec, ppm or bmp works, png doesn't???
         # ppm is fine for non transparent stuff,
         # otherwise bmp is the one that works properly.
@@ -177,7 +294,7 @@ class Gif(Animation):
             "-vcodec", "rawvideo",
             "-r", "{:.02f}".format(self.fps),
             "-s", "{:d}x{:d}".format(self.w, self.h),
-            "-pix_fmt", "rgba",
+            "-pix_fmt", pix_fmt,
             "-i", "-",
             "-f", "image2pipe",
             "-vcodec", ("bmp" if self.transparent else "ppm"),
@@ -216,7 +333,7 @@ class Gif(Animation):
         im_process = Popen(im_command, **popen_kwargs)
 
         for frame in frames:
-            ffmpeg_process.stdin.write(frame.tostring())
+            ffmpeg_process.stdin.write(frame.data)
 
         ffmpeg_process.stdin.close()
         ffmpeg_process.wait()
@@ -230,20 +347,76 @@ class Gif(Animation):
 
         This converter does not support transparent backgrounds.
 
+        Each frame is quantized to ``color_count`` colors as it comes in,
+        with the ``quantizer`` converter option (one of :data:`QUANTIZERS`,
+        defaults to ``'wu'``). imageio writes every frame in one go, so the
+        quantized frames are kept until then.
+
         Parameters
         ----------
-        frames : list of numpy arrays
-            Container with the frames necessary to render this animation to a file.
+        frames : iterable of numpy arrays
+            The frames necessary to render this animation to a file.
+            They're consumed one at a time.
 
         Returns
         -------
         Image file as bytes
         """
-        return imageio.mimwrite(
-            "<bytes>",
-            ims=frames,
-            format="gif",
-            duration=1 / self.fps,
-            quantizer=self.converter_opts.get("quantizer", "wu"),
-            palettesize=self.color_count
+        method = QUANTIZERS[self.converter_opts.get("quantizer", "wu")]
+        quantized = []
+
+        for frame in frames:
+            image = Image.fromarray(numpy.ascontiguousarray(frame[..., :3]))
+            image = image.quantize(colors=self.color_count, method=method)
+            # pillow keeps the colors as they are, since there's few enough of them
+            quantized.append(numpy.asarray(image.convert("RGB")))
+
+        out = BytesIO()
+        imageio.mimwrite(
+            out,
+            quantized,
+            format="GIF",
+            duration=1000 / self.fps,
+            loop=self.converter_opts.get("loop", 0)
         )
+
+        return out.getvalue()
+
+    def save_with_native(self, frames, palette=None):
+        """Writes this animation to a GIF file using the built-in encoder.
+
+        This converter supports transparent backgrounds.
+        Only the parts of each frame that changed are stored,
+        and no external programs are needed.
+
+        Parameters
+        ----------
+        frames : iterable of numpy arrays
+            The frames necessary to render this animation to a file.
+            They're consumed one at a time. Can also be ``(frame, region)``
+            tuples, see :meth:`iter_frames`.
+        palette : :class:`glc.palette.Palette`
+            Palette to use for every frame. If ``None``, each frame
+            gets its own. Defaults to ``None``.
+
+        Returns
+        -------
+        Image file as bytes
+        """
+        out = BytesIO()
+        duration = 1 / self.fps
+
+        with GifWriter(
+            out, self.w, self.h,
+            color_count=self.color_count,
+            transparent=self.transparent,
+            loop=self.converter_opts.get("loop", 0),
+            palette=palette
+        ) as writer:
+            for frame in frames:
+                region = None
+                if isinstance(frame, tuple):
+                    frame, region = frame
+                writer.append(frame, duration, region)
+
+        return out.getvalue()
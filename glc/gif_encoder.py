@@ -0,0 +1,309 @@
+"""
+
+    glc.gif_encoder
+    ===============
+
+    Incremental GIF encoder.
+
+    Frames are written out as soon as they're appended.
+    Only the part of each frame that changed since the
+    previous one is stored. The pixel data itself is
+    compressed by Pillow.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from PIL import Image
+from .palette import exact_colors
+
+import struct
+import numpy
+
+
+# disposal methods
+# see https://www.w3.org/Graphics/GIF/spec-gif89a.txt (section 23)
+DISPOSE_NONE = 1
+DISPOSE_BACKGROUND = 2
+
+
+def _image_data(indices, min_code_size):
+    # Pillow's C encoder does the LZW compression, and already
+    # splits it into sub-blocks, all but the terminating one
+    image = Image.fromarray(numpy.ascontiguousarray(indices, numpy.uint8))
+    return image.tobytes("gif", "L", min_code_size, 0) + b"\x00"
+
+
+def _table_bits(count):
+    # a color table has 2 ** (n + 1) entries, n being 0 to 7
+    bits = 1
+    while (1 << bits) < count:
+        bits += 1
+    return bits
+
+
+def _color_table(palette, bits):
+    table = numpy.zeros((1 << bits, 3), numpy.uint8)
+    table[:len(palette)] = palette
+    return table.tobytes()
+
+
+def _changed(frame, previous):
+    # comparing whole pixels as 32-bit integers is a lot faster than comparing
+    # each channel, but needs the channels of a pixel to be next to each other
+    if frame.strides[-2:] == (4, 1) and previous.strides[-2:] == (4, 1):
+        return frame.view(numpy.uint32)[..., 0] != previous.view(numpy.uint32)[..., 0]
+    return (frame != previous).any(axis=2)
+
+
+def _bounding_box(mask):
+    rows = numpy.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    cols = numpy.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+class GifWriter:
+
+    """Writes frames to a GIF file as they come in.
+
+    Each frame is compared to the previous one, and only the
+    rectangle around the pixels that changed is stored.
+    Inside that rectangle, pixels that didn't change are
+    left transparent, which compresses a lot better.
+
+    If ``transparent`` is set, pixels with less than half
+    opacity become transparent, and every frame is cleared
+    before the next one is shown.
+
+    Parameters
+    ----------
+    file : file-like object
+        Where to write the GIF to. Must be opened in binary mode.
+    width : int
+        Width of the frames, in pixels.
+    height : int
+        Height of the frames, in pixels.
+    color_count : int
+        Maximum amount of colors per frame, from 2 to 256.
+        Defaults to 256.
+    transparent : bool
+        Whether the frames have a transparent background.
+        Defaults to ``False``.
+
+        Each frame is then stored whole, as the box around its
+        visible pixels, because the previous frame is cleared
+        before it's shown. Only frames that repeat the previous
+        one exactly are still merged.
+    loop : int
+        How many times the animation should repeat.
+        0 means forever. Defaults to 0.
+    palette : :class:`glc.palette.Palette`
+        Palette shared by every frame, written once as the global
+        color table. It can have at most 255 colors, as one more
+        index is needed for transparency. If ``None``, each frame
+        gets its own palette. Defaults to ``None``.
+    """
+
+    def __init__(self, file, width, height, color_count=256, transparent=False, loop=0, palette=None):
+        self.file = file
+        self.width = width
+        self.height = height
+        self.color_count = color_count
+        self.transparent = transparent
+        self.loop = loop
+        self.palette = palette
+
+        self._previous = None
+        self._pending = None
+        self._time = 0.0
+        self._written_delay = 0
+
+        self._write_header()
+
+    def _write_header(self):
+        self.file.write(b"GIF89a")
+
+        # logical screen descriptor
+        # 0x70 sets the color resolution to 8 bits per channel
+        if self.palette is None:
+            self.file.write(struct.pack("<HHBBB", self.width, self.height, 0x70, 0, 0))
+        else:
+            # the extra entry is for the transparent index
+            bits = _table_bits(len(self.palette) + 1)
+            self.file.write(struct.pack("<HHBBB", self.width, self.height, 0xf0 | (bits - 1), 0, 0))
+            self.file.write(_color_table(self.palette.colors, bits))
+
+        # NETSCAPE2.0 extension, for looping
+        self.file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01")
+        self.file.write(struct.pack("<HB", self.loop, 0))
+
+    def append(self, frame, duration, region=None):
+        """Adds a frame to the GIF.
+
+        Parameters
+        ----------
+        frame : numpy array
+            RGBA frame, with shape ``(height, width, 4)``.
+        duration : float
+            For how long the frame is shown, in seconds.
+        region : tuple
+            ``(x0, y0, x1, y1)`` box around everything that can differ
+            from the previous frame, like the one from
+            :meth:`glc.RenderList.get_dirty_box`. Only that part of the
+            frame is compared, instead of all of it. Defaults to ``None``,
+            which compares the whole frame.
+        """
+        self._time += duration
+
+        window = None
+        x_offset = y_offset = 0
+
+        if self._previous is None:
+            changed = numpy.ones(frame.shape[:2], bool)
+        elif region is None:
+            changed = _changed(frame, self._previous)
+        else:
+            x_offset, y_offset, x_end, y_end = region
+            window = (slice(y_offset, y_end), slice(x_offset, x_end))
+            changed = _changed(frame[window], self._previous[window])
+
+        if self._pending is not None and not changed.any():
+            # same as the previous frame, just show that one for longer
+            self._pending[-1] = self._time
+            return
+
+        if self.transparent:
+            visible = frame[:, :, 3] >= 128
+            if self._previous is None:
+                # some decoders paint whatever the first frame doesn't cover
+                # with an opaque background color, so cover everything
+                box = (0, 0, self.width, self.height)
+            else:
+                box = _bounding_box(visible) or (0, 0, 1, 1)
+            x0, y0, x1, y1 = box
+            opaque = visible[y0:y1, x0:x1]
+            disposal = DISPOSE_BACKGROUND
+        else:
+            x0, y0, x1, y1 = _bounding_box(changed)
+            opaque = changed[y0:y1, x0:x1]
+            x0, y0, x1, y1 = x0 + x_offset, y0 + y_offset, x1 + x_offset, y1 + y_offset
+            disposal = DISPOSE_NONE
+
+        # disposing of a frame restores its area to the transparent color,
+        # so transparent animations need one on every frame
+        indices, palette, transparent_index = self.quantize(frame[y0:y1, x0:x1, :3], opaque, self.transparent)
+
+        self._flush()
+        self._pending = [(x0, y0, x1 - x0, y1 - y0), indices, palette, transparent_index, disposal, self._time]
+
+        # the copy matters, frames might be reused by whoever renders them
+        if window is None:
+            self._previous = frame.copy()
+        else:
+            self._previous[window] = frame[window]
+
+    def quantize(self, pixels, opaque, keep_transparent=False):
+        """Maps the RGB ``pixels`` where ``opaque`` is set to a palette.
+
+        A color index is reserved for transparency if any pixel
+        is not opaque, or if ``keep_transparent`` is set.
+
+        Returns
+        -------
+        (indices, palette, transparent_index) : tuple
+            A 2D array of color indices, the palette as an ``(n, 3)``
+            array (``None`` when using the global palette), and the
+            index used for the other pixels (``None`` if every pixel is opaque).
+        """
+        all_opaque = opaque.all() and not keep_transparent
+
+        if self.palette is not None:
+            indices = self.palette.map(pixels)
+            if all_opaque:
+                return indices, None, None
+            transparent_index = len(self.palette)
+            indices[~opaque] = transparent_index
+            return indices, None, transparent_index
+
+        colors = pixels[opaque]
+        max_colors = self.color_count if all_opaque else self.color_count - 1
+
+        # frames with few colors keep them exactly, octree quantizing could shift them
+        exact = exact_colors(colors, max_colors) if len(colors) else None
+
+        if exact is not None:
+            color_indices, palette = exact
+        elif len(colors):
+            image = Image.fromarray(colors.reshape(1, -1, 3))
+            # 2 is the fast octree method
+            quantized = image.quantize(max_colors, method=2)
+            color_indices = numpy.asarray(quantized, numpy.uint8).reshape(-1)
+            used = int(color_indices.max()) + 1
+            palette = numpy.array(quantized.getpalette()[:used * 3], numpy.uint8).reshape(-1, 3)
+        else:
+            color_indices = numpy.zeros(0, numpy.uint8)
+            palette = numpy.zeros((1, 3), numpy.uint8)
+
+        if all_opaque:
+            return color_indices.reshape(opaque.shape), palette, None
+
+        transparent_index = len(palette)
+        indices = numpy.full(opaque.shape, transparent_index, numpy.uint8)
+        indices[opaque] = color_indices
+        palette = numpy.concatenate((palette, numpy.zeros((1, 3), numpy.uint8)))
+
+        return indices, palette, transparent_index
+
+    def _flush(self):
+        if self._pending is None:
+            return
+
+        rect, indices, palette, transparent_index, disposal, end_time = self._pending
+        self._pending = None
+
+        # in hundredths of a second, carrying the rounding over to the next frame
+        end_delay = int(round(end_time * 100))
+        delay = end_delay - self._written_delay
+        self._written_delay = end_delay
+
+        packed = disposal << 2
+        if transparent_index is not None:
+            packed |= 1
+
+        # graphic control extension
+        self.file.write(b"\x21\xf9\x04")
+        self.file.write(struct.pack("<BHBB", packed, delay, transparent_index or 0, 0))
+
+        # image descriptor, with a local color table if needed
+        self.file.write(b"\x2c")
+
+        if palette is None:
+            bits = _table_bits(len(self.palette) + 1)
+            self.file.write(struct.pack("<HHHHB", rect[0], rect[1], rect[2], rect[3], 0))
+        else:
+            bits = _table_bits(len(palette))
+            self.file.write(struct.pack("<HHHHB", rect[0], rect[1], rect[2], rect[3], 0x80 | (bits - 1)))
+            self.file.write(_color_table(palette, bits))
+
+        min_code_size = max(2, bits)
+        self.file.write(bytes((min_code_size,)))
+        self.file.write(_image_data(indices, min_code_size))
+
+    def close(self):
+        """Writes the last frame and ends the GIF.
+
+        Doesn't close the underlying file.
+        """
+        self._flush()
+        self.file.write(b"\x3b")
+
+    # context management
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
@@ -11,9 +11,14 @@
 from .animation import Animation
 
 import os
+import json
 import imageio
 
 
+def _frame_key(key, index):
+    return '{}-{:06d}'.format(key, index)
+
+
 class ImageSequence(Animation):
 
     """Animation rendered to a sequence of image files.
@@ -53,25 +58,78 @@ class ImageSequence(Animation):
     def save(self):
         """Saves this animation to disk as a sequence of image files.
 
+        With a ``render_cache`` set, each encoded frame is stored in it,
+        along with a manifest saying how many there are. Saving the same
+        scene with the same settings again just writes those out.
+
         Returns
         -------
         List with the paths of the generated files.
         """
+        key = encoded = None
+
+        if self.render_cache is not None:
+            key = self.scene_hash(format=self.format.lower(), converter=self.converter.lower())
+            encoded = self.load_cached(key)
+
+        cached = encoded is not None
+        if not cached:
+            encoded = self.encode_frames()
+
         paths = []
-        frames = self.render()
-        func_name = 'save_with_%s' % self.converter.lower()
-        func = getattr(self, func_name, self.save_with_imageio)
 
-        for index, frame in enumerate(frames):
+        for index, data in enumerate(encoded):
             path = self.filename_pattern.format(frame=index)
 
             with open(path, 'wb') as f:
-                f.write(func(frame))
+                f.write(data)
+
+            if key is not None and not cached:
+                self.render_cache.store(_frame_key(key, index), data)
 
             paths.append(os.path.abspath(path))
 
+        # written last, so it's only there if every frame is
+        if key is not None and not cached:
+            self.render_cache.store(key, json.dumps({'frames': len(paths)}).encode('utf-8'))
+
         return paths
 
+    def encode_frames(self):
+        """Renders and encodes the frames of this animation one at a time.
+
+        Yields
+        ------
+        Each image file as bytes
+        """
+        # every frame is written out before the next one is rendered
+        frames = self.iter_frames("rgba_reuse")
+        func_name = 'save_with_%s' % self.converter.lower()
+        func = getattr(self, func_name, self.save_with_imageio)
+
+        for frame in frames:
+            yield func(frame)
+
+    def load_cached(self, key):
+        """Returns the encoded frames stored in the render cache under ``key``.
+
+        Returns
+        -------
+        list of bytes, or ``None`` if any of them is missing
+        """
+        manifest = self.render_cache.load(key)
+        if manifest is None:
+            return None
+
+        encoded = []
+        for index in range(json.loads(manifest.decode('utf-8'))['frames']):
+            data = self.render_cache.load(_frame_key(key, index))
+            if data is None:
+                return None
+            encoded.append(data)
+
+        return encoded
+
     def save_with_imageio(self, frame):
         """Encodes the given frame to an image file using imageio.
 
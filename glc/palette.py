@@ -0,0 +1,356 @@
+"""
+
+    glc.palette
+    ===========
+
+    Building one color palette for a whole animation,
+    and mapping frames to it.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+import numpy
+
+
+# bits per channel used by the lookup table
+# 5 bits means 32 * 32 * 32 cells
+LUT_BITS = 5
+
+
+def sample_pixels(frames, max_samples=1 << 17):
+    """Picks pixels from the given frames, evenly spread out over all of them.
+
+    Pixels that are less than half opaque are left out.
+
+    Parameters
+    ----------
+    frames : list of numpy arrays
+        RGBA frames.
+    max_samples : int
+        Roughly how many pixels to pick, at most.
+
+    Returns
+    -------
+    numpy array
+        The picked RGB colors, with shape ``(n, 3)``.
+    """
+    if not frames:
+        return numpy.zeros((0, 3), numpy.uint8)
+
+    height, width = frames[0].shape[:2]
+    per_frame = max(1, max_samples // len(frames))
+    step = max(1, int((height * width / per_frame) ** 0.5))
+
+    samples = []
+    for frame in frames:
+        pixels = frame[::step, ::step].reshape(-1, 4)
+        samples.append(pixels[pixels[:, 3] >= 128, :3])
+
+    return numpy.concatenate(samples)
+
+
+def median_cut(pixels, color_count):
+    """Finds up to ``color_count`` colors that represent ``pixels`` well.
+
+    The colors are split into boxes, always cutting the box with the
+    biggest spread in half, at the median of its widest channel.
+    Each box then becomes the average of its colors.
+
+    Parameters
+    ----------
+    pixels : numpy array
+        RGB colors, with shape ``(n, 3)``.
+    color_count : int
+        The maximum amount of colors.
+
+    Returns
+    -------
+    numpy array
+        The palette, with shape ``(k, 3)`` and ``k <= color_count``.
+    """
+    pixels = numpy.asarray(pixels, numpy.uint8).reshape(-1, 3)
+
+    if not len(pixels):
+        return numpy.zeros((1, 3), numpy.uint8)
+
+    unique = numpy.unique(pixels, axis=0)
+    if len(unique) <= color_count:
+        return unique
+
+    def channel_ranges(box):
+        return box.max(axis=0).astype(int) - box.min(axis=0)
+
+    boxes = [pixels]
+    ranges = [channel_ranges(pixels)]
+
+    while len(boxes) < color_count:
+        # cut the box with the widest channel range, weighted by its size
+        scores = [r.max() * len(box) for r, box in zip(ranges, boxes)]
+        index = int(numpy.argmax(scores))
+
+        if scores[index] <= 0:
+            break
+
+        box = boxes.pop(index)
+        channel = int(numpy.argmax(ranges.pop(index)))
+        order = numpy.argsort(box[:, channel], kind="stable")
+        half = len(box) // 2
+
+        for part in (box[order[:half]], box[order[half:]]):
+            boxes.append(part)
+            ranges.append(channel_ranges(part))
+
+    return numpy.array([box.mean(axis=0) for box in boxes]).round().astype(numpy.uint8)
+
+
+def nearest_colors(pixels, palette, chunk_size=4096):
+    """Returns the index of the closest palette color for each pixel.
+
+    Parameters
+    ----------
+    pixels : numpy array
+        RGB colors, with shape ``(n, 3)``.
+    palette : numpy array
+        The palette, with shape ``(k, 3)``.
+
+    Returns
+    -------
+    numpy array
+        ``n`` indices into the palette.
+    """
+    pixels = numpy.asarray(pixels, numpy.float64).reshape(-1, 3)
+    palette = numpy.asarray(palette, numpy.float64)
+    out = numpy.empty(len(pixels), numpy.intp)
+
+    # |p - c|^2 = |p|^2 - 2 p.c + |c|^2, and |p|^2 doesn't change which c is closest
+    # so the whole thing becomes one matrix product per chunk
+    palette_norms = (palette * palette).sum(axis=1)
+
+    for start in range(0, len(pixels), chunk_size):
+        chunk = pixels[start:start + chunk_size]
+        distances = palette_norms - 2 * (chunk @ palette.T)
+        out[start:start + chunk_size] = distances.argmin(axis=1)
+
+    return out
+
+
+def pack_colors(pixels):
+    """Packs RGB colors into single integers, so they can be sorted and compared quickly.
+
+    Parameters
+    ----------
+    pixels : numpy array
+        Array of pixels, with the channels in the last axis.
+        Only the first three channels are used.
+
+    Returns
+    -------
+    numpy array
+        ``uint32`` keys, with the shape of ``pixels`` minus its last axis.
+    """
+    pixels = numpy.asarray(pixels, numpy.uint8)
+    return (
+        (pixels[..., 0].astype(numpy.uint32) << 16) |
+        (pixels[..., 1].astype(numpy.uint32) << 8) |
+        pixels[..., 2]
+    )
+
+
+def unpack_colors(keys):
+    """Turns keys made by :func:`pack_colors` back into RGB colors, with shape ``(n, 3)``."""
+    keys = numpy.asarray(keys, numpy.uint32).reshape(-1, 1)
+    return ((keys >> numpy.array([16, 8, 0], numpy.uint32)) & 0xff).astype(numpy.uint8)
+
+
+def exact_colors(pixels, color_count):
+    """Maps pixels to a palette of their own colors, if there are few enough of them.
+
+    Parameters
+    ----------
+    pixels : numpy array
+        Array of pixels, with the channels in the last axis.
+        Only the first three channels are used.
+    color_count : int
+        The maximum amount of colors.
+
+    Returns
+    -------
+    (indices, palette) : tuple
+        ``uint8`` indices with the shape of ``pixels`` minus its last axis,
+        and the palette as an ``(n, 3)`` array. ``None`` if the pixels
+        have more than ``color_count`` different colors.
+    """
+    keys, inverse = numpy.unique(pack_colors(pixels), return_inverse=True)
+    if len(keys) > color_count:
+        return None
+    indices = inverse.astype(numpy.uint8).reshape(pixels.shape[:-1])
+    return indices, unpack_colors(keys)
+
+
+def refine(pixels, palette, iterations=2):
+    """Improves a palette with a few rounds of k-means.
+
+    Every palette color moves to the average of the pixels closest to it.
+    Colors that no pixel is closest to are left where they are.
+    """
+    pixels = numpy.asarray(pixels, numpy.uint8).reshape(-1, 3)
+    palette = palette.astype(numpy.float64)
+
+    for _ in range(iterations):
+        nearest = nearest_colors(pixels, palette.round())
+        counts = numpy.bincount(nearest, minlength=len(palette))
+        used = counts > 0
+
+        for channel in range(3):
+            sums = numpy.bincount(nearest, pixels[:, channel], minlength=len(palette))
+            palette[used, channel] = sums[used] / counts[used]
+
+    return palette.round().astype(numpy.uint8)
+
+
+class Palette:
+
+    """A fixed set of colors, with a fast way of mapping pixels to them.
+
+    Pixels are mapped through a lookup table with one cell for
+    every combination of the top :data:`LUT_BITS` bits of each
+    channel, so mapping a frame is mostly just indexing into it.
+
+    A cell only has one answer for all of its colors when no palette
+    color falls inside it. Pixels in the other cells are looked up
+    exactly instead, so palette colors always map to themselves, and
+    close palette colors in the same cell are still told apart.
+
+    Parameters
+    ----------
+    colors : numpy array
+        The palette, with shape ``(k, 3)`` and ``k <= 256``.
+
+    Attributes
+    ----------
+    colors : numpy array
+        The palette colors.
+    lut : numpy array
+        Index of the closest palette color for each cell.
+    occupied : numpy array
+        Whether each cell has a palette color in it.
+    """
+
+    def __init__(self, colors):
+        self.colors = numpy.asarray(colors, numpy.uint8).reshape(-1, 3)
+
+        size = 1 << LUT_BITS
+        shift = 8 - LUT_BITS
+        # the center of each cell stands in for every color in it
+        levels = (numpy.arange(size) << shift) + (1 << shift >> 1)
+        cells = numpy.stack(numpy.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+        self.lut = nearest_colors(cells, self.colors).astype(numpy.uint8).reshape(size, size, size)
+
+        self.occupied = numpy.zeros((size, size, size), bool)
+        self.occupied[tuple((self.colors >> shift).T)] = True
+
+        # sorted keys of the palette colors, for finding exact matches
+        keys = pack_colors(self.colors)
+        self._key_order = numpy.argsort(keys, kind="stable").astype(numpy.uint8)
+        self._keys = keys[self._key_order]
+
+    @classmethod
+    def from_frames(cls, frames, color_count=256, max_samples=1 << 17, iterations=2):
+        """Builds a palette that suits all of the given frames.
+
+        Parameters
+        ----------
+        frames : list of numpy arrays
+            RGBA frames to pick colors from.
+            These can be just some of the frames of an animation.
+        color_count : int
+            The maximum amount of colors. Defaults to 256.
+        max_samples : int
+            Roughly how many pixels to look at, at most.
+        iterations : int
+            Rounds of refinement after the median cut. Defaults to 2.
+
+        Returns
+        -------
+        palette : :class:`Palette`
+        """
+        return cls.from_pixels(sample_pixels(frames, max_samples), color_count, iterations)
+
+    @classmethod
+    def from_pixels(cls, pixels, color_count=256, iterations=2):
+        """Builds a palette for the given RGB colors.
+
+        See :meth:`from_frames` for the parameters.
+
+        Returns
+        -------
+        palette : :class:`Palette`
+        """
+        colors = median_cut(pixels, color_count)
+        if len(colors) == color_count and iterations:
+            colors = refine(pixels, colors, iterations)
+        return cls(colors)
+
+    def map(self, pixels):
+        """Returns the palette index for each of the given RGB(A) pixels.
+
+        Parameters
+        ----------
+        pixels : numpy array
+            Array of pixels, with the channels in the last axis.
+            Only the first three channels are used.
+
+        Returns
+        -------
+        numpy array
+            Array of ``uint8`` indices, with the shape of ``pixels``
+            minus its last axis.
+        """
+        shift = 8 - LUT_BITS
+        cells = (pixels[..., 0] >> shift, pixels[..., 1] >> shift, pixels[..., 2] >> shift)
+        indices = self.lut[cells]
+
+        occupied = self.occupied[cells]
+        if occupied.any():
+            indices[occupied] = self.map_exact(pixels[occupied])
+
+        return indices
+
+    def map_exact(self, pixels):
+        """Like :meth:`map`, but without the lookup table.
+
+        Pixels that are exactly a palette color get that color,
+        and every other distinct color is compared against the
+        whole palette once. Slower, but never off.
+
+        Parameters
+        ----------
+        pixels : numpy array
+            Pixels with shape ``(n, 3)`` or ``(n, 4)``.
+
+        Returns
+        -------
+        numpy array
+            ``n`` indices, as ``uint8``.
+        """
+        keys = pack_colors(pixels)
+        positions = numpy.searchsorted(self._keys, keys).clip(0, len(self._keys) - 1)
+        indices = self._key_order[positions]
+
+        misses = self._keys[positions] != keys
+        if misses.any():
+            missed, inverse = numpy.unique(keys[misses], return_inverse=True)
+            indices[misses] = nearest_colors(unpack_colors(missed), self.colors)[inverse]
+
+        return indices
+
+    def apply(self, pixels):
+        """Replaces every pixel with its palette color, keeping any alpha channel."""
+        out = numpy.array(pixels, numpy.uint8)
+        out[..., :3] = self.colors[self.map(pixels)]
+        return out
+
+    def __len__(self):
+        return len(self.colors)
@@ -0,0 +1,341 @@
+"""
+
+    glc.profiling
+    =============
+
+    Finding out where rendering time goes.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from collections import defaultdict
+from time import perf_counter
+
+import json
+import threading
+
+
+# what each timed shape method counts as
+# draw is whatever drawing a shape does besides reading
+# properties and painting, which is mostly building its path
+SHAPE_METHODS = {
+    "render": "other",
+    "start_draw": "state",
+    "draw": "path",
+    "end_draw": "path",
+    "draw_fill_and_stroke": "paint",
+    "get_number": "props",
+    "get_color": "props",
+    "get_string": "props",
+    "get_bool": "props",
+    "get_array": "props",
+    "get_point_array": "props",
+    "get_image": "props",
+    "get_cairo_constant": "props",
+    "get_instances": "props",
+    "get_instance_colors": "props",
+    "get_evaluator": "props"
+}
+
+CATEGORIES = ("props", "state", "path", "paint", "other")
+
+
+class Profiler:
+
+    """Times rendering, frame by frame and shape by shape.
+
+    Attaching a profiler to an animation (or a render list) replaces
+    some of the methods of the render list and its shapes, on those
+    objects only, with versions that time themselves. Nothing is timed
+    until then, so there's no cost when profiling isn't used.
+
+    Times are split into:
+
+    - ``props``: reading properties (``get_number``, ``get_color``, ...),
+      including calls to the compiled evaluators from ``get_evaluator``.
+    - ``state``: setting up the context before drawing (``start_draw``).
+    - ``path``: the rest of ``draw``, mostly building paths.
+    - ``paint``: filling and stroking (``draw_fill_and_stroke``).
+    - ``other``: everything else in ``render``.
+
+    Times don't include the methods called inside them, so they add up.
+    Shapes that fill or stroke on their own, without
+    ``draw_fill_and_stroke``, count their painting under ``path``.
+
+    For every frame there's also the total render time and the time
+    spent converting it to the requested format. For animations, the
+    time the converter spends on each frame is recorded as encoding.
+
+    Only frames rendered in this process are seen, so profiling
+    should be done with ``workers`` set to 1.
+
+    .. code-block:: python
+
+        profiler = Profiler().attach(gif)
+        gif.save()
+        profiler.detach()
+        profiler.save_json("profile.json")
+        profiler.save_folded("profile.folded")
+
+    Attributes
+    ----------
+    frames : list of dicts
+        ``{"t", "total", "convert"}`` for each rendered frame, in seconds.
+    encode : list of floats
+        Time spent by the converter on each frame, in seconds.
+    shapes : dict
+        For each shape, its type, how often it was rendered,
+        and the time spent on each category. Shapes are named
+        after their type and the order they were first seen
+        in, like ``Circle#0``.
+    stacks : dict
+        Time spent in each call stack, like ``('frame', 'Circle#0', 'draw')``.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._patched = []
+        self._instrumented = set()
+        self._shape_count = 0
+        self.clear()
+
+    def clear(self):
+        """Forgets everything recorded so far."""
+        self.frames = []
+        self.encode = []
+        self.shapes = {}
+        self.stacks = defaultdict(float)
+
+    def _stack(self):
+        # rendering ahead happens on another thread
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # attaching
+
+    def attach(self, target):
+        """Starts timing an :class:`Animation` or a :class:`RenderList`.
+
+        Shapes added later are picked up on the next frame.
+
+        Returns
+        -------
+        self : :class:`Profiler`
+            For method chaining.
+        """
+        render_list = getattr(target, "render_list", target)
+
+        if render_list is not target:
+            self._wrap_iter_frames(target)
+
+        self._wrap_render(render_list)
+        self._wrap(render_list, "get_frame", "convert", "convert")
+        return self
+
+    def detach(self):
+        """Puts back every method that was replaced. What was recorded is kept."""
+        for obj, name in reversed(self._patched):
+            obj.__dict__.pop(name, None)
+
+        self._patched = []
+        self._instrumented = set()
+        self._shape_count = 0
+
+    def _patch(self, obj, name, func):
+        obj.__dict__[name] = func
+        self._patched.append((obj, name))
+
+    def _wrap(self, obj, name, label, category, record=None):
+        self._patch(obj, name, self._timed(getattr(obj, name), label, category, record))
+
+    def _wrap_get_evaluator(self, shape, record):
+        get_evaluator = self._timed(shape.get_evaluator, "get_evaluator", "props", record)
+
+        # shapes can call evaluators on their own, outside of the get_* methods
+        def timed_get_evaluator(*args, **kwargs):
+            evaluator = get_evaluator(*args, **kwargs)
+            if evaluator is None:
+                return None
+            return self._timed(evaluator, "evaluate", "props", record)
+
+        self._patch(shape, "get_evaluator", timed_get_evaluator)
+
+    def _timed(self, func, label, category, record=None):
+        stack_of = self._stack
+
+        def timed(*args, **kwargs):
+            stack = stack_of()
+            # name, category, record, time spent in calls inside this one
+            entry = [label, category, record, 0.0]
+            stack.append(entry)
+            start = perf_counter()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stack.pop()
+                self._add(stack, entry, elapsed)
+
+        return timed
+
+    def _add(self, stack, entry, elapsed):
+        label, category, record, inner = entry
+        own = elapsed - inner
+
+        if stack:
+            stack[-1][3] += elapsed
+
+        path = tuple(e[0] for e in stack) + (label,)
+        self.stacks[path] += own
+
+        if record is not None:
+            record[category] += own
+            # render is the only method that counts as other
+            if category == "other":
+                record["calls"] += 1
+        elif category == "convert" and self.frames:
+            self.frames[-1]["convert"] += elapsed
+
+    def _wrap_render(self, render_list):
+        render = render_list.render
+        stack_of = self._stack
+
+        def timed_render(t, *args, **kwargs):
+            self._instrument(render_list.shapes)
+
+            stack = stack_of()
+            frame = {"t": t, "total": 0.0, "convert": 0.0}
+            self.frames.append(frame)
+
+            entry = ["frame", "other", None, 0.0]
+            stack.append(entry)
+            start = perf_counter()
+
+            try:
+                return render(t, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stack.pop()
+                frame["total"] = elapsed
+                self._add(stack, entry, elapsed)
+
+        self._patch(render_list, "render", timed_render)
+
+    def _instrument(self, shapes):
+        for shape in shapes:
+            if shape not in self._instrumented:
+                self._instrumented.add(shape)
+                self._instrument_shape(shape)
+            self._instrument(shape.shapes)
+
+    def _instrument_shape(self, shape):
+        # counted here, since rng_index isn't unique for shapes
+        # made outside of a render list, or from different ones
+        name = "{}#{}".format(type(shape).__name__, self._shape_count)
+        self._shape_count += 1
+        record = self.shapes.get(name)
+
+        if record is None:
+            record = self.shapes[name] = dict.fromkeys(CATEGORIES, 0.0)
+            record["type"] = type(shape).__name__
+            record["calls"] = 0
+
+        for method, category in SHAPE_METHODS.items():
+            if not hasattr(shape, method):
+                continue
+            # the shape's own name goes on the stack instead of "render",
+            # so stacks read like "frame;Circle#0;draw"
+            label = name if method == "render" else method
+            if method == "get_evaluator":
+                self._wrap_get_evaluator(shape, record)
+            else:
+                self._wrap(shape, method, label, category, record)
+
+    def _wrap_iter_frames(self, animation):
+        iter_frames = animation.iter_frames
+
+        def timed_iter_frames(*args, **kwargs):
+            frames = iter_frames(*args, **kwargs)
+            try:
+                for frame in frames:
+                    # whoever asked for the frame is busy with
+                    # it until it asks for the next one
+                    start = perf_counter()
+                    yield frame
+                    self.encode.append(perf_counter() - start)
+            finally:
+                frames.close()
+
+        self._patch(animation, "iter_frames", timed_iter_frames)
+
+    # results
+
+    def types(self):
+        """Returns the times of every shape, added up by shape type.
+
+        Returns
+        -------
+        dict
+        """
+        types = {}
+        for record in self.shapes.values():
+            total = types.setdefault(record["type"], dict.fromkeys(CATEGORIES, 0.0))
+            total.setdefault("calls", 0)
+            total.setdefault("shapes", 0)
+            total["shapes"] += 1
+            total["calls"] += record["calls"]
+            for category in CATEGORIES:
+                total[category] += record[category]
+        return types
+
+    def to_dict(self):
+        """Returns everything recorded, ready to be turned into JSON.
+
+        Times are in seconds.
+        """
+        frames = self.frames
+        return {
+            "frame_count": len(frames),
+            "render_total": sum(f["total"] for f in frames),
+            "convert_total": sum(f["convert"] for f in frames),
+            "encode_total": sum(self.encode),
+            "frames": frames,
+            "encode": self.encode,
+            "types": self.types(),
+            "shapes": self.shapes
+        }
+
+    def to_json(self, **kwargs):
+        """Returns :meth:`to_dict` as a JSON string. ``kwargs`` go to ``json.dumps``."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_json(indent=2))
+
+    def folded(self):
+        """Returns the call stacks in the folded format flame graph tools read.
+
+        One line per stack, like ``frame;Circle#0;draw;get_number 1234``,
+        with the time spent in it in microseconds. Encoding shows up
+        as its own ``encode`` stack.
+
+        Returns
+        -------
+        str
+        """
+        lines = []
+        for path, seconds in sorted(self.stacks.items()):
+            lines.append("{} {}".format(";".join(path), int(round(seconds * 1e6))))
+        if self.encode:
+            lines.append("encode {}".format(int(round(sum(self.encode) * 1e6))))
+        return "\n".join(lines) + "\n"
+
+    def save_folded(self, path):
+        with open(path, "w") as f:
+            f.write(self.folded())
@@ -0,0 +1,394 @@
+"""
+
+    glc.render_cache
+    ================
+
+    Remembering encoded animations, so the same scene
+    is only ever rendered once.
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from abc import ABC, abstractmethod
+from hashlib import sha256
+from types import FunctionType, MethodType, CodeType, ModuleType, BuiltinFunctionType
+from functools import partial
+from .shapes import Shape
+from .color import Color
+from .atlas import Atlas, AtlasRegion
+from .assets import AssetCache, LazyFrames
+from .fonts import FontCache
+from .utils import is_emoji
+
+import os
+import cairo
+import numpy
+
+
+# props the render list hands to shapes that only hold caches,
+# and don't change what gets drawn
+IGNORED_PROPS = ("parent", "emoji_cache", "atlas")
+
+# props holding paths to files, which are hashed by their contents
+PATH_PROPS = ("img",)
+
+# only change how fast things are drawn
+_CACHES = (AssetCache, Atlas)
+
+
+class SceneHasher:
+
+    """Computes a hash of everything that decides what an animation looks like.
+
+    Values are fed to a SHA-256 hash along with their type, so ``1`` and
+    ``'1'`` hash differently. Shapes are hashed by their class, properties,
+    easing and children. Functions are hashed by their bytecode, constants,
+    default arguments, the variables they close over and the globals they use,
+    so editing a lambda changes the hash. Surfaces are hashed by their pixels.
+    Paths to files are hashed by the file contents, but only in the props
+    listed in :data:`PATH_PROPS` and for lazily loaded images, since other
+    strings just happening to name a file doesn't make them one. Text with
+    an ``emoji_path`` hashes the emoji images it uses, and font caches are
+    hashed by their ``size_step``, since that changes how text is laid out.
+
+    Objects that can't be looked into are hashed by their ``repr``. That
+    usually includes their memory address, so at worst they cause a cache
+    miss, never a wrong hit.
+    """
+
+    def __init__(self):
+        self._hash = sha256()
+        self._seen = {}
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def known(self, value, name):
+        """Hashes references to ``value`` as just ``name``.
+
+        For objects whose contents are hashed some other way,
+        like the animation that functions in the scene might refer to.
+        """
+        self._seen[id(value)] = (value, name)
+
+    def write(self, tag, data=b""):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._hash.update(tag.encode("ascii"))
+        self._hash.update(len(data).to_bytes(8, "little"))
+        self._hash.update(data)
+
+    def update(self, value):
+        """Adds a value to the hash. Returns self."""
+        if value is None or isinstance(value, (bool, int, float, complex)):
+            self.write(type(value).__name__, repr(value))
+            return self
+
+        if isinstance(value, str):
+            self.write("str", value)
+            return self
+
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            self.write("bytes", bytes(value))
+            return self
+
+        # shared and circular references (shapes with parents,
+        # closures over the render list) are only hashed once
+        seen = self._seen.get(id(value))
+        if seen is not None and seen[0] is value:
+            self.write("ref", str(seen[1]))
+            return self
+        self._seen[id(value)] = (value, len(self._seen))
+
+        if isinstance(value, numpy.ndarray):
+            self.write("ndarray", "{}{}".format(value.dtype.str, value.shape))
+            self.write("data", numpy.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (list, tuple)):
+            self.write(type(value).__name__, str(len(value)))
+            for item in value:
+                self.update(item)
+        elif isinstance(value, dict):
+            self.update_dict(value)
+        elif isinstance(value, (set, frozenset)):
+            self.write("set", str(len(value)))
+            for digest in sorted(SceneHasher().update(item).hexdigest() for item in value):
+                self.write("item", digest)
+        elif isinstance(value, Shape):
+            self.update_shape(value)
+        elif isinstance(value, Color):
+            self.write("color")
+            self.update(tuple(value[:]))
+        elif isinstance(value, cairo.ImageSurface):
+            self.update_surface(value)
+        elif isinstance(value, AtlasRegion):
+            self.update_surface(value.to_surface())
+        elif isinstance(value, FontCache):
+            self.write("font_cache", repr(value.size_step))
+        elif isinstance(value, _CACHES):
+            self.write("cache", type(value).__name__)
+        elif isinstance(value, LazyFrames):
+            self.write("lazy_frames")
+            self.update_path(value.source)
+        elif isinstance(value, (FunctionType, CodeType, MethodType, partial)):
+            self.update_callable(value)
+        elif isinstance(value, ModuleType):
+            self.write("module", value.__name__)
+        elif isinstance(value, (type, BuiltinFunctionType)):
+            self.write("named", "{}.{}".format(getattr(value, "__module__", None), value.__qualname__))
+        elif hasattr(value, "__dict__") and not callable(value):
+            self.write("object", "{}.{}".format(type(value).__module__, type(value).__qualname__))
+            self.update_dict(vars(value))
+        else:
+            self.write("repr", repr(value))
+
+        return self
+
+    def update_dict(self, value, ignored=(), paths=()):
+        items = [(repr(key), key, item) for key, item in value.items() if key not in ignored]
+        self.write("dict", str(len(items)))
+        for _, key, item in sorted(items, key=lambda entry: entry[0]):
+            self.update(key)
+            if key in paths:
+                self.update_path(item)
+            else:
+                self.update(item)
+
+    def update_shape(self, shape):
+        self.write("shape", "{}.{}".format(type(shape).__module__, type(shape).__qualname__))
+        self.update_dict(shape.props, IGNORED_PROPS, PATH_PROPS)
+        if shape.props.get("emoji_path"):
+            self.update_emoji(shape.props["emoji_path"], shape.props.get("text"))
+        self.update(shape.ease)
+        self.update(shape.loop)
+        self.update((shape.seed, shape.rng_index))
+        self.update(shape.shapes)
+
+    def update_surface(self, surface):
+        surface.flush()
+        self.write("surface", "{}x{}".format(surface.get_width(), surface.get_height()))
+        self.write("data", bytes(surface.get_data()))
+
+    def update_path(self, value):
+        """Adds a value that may be a path, or a list of them, to the hash.
+
+        Paths to files are hashed by the file contents as well,
+        so editing an image changes the hash.
+        """
+        if isinstance(value, (list, tuple)):
+            self.write(type(value).__name__, str(len(value)))
+            for item in value:
+                self.update_path(item)
+            return self
+
+        self.update(value)
+        if isinstance(value, str) and os.path.isfile(value):
+            self.update_file(value)
+        elif isinstance(value, str) and os.path.isdir(value):
+            self.update_directory(value)
+        return self
+
+    def update_file(self, path):
+        digest = _file_digest(path)
+        self.write("file", digest)
+
+    def update_directory(self, path):
+        """Adds the names, sizes and modification times of the files in ``path``."""
+        with os.scandir(path) as entries:
+            files = sorted((entry.name, entry.stat()) for entry in entries if entry.is_file())
+        self.write("directory", str(len(files)))
+        for name, stat in files:
+            self.write("entry", "{}:{}:{}".format(name, stat.st_size, stat.st_mtime_ns))
+
+    def update_emoji(self, emoji_path, text):
+        """Adds the emoji images that ``text`` is drawn with.
+
+        ``text`` can be a string or a list of them. For anything
+        else, like functions, there's no telling which emoji end up
+        being drawn, so the whole of ``emoji_path`` is hashed instead.
+        """
+        if isinstance(text, str):
+            text = [text]
+
+        if not isinstance(text, (list, tuple)) or not all(isinstance(item, str) for item in text):
+            self.update_path(emoji_path)
+            return
+
+        chars = sorted({char for item in text for char in item if is_emoji(char)})
+        self.write("emoji", str(len(chars)))
+        for char in chars:
+            # same path as the one the text shape loads
+            hex_val = char.encode("unicode-escape").decode("ascii").lstrip("\\U0")
+            path = os.path.join(emoji_path, hex_val + ".png")
+            if os.path.isfile(path):
+                self.update_file(path)
+            else:
+                self.write("missing", hex_val)
+
+    def update_callable(self, value):
+        if isinstance(value, MethodType):
+            self.write("method")
+            self.update(value.__func__)
+            self.update(value.__self__)
+        elif isinstance(value, partial):
+            self.write("partial")
+            self.update((value.func, value.args, value.keywords))
+        elif isinstance(value, CodeType):
+            self.write("code", value.co_code)
+            self.update(value.co_consts)
+            self.update(value.co_names)
+        else:
+            self.write("function", value.__qualname__)
+            self.update(value.__code__)
+            self.update(value.__defaults__)
+            self.update(value.__kwdefaults__)
+
+            cells = value.__closure__ or ()
+            self.update(tuple(_cell_contents(cell) for cell in cells))
+
+            # globals the function reads, like other shapes or settings
+            used = [name for name in _global_names(value.__code__) if name in value.__globals__]
+            self.update({name: value.__globals__[name] for name in used})
+
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # the variable hasn't been assigned yet
+        return None
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _global_names(const)
+    return names
+
+
+_file_digests = {}
+
+
+def _file_digest(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    digest = _file_digests.get(key)
+    if digest is None:
+        hasher = sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = _file_digests[key] = hasher.hexdigest()
+
+    return digest
+
+
+def scene_hash(animation, **settings):
+    """Returns a hash of everything that decides how an animation is encoded.
+
+    That's the shapes of its render list, the default styles, easing,
+    size, frame times and seed, plus any ``settings`` of the output,
+    like the converter and its options.
+
+    Parameters
+    ----------
+    animation : :class:`glc.Animation`
+        The animation to hash.
+    settings
+        Anything else that changes the output.
+
+    Returns
+    -------
+    str
+        The hash, as a hex string.
+    """
+    from . import __version__
+
+    render_list = animation.render_list
+    hasher = SceneHasher()
+
+    # surfaces and contexts would make functions that use these hash
+    # differently every time, and what matters about them is below
+    hasher.known(animation, "animation")
+    hasher.known(render_list, "render_list")
+
+    hasher.update({
+        "version": __version__,
+        "class": "{}.{}".format(type(animation).__module__, type(animation).__qualname__),
+        "size": (render_list.width, render_list.height),
+        "times": animation.frame_times(),
+        "fps": animation.fps,
+        "duration": animation.duration,
+        "ease": render_list.ease,
+        "loop": render_list.loop,
+        "seed": render_list.seed,
+        "default_styles": render_list.default_styles,
+        "settings": settings
+    })
+    # the emoji drawn are hashed as images and with text shapes
+    hasher.update(render_list.emoji_path)
+
+    # before and after render functions can draw anything
+    hasher.update((render_list.before_render, render_list.after_render))
+    hasher.update(render_list.shapes)
+
+    return hasher.hexdigest()
+
+
+class RenderCache(ABC):
+
+    """Base class for places that keep encoded animations.
+
+    Subclasses have to implement :meth:`load` and :meth:`store`.
+    Keys are hashes from :func:`scene_hash`, with a suffix for
+    animations that are made of more than one file.
+    """
+
+    @abstractmethod
+    def load(self, key):
+        """Returns the bytes stored under ``key``, or ``None`` if there aren't any."""
+
+    @abstractmethod
+    def store(self, key, data):
+        """Keeps ``data`` (bytes) under ``key``."""
+
+
+class DirectoryCache(RenderCache):
+
+    """Keeps encoded animations as files in a directory.
+
+    Files are written under another name first and then
+    moved into place, so processes sharing the directory
+    never read half of a file.
+
+    Parameters
+    ----------
+    directory : str
+        Where to keep the files. Created when needed.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, key):
+        """Returns the path of the file for ``key``."""
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        temp = "{}.{}.tmp".format(path, os.getpid())
+
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
@@ -12,13 +12,46 @@
 
 from .shapes import *
 from .color import Color, gray
-from .utils import bgra_to_rgba, is_emoji
+from .utils import is_emoji, mix_seed, SplitMix64, RGBA_CHANNELS
+from .assets import default_cache, lazy_frames
+from .atlas import Atlas
+from .fonts import default_cache as default_font_cache
 
 import os
-import io
+import math
 import cairo
 import numpy
-import imageio
+
+
+def _versions(shape):
+    # what cached drawings of a shape are checked against: the shape itself,
+    # its version (bumped by Shape.compile(), which add(), set_prop(),
+    # set_ease() and set_loop() call, and when a child is added to it)
+    # and the same for each of its children
+    return (shape, shape._version, tuple(_versions(child) for child in shape.shapes))
+
+
+def _context_state(context):
+    # the drawing state shapes don't set themselves, so whatever
+    # was set on the render list's context applies to them
+    # font options objects are only equal to themselves, hence the hash
+    matrix = context.get_matrix()
+    return (
+        (matrix.xx, matrix.yx, matrix.xy, matrix.yy, matrix.x0, matrix.y0),
+        context.get_antialias(),
+        context.get_tolerance(),
+        context.get_fill_rule(),
+        context.get_font_options().hash()
+    )
+
+
+def _copy_context_state(source, target):
+    # see _context_state
+    target.set_matrix(source.get_matrix())
+    target.set_antialias(source.get_antialias())
+    target.set_tolerance(source.get_tolerance())
+    target.set_fill_rule(source.get_fill_rule())
+    target.set_font_options(source.get_font_options())
 
 
 class RenderList:
@@ -39,6 +72,19 @@ class RenderList:
         Whether the animation should loop. Defaults to ``True``.
     emoji_path : string
         Where the emoji pngs are located. Defaults to ``None``.
+    asset_cache : :class:`glc.assets.AssetCache`
+        Where decoded images and emoji are kept.
+        Defaults to :data:`glc.assets.default_cache`, which is
+        shared by every render list.
+    font_cache : :class:`glc.fonts.FontCache`
+        Where fonts and text layouts are kept.
+        Defaults to :data:`glc.fonts.default_cache`, which is
+        shared by every render list.
+    atlas : bool or :class:`glc.atlas.Atlas`
+        Whether images and emoji should be packed into a few big
+        surfaces, so drawing lots of them doesn't keep switching
+        between small ones. An :class:`glc.atlas.Atlas` can be passed
+        in to share it, or to change how it packs. Defaults to ``False``.
     before_render : callable
         A function that takes in this render list, a Cairo surface, context, and a time ``t``.
         It's called before all shapes are rendered.
@@ -47,6 +93,48 @@ class RenderList:
         A function that takes in this render list, a Cairo surface, context, and a time ``t``.
         It's called after all shapes are rendered.
         Defaults to ``None``.
+    frame_format : string
+        What :meth:`render` returns. Can be one of the following:
+
+        - ``'rgba'``
+            A new RGBA array for every frame.
+        - ``'rgba_reuse'``
+            One RGBA array owned by this render list, overwritten
+            on every call to :meth:`render`.
+        - ``'bgra'``
+            A view over the surface's memory, with no conversion
+            at all. This is cairo's own pixel layout, which is BGRA
+            on little-endian machines (and ARGB on big-endian ones).
+            It's overwritten on every call to :meth:`render`.
+
+        Defaults to ``'rgba'``.
+    cache_static : bool
+        Whether shapes that look the same on every frame (see
+        :meth:`Shape.is_static`) should be drawn once and reused.
+        Consecutive static shapes are rasterized together into a
+        cached surface, which is then painted on every frame.
+        The cache is rebuilt when a shape, the list of shapes,
+        the default styles, or the transform, antialiasing, tolerance,
+        fill rule or font options of :attr:`context` change.
+        Defaults to ``False``.
+    partial_redraw : bool
+        Whether only the parts of the surface that changed since the
+        last frame should be cleared and drawn again. Shapes that
+        changed are recorded first to find out what area they cover
+        (see :meth:`get_dirty_rects`), and everything else is left
+        as it was. Works best with shapes that can tell when they
+        look the same (see :meth:`Shape.frame_key`).
+        The whole surface is still redrawn on the first frame,
+        when the default styles or the state of :attr:`context`
+        change, and when there's a ``before_render`` or
+        ``after_render`` function.
+        Defaults to ``False``.
+    seed : int or str
+        Seed for everything random in the shapes, like ``shake``.
+        Each shape gets its own random numbers on each frame from this,
+        so the same scene renders the same way every time.
+        See :attr:`Shape.rng`, and :attr:`rng` for building scenes.
+        Defaults to 0.
 
     Attributes
     ----------
@@ -56,6 +144,9 @@ class RenderList:
         Drawing context.
     shapes : list of :class:`Shape`
         The list of shapes to render.
+    dirty_rects : list of tuples or ``None``
+        The ``(x, y, width, height)`` rectangles that were redrawn by the
+        last call to :meth:`render`, or ``None`` if the whole surface was.
     """
 
     def __init__(self, *args, **kwargs):
@@ -88,13 +179,39 @@ class RenderList:
         self.context = cairo.Context(self.surface)
 
         self.emoji_path = kwargs.pop("emoji_path", None)
+        self.asset_cache = kwargs.pop("asset_cache", default_cache)
+
+        self.font_cache = kwargs.pop("font_cache", default_font_cache)
+
+        self.atlas = kwargs.pop("atlas", False)
+        if self.atlas is True:
+            self.atlas = Atlas()
+        elif not self.atlas:
+            self.atlas = None
+
+        if self.atlas is not None:
+            self.asset_cache.add_atlas(self.atlas)
 
         self.before_render = kwargs.pop("before_render", None)
         self.after_render = kwargs.pop("after_render", None)
 
+        self.frame_format = kwargs.pop("frame_format", "rgba")
+        self._frame_buffer = None
+
+        self.cache_static = kwargs.pop("cache_static", False)
+        self._static_layers = None
+        self._static_key = None
+
+        self.partial_redraw = kwargs.pop("partial_redraw", False)
+        self.dirty_rects = None
+        self._dirty_state = None
+        self._frame_buffer_current = False
+
+        self.seed = kwargs.pop("seed", 0)
+        self._rng = None
+        self._shape_count = 0
+
         self.shapes = []
-        self._cached_images = {}
-        self._emoji_cache = {}
 
     def size(self, width=500, height=500):
         """Changes the size of the surface.
@@ -120,6 +237,10 @@ class RenderList:
         self.surface = cairo.ImageSurface(self.mem_format, self.width, self.height)
         self.context = cairo.Context(self.surface)
 
+        self._frame_buffer = None
+        self._dirty_state = None
+        self.dirty_rects = None
+
         return width, height
 
     def add(self, shape):
@@ -148,15 +269,107 @@ class RenderList:
 
         shape.default_styles = self.default_styles
 
+        shape.seed = self.seed
+        shape.rng_index = self._shape_count
+        self._shape_count += 1
+
+        # after the easing and defaults are set, so nothing compiled uses stale ones
+        shape.compile()
+
         return shape
 
-    def render(self, t):
+    def set_seed(self, seed):
+        """Changes the seed of the random numbers used by the shapes.
+
+        Parameters
+        ----------
+        seed : int or str
+            The new seed.
+
+        Returns
+        -------
+        self : :class:`RenderList`
+            For method chaining.
+        """
+        def reseed(shapes):
+            for shape in shapes:
+                shape.seed = seed
+                reseed(shape.shapes)
+
+        self.seed = seed
+        self._rng = None
+        reseed(self.shapes)
+        return self
+
+    @property
+    def rng(self):
+        """A random number generator seeded with :attr:`seed`.
+
+        Anything random picked while building a scene should come from
+        this, like ``random_hsva(0, 360, 0.5, 1, 1, 1, rng=render_list.rng)``,
+        so the same seed builds the same scene. Set the seed before
+        building the scene, as changing it starts the generator over.
+
+        Returns
+        -------
+        :class:`glc.utils.SplitMix64`
+        """
+        if self._rng is None:
+            # shapes mix in their index and the time, so this can't
+            # end up with the same sequence as any of them
+            self._rng = SplitMix64(mix_seed(self.seed, -1))
+        return self._rng
+
+    def frame_key(self, t):
+        """Returns a value that identifies what the frame at time ``t`` looks like.
+
+        Frames with the same key are the same image.
+        See :meth:`Shape.frame_key`.
+
+        Returns
+        -------
+        tuple or ``None``
+            ``None`` if the frame can't be predicted, like when there's
+            a ``before_render`` or ``after_render`` function.
+        """
+        if self.before_render is not None or self.after_render is not None:
+            return None
+
+        key = []
+        for shape in self.shapes:
+            shape_key = shape.frame_key(t)
+            if shape_key is None:
+                return None
+            key.append(shape_key)
+
+        return tuple(key)
+
+    def prepare_timeline(self, times):
+        """Eases every shape for all the given times at once.
+
+        See :meth:`Shape.prepare_timeline`.
+
+        Parameters
+        ----------
+        times : list of floats
+            The times that are going to be rendered.
+        """
+        for shape in self.shapes:
+            shape.prepare_timeline(times)
+
+    def render(self, t, out=None, frame_format=None):
         """Returns an image (frame) of this render list at time t.
 
         Parameters
         ----------
         t : float
             Specifies at what point in time this list should be rendered in.
+        out : numpy array
+            An array with shape ``(height, width, 4)`` and dtype ``uint8``
+            to write the RGBA frame into. Defaults to ``None``.
+        frame_format : string
+            Overrides :attr:`frame_format` for this call.
+            Ignored if ``out`` is passed in.
 
         Returns
         -------
@@ -164,10 +377,32 @@ class RenderList:
             The frame as a numpy array.
         """
 
+        recordings = {}
+
+        if self.partial_redraw:
+            self.dirty_rects = self.get_dirty_rects(t, recordings)
+        else:
+            self.dirty_rects = None
+
+        # nothing changed, so the surface already has this frame
+        if self.dirty_rects == []:
+            return self.get_frame(out, frame_format)
+
         bg = self.default_styles["bg_color"]
 
         self.context.save()
 
+        if self.dirty_rects is not None:
+            # the rectangles are in pixels, whatever the context's transform is
+            matrix = self.context.get_matrix()
+            self.context.identity_matrix()
+            for rect in self.dirty_rects:
+                self.context.rectangle(*rect)
+            self.context.clip()
+            self.context.set_matrix(matrix)
+
+        self.context.save()
+
         # TODO: accept some other values to clear the screen?
         if bg == "transparent":
             self.context.set_source_rgba(0, 0, 0, 0)
@@ -186,23 +421,235 @@ class RenderList:
             self.before_render(self, self.surface, self.context, t)
             self.context.restore()
 
-        for shape in self.shapes:
-            shape.render(self.context, t)
+        if self.cache_static or recordings:
+            self.render_layers(t, recordings)
+        else:
+            for shape in self.shapes:
+                shape.render(self.context, t)
 
         if self.after_render is not None:
             self.context.save()
             self.after_render(self, self.surface, self.context, t)
             self.context.restore()
 
+        self.context.restore()
+
+        return self.get_frame(out, frame_format)
+
+    def render_layers(self, t, recordings=None):
+        """Renders the shapes, painting static ones from the cache.
+
+        Used by :meth:`render` when ``cache_static`` or ``partial_redraw``
+        is set. Shapes in ``recordings`` are painted from their recording
+        instead of being rendered again.
+        """
+        layers = self.get_static_layers() if self.cache_static else self.shapes
+
+        for layer in layers:
+            if isinstance(layer, cairo.ImageSurface):
+                source = layer
+            elif recordings and layer in recordings:
+                source = recordings[layer]
+            else:
+                layer.render(self.context, t)
+                continue
+
+            self.context.save()
+            # layers are already drawn with the context's transform
+            self.context.identity_matrix()
+            self.context.set_source_surface(source)
+            self.context.paint()
+            self.context.restore()
+
+    def get_dirty_rects(self, t, recordings=None):
+        """Works out which parts of the surface change when rendering at time ``t``.
+
+        Every shape that may look different than it did on the last call
+        is recorded, and the area its drawing covers is measured. The area
+        it covered before and the area it covers now both need redrawing.
+        Shapes that were removed leave their old area behind too.
+
+        This keeps track of the last call, so it's meant to be
+        called once per frame, as :meth:`render` does.
+
+        Parameters
+        ----------
+        t : float
+            The time that's about to be rendered.
+        recordings : dict
+            If passed in, gets the :class:`cairo.RecordingSurface` of every
+            shape that was recorded, so they don't need to be rendered again.
+
+        Returns
+        -------
+        list of ``(x, y, width, height)`` tuples, or ``None``
+            ``None`` if the whole surface has to be redrawn.
+        """
+        if recordings is None:
+            recordings = {}
+
+        styles = (dict(self.default_styles), _context_state(self.context))
+        previous = self._dirty_state
+        redraw_all = (
+            previous is None or previous[0] != styles or
+            self.before_render is not None or self.after_render is not None
+        )
+
+        old_shapes = {} if previous is None else previous[1]
+        shapes = {}
+        boxes = []
+
+        for shape in self.shapes:
+            if shape.is_static():
+                key = (_versions(shape), "static")
+            else:
+                frame_key = shape.frame_key(t)
+                # shapes that can't be predicted are always redrawn
+                key = None if frame_key is None else (_versions(shape), frame_key)
+
+            old = old_shapes.get(shape)
+            if key is not None and old is not None and old[0] == key:
+                shapes[shape] = old
+                continue
+
+            recording = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+            context = cairo.Context(recording)
+            _copy_context_state(self.context, context)
+            shape.render(context, t)
+            recordings[shape] = recording
+
+            box = self._ink_box(recording)
+            shapes[shape] = (key, box)
+
+            if old is not None:
+                boxes.append(old[1])
+            boxes.append(box)
+
+        for shape, (_, box) in old_shapes.items():
+            if shape not in shapes:
+                boxes.append(box)
+
+        self._dirty_state = (styles, shapes)
+
+        if redraw_all:
+            return None
+
+        return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes if x1 > x0 and y1 > y0]
+
+    def get_dirty_box(self):
+        """Returns the box around everything the last call to :meth:`render` redrew.
+
+        Returns
+        -------
+        (x0, y0, x1, y1) : tuple of int, or ``None``
+            ``None`` if the whole surface was redrawn.
+            The box is empty (``x0 == x1``) if nothing was.
+        """
+        if self.dirty_rects is None:
+            return None
+        if not self.dirty_rects:
+            return (0, 0, 0, 0)
+
+        x0 = min(x for x, y, w, h in self.dirty_rects)
+        y0 = min(y for x, y, w, h in self.dirty_rects)
+        x1 = max(x + w for x, y, w, h in self.dirty_rects)
+        y1 = max(y + h for x, y, w, h in self.dirty_rects)
+        return (x0, y0, x1, y1)
+
+    def _ink_box(self, recording):
+        x, y, w, h = recording.ink_extents()
+
+        # a pixel of margin for antialiasing
+        x0 = max(0, math.floor(x) - 1)
+        y0 = max(0, math.floor(y) - 1)
+        x1 = min(self.width, math.ceil(x + w) + 1)
+        y1 = min(self.height, math.ceil(y + h) + 1)
+
+        if w <= 0 or h <= 0 or x1 <= x0 or y1 <= y0:
+            return (0, 0, 0, 0)
+
+        return (x0, y0, x1, y1)
+
+    def get_static_layers(self):
+        """Returns the shapes to draw, with runs of static shapes rasterized.
+
+        Returns
+        -------
+        layers : list
+            Either :class:`Shape` objects, which should be rendered
+            as usual, or :class:`cairo.ImageSurface` objects with
+            static shapes already drawn on them.
+        """
+        key = (
+            self.width, self.height, dict(self.default_styles),
+            _context_state(self.context), [_versions(shape) for shape in self.shapes]
+        )
+
+        if self._static_layers is not None and key == self._static_key:
+            return self._static_layers
+
+        layers = []
+        surface = context = None
+
+        for shape in self.shapes:
+            if not shape.is_static():
+                layers.append(shape)
+                surface = context = None
+                continue
+
+            if surface is None:
+                surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, self.width, self.height)
+                context = cairo.Context(surface)
+                _copy_context_state(self.context, context)
+                layers.append(surface)
+
+            shape.render(context, 0)
+
+        self._static_layers = layers
+        self._static_key = key
+        return layers
+
+    def get_frame(self, out=None, frame_format=None):
+        """Returns what is currently drawn on the surface as a numpy array.
+
+        See :meth:`render` for the parameters.
+        """
+        if frame_format is None:
+            frame_format = self.frame_format
+
+        self.surface.flush()
         buf = numpy.frombuffer(self.surface.get_data(), numpy.uint8)
         buf.shape = (self.surface.get_height(), self.surface.get_width(), 4)
 
-        # BGRA -> RGBA
-        # NOTE: does this really just happen with little endian machines?
-        # have to test at some point...
-        buf = buf[:, :, [2, 1, 0, 3]]
+        reuse = out is None and frame_format == "rgba_reuse"
+
+        if out is None:
+            if frame_format == "bgra":
+                self._frame_buffer_current = False
+                return buf
+            elif reuse:
+                if self._frame_buffer is None:
+                    self._frame_buffer = numpy.empty_like(buf)
+                    self._frame_buffer_current = False
+                out = self._frame_buffer
+            else:
+                out = numpy.empty_like(buf)
+
+        # the reused buffer already has the last frame,
+        # so only what was redrawn needs converting
+        if reuse and self._frame_buffer_current and self.dirty_rects is not None:
+            regions = [(slice(y, y + h), slice(x, x + w)) for x, y, w, h in self.dirty_rects]
+        else:
+            regions = [(slice(None), slice(None))]
+
+        # swizzle channel by channel, straight into the output
+        # fancy indexing (buf[:, :, [2, 1, 0, 3]]) would allocate a temporary
+        for rows, columns in regions:
+            for index, channel in enumerate(RGBA_CHANNELS):
+                out[rows, columns, index] = buf[rows, columns, channel]
 
-        return buf
+        self._frame_buffer_current = reuse
+        return out
 
     # shortcuts to add shapes
     # TODO: document shapes
@@ -229,6 +676,9 @@ class RenderList:
     def circle(self, *args, **kwargs):
         return self.add(Circle(*args, **kwargs))
 
+    def circles(self, *args, **kwargs):
+        return self.add(Circles(*args, **kwargs))
+
     def container(self, *args, **kwargs):
         return self.add(Container(*args, **kwargs))
 
@@ -257,6 +707,7 @@ class RenderList:
 
     def image(self, *args, **kwargs):
         imgs = kwargs.get("img", None)
+        lazy = kwargs.pop("lazy", False)
 
         if not imgs:
             return
@@ -281,40 +732,24 @@ class RenderList:
                 if len(img) == 1 and is_emoji(img) and self.emoji_path:
                     hex_val = img.encode("unicode-escape").decode("ascii").lstrip("\\U0")
 
-                    if img not in self._emoji_cache:
-                        # TODO: not assume that .png is the format available
-                        path = os.path.abspath(os.path.join(self.emoji_path, hex_val + ".png"))
-                        surfaces.append(cairo.ImageSurface.create_from_png(path))
-                    else:
-                        surfaces.append(self._emoji_cache[hex_val])
-
+                    # TODO: not assume that .png is the format available
+                    path = os.path.abspath(os.path.join(self.emoji_path, hex_val + ".png"))
+                    surfaces.append(self.asset_cache.load_emoji(path))
                     continue
 
-            if img in self._cached_images:
-                for surface in self._cached_images[img]:
-                    surfaces.append(surface)
-            else:
-                reader = imageio.get_reader(img)
-
-                self._cached_images[img] = []
-
-                for index, im in enumerate(reader):
-
-                    # get frame durations here (for gifs)
-                    # U N D O C U M E N T E D  B O Y Z
-
-                    try:
-                        duration = reader._get_meta_data(index)
-                        durations.append(duration["ANIMATION"]["FrameTime"])
-                    except Exception:
-                        pass
+            if lazy and len(imgs) == 1:
+                frames = lazy_frames(img)
+                if frames is not None:
+                    surfaces = frames
+                    durations.extend(frames.durations)
+                    continue
 
-                    writer = imageio.imwrite("<bytes>", im, "png")
-                    img_surf = cairo.ImageSurface.create_from_png(io.BytesIO(writer))
-                    surfaces.append(img_surf)
-                    self._cached_images[img].append(img_surf)
+            img_surfaces, img_durations = self.asset_cache.load_image(img)
+            surfaces.extend(img_surfaces)
+            durations.extend(img_durations)
 
-                reader.close()
+        if self.atlas is not None and isinstance(surfaces, list):
+            surfaces = self.atlas.add_all(surfaces)
 
         duration = None
         if durations:
@@ -357,6 +792,9 @@ class RenderList:
     def rect(self, *args, **kwargs):
         return self.add(Rect(*args, **kwargs))
 
+    def rects(self, *args, **kwargs):
+        return self.add(Rects(*args, **kwargs))
+
     def roundrect(self, *args, **kwargs):
         return self.add(RoundRect(*args, **kwargs))
 
@@ -374,5 +812,7 @@ class RenderList:
 
     def text(self, *args, **kwargs):
         kwargs["emoji_path"] = self.emoji_path
-        kwargs["emoji_cache"] = self._emoji_cache
+        kwargs["emoji_cache"] = self.asset_cache
+        kwargs["atlas"] = self.atlas
+        kwargs["font_cache"] = self.font_cache
         return self.add(Text(*args, **kwargs))
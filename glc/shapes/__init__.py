@@ -22,6 +22,7 @@ from .gradient_pie import GradientPie
 from .grid import Grid
 from .heart import Heart
 from .image import Image
+from .instances import Instances, Circles, Rects
 from .isobox import IsoBox
 from .isotube import IsoTube
 from .line import Line
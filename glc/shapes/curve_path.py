@@ -14,6 +14,8 @@ from ..utils import curve_path
 
 class CurvePath(Shape):
 
+    array_props = Shape.array_props + ("points",)
+
     def draw(self, context, t):
         points = self.get_point_array("points", t, [])
         loop = self.get_bool("loop", t, False)
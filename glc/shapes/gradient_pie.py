@@ -17,6 +17,8 @@ from ..color import hsva
 
 class GradientPie(Shape):
 
+    array_props = Shape.array_props + ("colors",)
+
     def draw(self, context, t):
         x = self.get_number("x", t, 100)
         y = self.get_number("y", t, 100)
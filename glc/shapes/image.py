@@ -8,9 +8,10 @@
 
 """
 
-from tempfile import TemporaryFile
 from .shape import Shape
-from ..utils import rad
+from ..value_parser import is_frames
+from ..utils import rad, tint_surface
+from ..atlas import AtlasRegion
 
 import cairo
 
@@ -57,6 +58,9 @@ class Image(Shape):
         render_list.img(img="image.gif", x=100, y=100, img_ease=False, mode="clamp")
         render_list.img(img="image.gif", x=100, y=100, img_ease=False, mode="wrap")
 
+        # big gifs can be decoded as their frames are needed, instead of all up front
+        render_list.img(img="huge.gif", x=100, y=100, lazy=True)
+
     Attributes
     ----------
     img
@@ -104,6 +108,12 @@ class Image(Shape):
         Defaults to ``True``.
     img_speed : float
         Image swapping speed multiplier.
+    lazy : bool
+        Whether the frames of the image should only be decoded when
+        they're drawn, keeping just a few of them in memory.
+        See :class:`glc.assets.LazyFrames`. Only works with a single
+        image that can be opened again, like a file path.
+        Defaults to ``False``.
     """
 
     def __init__(self, *args, **kwargs):
@@ -111,6 +121,24 @@ class Image(Shape):
         self.duration = kwargs.pop("duration", None)
         self.frame_durations = kwargs.pop("durations", None)
 
+    def is_static(self):
+        # lazily decoded frames aren't a list, so the base class would see one constant value
+        frames = self.props.get("image_surfaces", None)
+        if is_frames(frames) and len(frames) > 1:
+            return False
+        return super().is_static()
+
+    def frame_key(self, t):
+        key = super().frame_key(t)
+        surfaces = self.props.get("image_surfaces", None)
+
+        if key is None or not surfaces or len(surfaces) < 2:
+            return key
+
+        # swapping images goes by the time before easing
+        time = t * self.props.get("speed_mult", 1) + self.props.get("phase", 0)
+        return key + (round(time, 9),)
+
     def draw(self, context, t):
         mode = self.get_string("mode", t, "clamp")
         img_ease = self.get_bool("img_ease", t, True)
@@ -141,23 +169,7 @@ class Image(Shape):
             h = img.get_height()
 
         if tint is not None:
-            # necessary to prevent reuse
-            f = TemporaryFile()
-            img.write_to_png(f)
-            f.seek(0)
-            _img = cairo.ImageSurface.create_from_png(f)
-            b = cairo.Context(_img)
-
-            # create alpha mask
-            mask = cairo.ImageSurface(cairo.FORMAT_A8, img.get_width(), img.get_height())
-            maskctx = cairo.Context(mask)
-            maskctx.set_source_surface(img)
-            maskctx.paint()
-
-            # paint
-            b.set_operator(tint_op)
-            b.set_source_rgba(*tint)
-            b.mask(cairo.SurfacePattern(mask))
+            _img = tint_surface(img, tint, tint_op)
         else:
             _img = img
 
@@ -170,5 +182,8 @@ class Image(Shape):
 
         context.scale(w / _img.get_width(), h / _img.get_height())
 
-        context.set_source_surface(_img)
-        context.paint_with_alpha(alpha)
+        if isinstance(_img, AtlasRegion):
+            _img.paint(context, alpha)
+        else:
+            context.set_source_surface(_img)
+            context.paint_with_alpha(alpha)
@@ -0,0 +1,229 @@
+"""
+
+    glc.shapes.instances
+    ====================
+
+    (c) 2016 LeoV
+    https://github.com/leovoel/
+
+"""
+
+from abc import ABCMeta, abstractmethod
+from .shape import Shape
+from ..value_parser import compile_instances, compile_instance_colors
+
+import numpy
+
+
+def _enabled(value):
+    # arrays don't have a single truth value
+    if isinstance(value, numpy.ndarray):
+        return True
+    return bool(value)
+
+
+class Instances(Shape, metaclass=ABCMeta):
+
+    """Base class for shapes that draw many copies of themselves at once.
+
+    Properties of instances can be numpy arrays, with one value per
+    instance, or single values shared by all of them. Lists of those
+    are interpolated as usual.
+
+    Instances are drawn in order. When they're only filled or only
+    stroked, consecutive instances with the same color are drawn
+    together, which is what makes this fast. That also means overlapping
+    translucent instances of the same color don't get darker where they
+    overlap. When they're both filled and stroked, each instance is
+    filled and then stroked before the next one, so that an instance's
+    outline is never covered by the fill of one drawn before it. That
+    is slower, since every instance is its own path.
+
+    Attributes
+    ----------
+    fill : :class:`Color` or numpy array
+        One color for every instance, or an ``(n, 3)`` or ``(n, 4)``
+        array with an RGB(A) color per instance, from 0.0 to 1.0.
+    stroke : :class:`Color` or numpy array
+        Same as ``fill``, for the outlines.
+    """
+
+    # whether instances are filled or stroked when not told otherwise
+    default_fill = True
+    default_stroke = False
+
+    def get_instances(self, prop, t, default):
+        evaluator = self.get_evaluator(compile_instances, prop)
+        if evaluator is None:
+            return numpy.asarray(default, numpy.float64)
+        return evaluator(t)
+
+    def get_instance_colors(self, prop, t, default):
+        evaluator = self.get_evaluator(compile_instance_colors, prop)
+        # fill=True just means "use the default"
+        if evaluator is None or self.props.get(prop) is True:
+            return compile_instance_colors(default)(t)
+        return evaluator(t)
+
+    @abstractmethod
+    def get_geometry(self, t):
+        """Returns the per-instance values that :meth:`add_paths` needs.
+
+        Returns
+        -------
+        list of numpy arrays
+        """
+
+    @abstractmethod
+    def add_paths(self, context, geometry, start, end):
+        """Adds the paths of the instances from ``start`` to ``end`` to the context."""
+
+    def draw(self, context, t):
+        geometry = numpy.broadcast_arrays(*self.get_geometry(t))
+        count = geometry[0].size
+        geometry = [values.reshape(-1) for values in geometry]
+
+        do_fill = _enabled(self.props.get("fill", self.default_fill))
+        do_stroke = _enabled(self.props.get("stroke", self.default_stroke))
+
+        if not count or not (do_fill or do_stroke):
+            return
+
+        colors = []
+        if do_fill:
+            fills = self.get_instance_colors("fill", t, self.default_styles["fill"])
+            colors.append(numpy.broadcast_to(fills, (count, 4)))
+        if do_stroke:
+            strokes = self.get_instance_colors("stroke", t, self.default_styles["stroke"])
+            colors.append(numpy.broadcast_to(strokes, (count, 4)))
+
+        colors = numpy.concatenate(colors, axis=1)
+
+        if do_fill and do_stroke:
+            # filling a whole run before stroking it would draw fills over earlier outlines
+            bounds = list(range(count + 1))
+        else:
+            # instances are drawn in runs of the same colors
+            changes = numpy.flatnonzero((colors[1:] != colors[:-1]).any(axis=1)) + 1
+            bounds = [0] + changes.tolist() + [count]
+        colors = colors.tolist()
+
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            context.new_path()
+            self.add_paths(context, geometry, start, end)
+
+            color = colors[start]
+            if do_fill:
+                context.set_source_rgba(*color[:4])
+                context.fill_preserve()
+                color = color[4:]
+            if do_stroke:
+                context.set_source_rgba(*color)
+                context.stroke_preserve()
+
+        context.new_path()
+
+
+class Circles(Instances):
+
+    """Draws many circles at once.
+
+    See :class:`Instances` for how the properties work.
+
+    Create it using:
+
+    .. code-block:: python
+
+        render_list.circles(x=numpy.arange(100) * 5, y=100, radius=[2, 10], fill=colors)
+
+    Attributes
+    ----------
+    x : float or numpy array
+        Horizontal position of each circle.
+    y : float or numpy array
+        Vertical position of each circle.
+    radius : float or numpy array
+        Radius of each circle.
+    """
+
+    def get_geometry(self, t):
+        return [
+            self.get_instances("x", t, 100),
+            self.get_instances("y", t, 100),
+            self.get_instances("radius", t, 50)
+        ]
+
+    def add_paths(self, context, geometry, start, end):
+        xs, ys, radii = (values[start:end].tolist() for values in geometry)
+        tau = 2 * numpy.pi
+
+        for x, y, radius in zip(xs, ys, radii):
+            context.new_sub_path()
+            context.arc(x, y, radius, 0, tau)
+
+
+class Rects(Instances):
+
+    """Draws many rectangles at once.
+
+    See :class:`Instances` for how the properties work.
+
+    Create it using:
+
+    .. code-block:: python
+
+        render_list.rects(x=xs, y=ys, w=10, h=10, rotation=angles, fill=colors)
+
+    Attributes
+    ----------
+    x : float or numpy array
+        Horizontal position of each rectangle.
+    y : float or numpy array
+        Vertical position of each rectangle.
+    w : float or numpy array
+        Width of each rectangle.
+    h : float or numpy array
+        Height of each rectangle.
+    rotation : float or numpy array
+        Angle of each rectangle, in degrees.
+    centered : bool
+        Whether the rectangles should be drawn from their
+        center or their top left corner.
+        Defaults to ``True``.
+    """
+
+    # same as Rect
+    default_fill = False
+    default_stroke = True
+
+    def get_geometry(self, t):
+        x = self.get_instances("x", t, 100)
+        y = self.get_instances("y", t, 100)
+        w = self.get_instances("w", t, 100)
+        h = self.get_instances("h", t, 100)
+        rotation = numpy.radians(self.get_instances("rotation", t, 0))
+
+        if self.get_bool("centered", t, True):
+            left, top = -w * 0.5, -h * 0.5
+        else:
+            left, top = numpy.zeros_like(w), numpy.zeros_like(h)
+
+        cos, sin = numpy.cos(rotation), numpy.sin(rotation)
+
+        # the corners of every rectangle, rotated around its position
+        geometry = []
+        for cx, cy in ((left, top), (left + w, top), (left + w, top + h), (left, top + h)):
+            geometry.append(x + cx * cos - cy * sin)
+            geometry.append(y + cx * sin + cy * cos)
+
+        return geometry
+
+    def add_paths(self, context, geometry, start, end):
+        corners = zip(*(values[start:end].tolist() for values in geometry))
+
+        for x0, y0, x1, y1, x2, y2, x3, y3 in corners:
+            context.move_to(x0, y0)
+            context.line_to(x1, y1)
+            context.line_to(x2, y2)
+            context.line_to(x3, y3)
+            context.close_path()
@@ -39,6 +39,8 @@ class Path(Shape):
         Defaults to ``False``.
     """
 
+    array_props = Shape.array_props + ("path",)
+
     def draw(self, context, t):
         path = self.get_array("path", t, [])
         start_percent = self.get_number("start_percent", t, 0)
@@ -8,12 +8,15 @@
 
 """
 
-from ..easing import EASING_FUNCTIONS
-from ..value_parser import get_array, get_color, get_bool, get_number
-from ..value_parser import get_string, get_image, get_cairo_constant, get_point_array
-from ..utils import randrange
+from ..easing import EASING_FUNCTIONS, ease_array
+from ..value_parser import compile_array, compile_color, compile_bool, compile_number
+from ..value_parser import compile_string, compile_image, compile_cairo_constant, compile_point_array
+from ..value_parser import is_constant, timeline_number
+from ..color import Color
+from ..utils import randrange, mix_seed, SplitMix64
 
 import cairo
+import numpy
 
 
 class Shape:
@@ -53,7 +56,8 @@ class Shape:
     line_dash : iterable of floats
     miter_limit : float
     shake : float
-        How much the shape should shake.
+        How much the shape should shake. The offsets come from :attr:`rng`,
+        so they're the same every time the same frame is rendered.
     fill : :class:`Color`
         Color the fill of this shape. Can also be a value like ``None`` or ``False``
         to indicate that no filling should be done.
@@ -73,11 +77,23 @@ class Shape:
         Usually is ``None``.
     """
 
+    # properties read with get_array/get_point_array
+    array_props = ("line_dash",)
+
     def __init__(self, *args, **kwargs):
         self.ease = None
         self.loop = None
         self.props = kwargs
         self.shapes = []
+        self._evaluators = {}
+        self._version = 0
+        self._timeline = None
+
+        # set by the render list, see rng
+        self.seed = 0
+        self.rng_index = 0
+        self.no_interp_time = 0
+        self._rng = None
 
     def add(self, item):
         """Adds a child shape to this shape's list of children.
@@ -101,6 +117,8 @@ class Shape:
             The added child.
         """
         self.shapes.append(item)
+        # this shape draws something new now
+        self._version += 1
         return item
 
     def set_prop(self, **kwargs):
@@ -112,8 +130,60 @@ class Shape:
             For method chaining.
         """
         self.props.update(kwargs)
+        self.compile()
+        return self
+
+    def compile(self):
+        """Prepares the properties of this shape for rendering.
+
+        This is called automatically when the shape is added to a
+        :class:`RenderList`, and whenever :meth:`set_prop`, :meth:`set_ease`
+        or :meth:`set_loop` is used.
+
+        It drops every compiled property, along with anything prepared
+        by :meth:`prepare_timeline`, and marks the shape as changed, so
+        cached drawings of it are made again. Each property is then turned
+        into a function of ``t`` the first time it's read, so all the
+        checking and parsing of its value happens once instead of on every
+        frame. If you change :attr:`props`, :attr:`ease` or :attr:`loop`
+        directly, call this afterwards.
+
+        Returns
+        -------
+        self : :class:`Shape`
+            For method chaining.
+        """
+        self._evaluators = {}
+        self._version += 1
+        self._timeline = None
         return self
 
+    def is_static(self):
+        """Whether this shape (and its children) looks the same on every frame.
+
+        That's the case when none of its properties, or the default
+        styles it relies on, are callables or lists to animate through,
+        and it doesn't shake.
+
+        Returns
+        -------
+        bool
+        """
+        styles = getattr(self, "default_styles", {})
+
+        for name, value in self.props.items():
+            if name != "parent" and not is_constant(value, name in self.array_props):
+                return False
+
+        for name, value in styles.items():
+            if name not in self.props and not is_constant(value, name in self.array_props):
+                return False
+
+        if self.props.get("shake", styles.get("shake", 0)):
+            return False
+
+        return all(shape.is_static() for shape in self.shapes)
+
     def set_ease(self, ease="sine"):
         """Sets the easing function for this shape.
 
@@ -130,7 +200,7 @@ class Shape:
             For method chaining.
         """
         self.ease = ease
-        return self
+        return self.compile()
 
     def set_loop(self, loop=True):
         """Sets whether this shape should loop or not.
@@ -147,14 +217,17 @@ class Shape:
             For method chaining.
         """
         self.loop = loop
-        return self
+        return self.compile()
 
     def render(self, context, t):
         time = t
         t *= self.props.get("speed_mult", 1)
         t += self.props.get("phase", 0)
         self.no_interp_time = t
-        t = self.interpolate(t)
+        self._rng = None
+
+        eased = self._timeline.get(time) if self._timeline is not None else None
+        t = self.interpolate(t) if eased is None else eased
 
         self.start_draw(context, t)
         self.draw(context, t)
@@ -162,6 +235,59 @@ class Shape:
             shape.render(context, time)
         self.end_draw(context, t)
 
+    @property
+    def rng(self):
+        """The random number generator for the frame being drawn.
+
+        Anything random in a shape should come from this, so that
+        a scene renders the same way every time, and no matter
+        which process renders which frame. See :meth:`get_rng`.
+        """
+        if self._rng is None:
+            self._rng = self.get_rng(self.no_interp_time)
+        return self._rng
+
+    def get_rng(self, t):
+        """Returns a random number generator for this shape at time ``t``.
+
+        It's seeded with the seed of the render list, the position of
+        this shape in it, and the time, so every shape gets a different
+        sequence on every frame, but always the same one for a given frame.
+
+        Returns
+        -------
+        :class:`glc.utils.SplitMix64`
+        """
+        return SplitMix64(mix_seed(self.seed, self.rng_index, round(t * 1e9)))
+
+    def frame_key(self, t):
+        """Returns what this shape (and its children) would be drawn with at time ``t``.
+
+        Two times with the same key produce the same drawing, as
+        properties only depend on the eased time. That's the case
+        for the mirrored halves of looping animations, for example.
+
+        Returns
+        -------
+        tuple or ``None``
+            ``None`` if the drawing can't be predicted, like
+            when the shape shakes.
+        """
+        styles = getattr(self, "default_styles", {})
+        if self.props.get("shake", styles.get("shake", 0)):
+            return None
+
+        time = t * self.props.get("speed_mult", 1) + self.props.get("phase", 0)
+        key = [round(self.interpolate(time), 9)]
+
+        for shape in self.shapes:
+            child_key = shape.frame_key(t)
+            if child_key is None:
+                return None
+            key.append(child_key)
+
+        return tuple(key)
+
     def interpolate(self, t, wrap=True):
         if wrap:
             t %= 1
@@ -177,6 +303,57 @@ class Shape:
 
         return t
 
+    def interpolate_array(self, times, wrap=True):
+        """Does what :meth:`interpolate` does, for an array of times at once.
+
+        Parameters
+        ----------
+        times : numpy array
+            The times to interpolate.
+
+        Returns
+        -------
+        numpy array
+            The eased times.
+        """
+        t = numpy.asarray(times, numpy.float64)
+
+        if wrap:
+            t = numpy.mod(t, 1)
+
+        if self.loop:
+            t = numpy.where(t < 0.5, t * 2, (1 - t) * 2)
+
+        return ease_array(self.ease, t)
+
+    def prepare_timeline(self, times):
+        """Eases all the times this shape will be rendered at, in one go.
+
+        When rendering at one of these times, the eased time is looked up
+        instead of being computed. Properties that interpolate between
+        a list of numbers are evaluated for every time too, and looked up
+        the same way. Changing the shape's properties, easing or looping
+        drops the timeline.
+
+        Parameters
+        ----------
+        times : list of floats
+            The times the shape will be rendered at, like the ones
+            from :meth:`Animation.frame_times`.
+        """
+        local = numpy.asarray(times, numpy.float64) * self.props.get("speed_mult", 1) + self.props.get("phase", 0)
+        eased = self.interpolate_array(local)
+        self._timeline = dict(zip(times, eased.tolist()))
+
+        for name, value in self.props.items():
+            values = timeline_number(value, eased)
+            if values is not None:
+                table = dict(zip(eased.tolist(), values.tolist()))
+                self._evaluators[(compile_number, name)] = _lookup(table, compile_number(value))
+
+        for shape in self.shapes:
+            shape.prepare_timeline(times)
+
     def start_draw(self, context, t):
         context.save()
 
@@ -192,7 +369,8 @@ class Shape:
 
         try:
             shake = self.get_number("shake", t, self.default_styles["shake"])
-            context.translate(randrange(-shake, shake), randrange(-shake, shake))
+            if shake:
+                context.translate(randrange(-shake, shake, self.rng), randrange(-shake, shake, self.rng))
         except ValueError:
             pass
 
@@ -229,26 +407,72 @@ class Shape:
         context.close_path()
         context.restore()
 
+    def get_evaluator(self, compiler, prop, *args):
+        """Returns the compiled function of ``t`` for a property.
+
+        Parameters
+        ----------
+        compiler : callable
+            One of the ``compile_*`` functions in :mod:`glc.value_parser`.
+        prop : str
+            The name of the property.
+        args
+            Extra arguments for the compiler, passed before the property value.
+
+        Returns
+        -------
+        callable or ``None``
+            ``None`` if the property is not set.
+        """
+        key = (compiler, prop) + args
+
+        try:
+            return self._evaluators[key]
+        except KeyError:
+            evaluator = compiler(*args, self.props.get(prop, None))
+            self._evaluators[key] = evaluator
+            return evaluator
+
     def get_number(self, prop, t, default):
-        return get_number(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_number, prop)
+        return default if evaluator is None else evaluator(t)
 
     def get_color(self, prop, t, default):
-        return get_color(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_color, prop)
+        if evaluator is None:
+            return None if default is None else Color(default)
+        return evaluator(t)
 
     def get_string(self, prop, t, default):
-        return get_string(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_string, prop)
+        return default if evaluator is None else evaluator(t)
 
     def get_bool(self, prop, t, default):
-        return get_bool(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_bool, prop)
+        return default if evaluator is None else evaluator(t)
 
     def get_array(self, prop, t, default):
-        return get_array(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_array, prop)
+        return default if evaluator is None else evaluator(t)
 
     def get_point_array(self, prop, t, default):
-        return get_point_array(self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_point_array, prop)
+        return default if evaluator is None else evaluator(t)
 
     def get_image(self, prop, t, default, wrap):
-        return get_image(self.props.get(prop, None), t, default, wrap)
+        evaluator = self.get_evaluator(compile_image, prop, wrap)
+        return default if evaluator is None else evaluator(t)
 
     def get_cairo_constant(self, name, prop, t, default):
-        return get_cairo_constant(name, self.props.get(prop, None), t, default)
+        evaluator = self.get_evaluator(compile_cairo_constant, prop, name)
+        return default if evaluator is None else evaluator(t)
+
+
+def _lookup(table, fallback):
+    # values worked out ahead of time, any other time goes to the fallback
+    def evaluate(t):
+        try:
+            return table[t]
+        except KeyError:
+            return fallback(t)
+    return evaluate
@@ -11,7 +11,6 @@
 """
 
 from math import pi, sin, cos
-from random import random
 
 from .shape import Shape
 from ..utils import curve_path, rad
@@ -19,6 +18,15 @@ from ..utils import curve_path, rad
 
 class Splat(Shape):
 
+    def is_static(self):
+        # nodes are placed differently on every frame if there's any variation
+        return super().is_static() and not self.props.get("variation", 0)
+
+    def frame_key(self, t):
+        if self.props.get("variation", 0):
+            return None
+        return super().frame_key(t)
+
     def make_point(self, angle, radius):
         return (cos(angle) * radius, sin(angle) * radius)
 
@@ -36,9 +44,13 @@ class Splat(Shape):
         slice_ = pi * 2 / (num_nodes * 2)
         angle = 0
         radius_range = radius - inner_radius
+        # only needed if the nodes move around
+        rng = self.rng if variation else None
 
         for i in range(num_nodes):
-            r = radius + variation * (random() * radius_range * 2 - radius_range)
+            r = radius
+            if rng is not None:
+                r += variation * (rng.random() * radius_range * 2 - radius_range)
             points.append(self.make_point(angle - slice_ * (1 + curve), inner_radius))
             points.append(self.make_point(angle + slice_ * curve, inner_radius))
             points.append(self.make_point(angle - slice_ * curve, r))
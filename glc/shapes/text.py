@@ -8,9 +8,9 @@
 
 """
 
-from tempfile import TemporaryFile
 from .shape import Shape
-from ..utils import rad, is_emoji, draw_image
+from ..utils import rad, is_emoji, draw_image, tint_surface
+from ..fonts import default_cache
 
 import os
 import cairo
@@ -24,20 +24,10 @@ class Text(Shape):
         family = self.get_string("family", 0, "sans-serif")
         weight = self.get_string("weight", 0, "normal")
 
-        if weight == "bold":
-            _weight = cairo.FONT_WEIGHT_BOLD
-        else:
-            _weight = cairo.FONT_WEIGHT_NORMAL
-
-        context.save()
-
-        context.select_font_face(family, cairo.FONT_SLANT_NORMAL, _weight)
-        context.set_font_size(size)
-
-        ascent, descent, font_height, max_x_advance, max_y_advance = context.font_extents()
-        x_bearing, y_bearing, width, height, x_advance, y_advance = context.text_extents(text)
-
-        context.restore()
+        fonts = self.props.get("font_cache") or default_cache
+        layout = fonts.get_layout(family, weight, size, text)
+        ascent, descent, font_height, max_x_advance, max_y_advance = layout.font_extents
+        x_bearing, y_bearing, width, height, x_advance, y_advance = layout.extents
 
         extents = {
             "ascent": ascent,
@@ -66,16 +56,22 @@ class Text(Shape):
         tint = self.get_bool("tint", t, False)
         tint_op = self.get_cairo_constant("operator", "tint_op", t, cairo.OPERATOR_HSL_COLOR)
 
-        if weight == "bold":
-            _weight = cairo.FONT_WEIGHT_BOLD
-        else:
-            _weight = cairo.FONT_WEIGHT_NORMAL
+        # nothing to draw, and scaling by 0 isn't allowed
+        if size <= 0:
+            return
+
+        fonts = self.props.get("font_cache") or default_cache
+        font_size = fonts.bucket(size)
 
-        context.select_font_face(family, cairo.FONT_SLANT_NORMAL, _weight)
-        context.set_font_size(size)
+        # cairo picks the scaled font for the transformation in effect when
+        # the glyphs are drawn, so only the face and size are set here
+        context.set_font_face(fonts.get_face(family, weight))
+        context.set_font_size(font_size)
 
-        fascent, fdescent, fheight, fxadvance, fyadvance = context.font_extents()
-        x_off, y_off, tw, th = context.text_extents(text)[:4]
+        # the layout only changes when the text or font do
+        layout = fonts.get_layout(family, weight, font_size, text)
+        fheight = layout.font_extents[2]
+        tw = layout.extents[2]
         nx = -tw / 2
         ny = fheight / 2
 
@@ -83,6 +79,10 @@ class Text(Shape):
         context.scale(self.get_number("scale_x", t, 1), self.get_number("scale_y", t, 1))
         context.rotate(rotation)
 
+        # makes up for the size being rounded
+        if font_size != size:
+            context.scale(size / font_size, size / font_size)
+
         if self.get_bool("centered", t, True):
             context.translate(nx, ny)
 
@@ -90,40 +90,20 @@ class Text(Shape):
             # this is kinda dumb but it's easier
             # than bringing in something like pango
             # (and it wouldn't support emoji image sets anyway)
-            for char in text:
-                te = context.text_extents(char)
-
+            for char, glyphs, te in layout.chars:
                 context.save()
 
                 if is_emoji(char):
                     hex_val = char.encode("unicode-escape").decode("ascii").lstrip("\\U0")
 
-                    if char not in self.props.get("emoji_cache"):
-                        # TODO: not assume that .png is the format available
-                        path = os.path.abspath(os.path.join(self.props["emoji_path"], hex_val + ".png"))
-                        emoji = cairo.ImageSurface.create_from_png(path)
-                        self.props.get("emoji_cache")[char] = emoji
-                    else:
-                        emoji = self.props.get("emoji_cache")[char]
+                    # TODO: not assume that .png is the format available
+                    path = os.path.abspath(os.path.join(self.props["emoji_path"], hex_val + ".png"))
+                    emoji = self.props["emoji_cache"].load_emoji(path)
+                    if self.props.get("atlas") is not None:
+                        emoji = self.props["atlas"].add(emoji)
 
                     if tint:
-                        # necessary to prevent reuse
-                        f = TemporaryFile()
-                        emoji.write_to_png(f)
-                        f.seek(0)
-                        _emoji = cairo.ImageSurface.create_from_png(f)
-                        b = cairo.Context(_emoji)
-
-                        # create alpha mask
-                        mask = cairo.ImageSurface(cairo.FORMAT_A8, _emoji.get_width(), _emoji.get_height())
-                        maskctx = cairo.Context(mask)
-                        maskctx.set_source_surface(_emoji)
-                        maskctx.paint()
-
-                        # paint
-                        b.set_operator(tint_op)
-                        b.set_source_rgba(*self.get_color("fill", t, self.default_styles["fill"]))
-                        b.mask(cairo.SurfacePattern(mask))
+                        _emoji = tint_surface(emoji, self.get_color("fill", t, self.default_styles["fill"]), tint_op)
                     else:
                         _emoji = emoji
 
@@ -131,7 +111,7 @@ class Text(Shape):
                     # if we scaled based on width, the emoji would be too small
                     draw_image(context, _emoji, 0, -fheight * 0.5, te[3], te[3])
                 else:
-                    context.text_path(char)
+                    context.glyph_path(glyphs)
 
                     if self.props.get("stroke_before", False):
                         if self.props.get("stroke", False):
@@ -154,5 +134,5 @@ class Text(Shape):
                 context.restore()
                 context.translate(te[4], te[5])
         else:
-            context.text_path(text)
+            context.glyph_path(layout.glyphs)
             self.draw_fill_and_stroke(context, t, True, False)
@@ -12,10 +12,18 @@
 
 from bisect import bisect_left
 from math import sqrt, sin, cos, tan, acos, pi, floor, degrees, radians
-from random import random
+from random import random, Random
+from functools import lru_cache
+from hashlib import sha512
+from collections import OrderedDict
 from PIL import Image, ImageSequence
+from .atlas import AtlasRegion
 
+import os
 import re
+import sys
+import cairo
+import numpy
 
 # math utils
 
@@ -71,15 +79,106 @@ def remap(value, src_min, src_max, dst_min, dst_max):
     return lerp(norm(value, src_min, src_max), dst_min, dst_max)
 
 
-def randrange(start, end):
+def randrange(start, end, rng=None):
     """Returns a random float in the range defined by ``start`` and ``end``.
 
+    Parameters
+    ----------
+    start : float
+    end : float
+    rng : :class:`random.Random`
+        Where the random value comes from. Defaults to ``None``,
+        which uses the global one from the ``random`` module.
+
     Returns
     -------
     float
         The random value.
     """
-    return start + random() * (end - start)
+    value = random() if rng is None else rng.random()
+    return start + value * (end - start)
+
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _splitmix(z):
+    z = (z + 0x9e3779b97f4a7c15) & _MASK_64
+    z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & _MASK_64
+    z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & _MASK_64
+    return z ^ (z >> 31)
+
+
+@lru_cache(maxsize=64)
+def _seed_value(seed):
+    if isinstance(seed, int):
+        return seed & _MASK_64
+    # the same on every run, unlike hash()
+    return int.from_bytes(sha512(repr(seed).encode("utf-8")).digest()[:8], "little")
+
+
+def mix_seed(seed, *values):
+    """Combines a seed with some integers into a new 64 bit seed.
+
+    Parameters
+    ----------
+    seed : int or str
+    values : ints
+
+    Returns
+    -------
+    int
+    """
+    z = _splitmix(_seed_value(seed))
+    for value in values:
+        z = _splitmix(z ^ (value & _MASK_64))
+    return z
+
+
+class SplitMix64(Random):
+
+    """A :class:`random.Random` that's cheap to make and to seed.
+
+    Seeding the default generator (Mersenne Twister) fills in a
+    table of 624 numbers, which takes longer than most shapes take
+    to draw. This one uses SplitMix64 instead, which only has one
+    64 bit number as its state. It's good enough for shaking things
+    around, not for anything that needs to be secure.
+
+    Parameters
+    ----------
+    seed : int
+        The seed, only the lowest 64 bits are used.
+    """
+
+    def seed(self, a=None):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        self._state = _seed_value(a)
+        self.gauss_next = None
+
+    def _next(self):
+        self._state = (self._state + 0x9e3779b97f4a7c15) & _MASK_64
+        z = self._state
+        z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & _MASK_64
+        z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & _MASK_64
+        return z ^ (z >> 31)
+
+    def random(self):
+        # the top 53 bits, as many as a float holds
+        return (self._next() >> 11) * (1.0 / 9007199254740992)
+
+    def getrandbits(self, k):
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self._next() << shift
+        return bits & ((1 << k) - 1)
+
+    def getstate(self):
+        return self._state, self.gauss_next
+
+    def setstate(self, state):
+        self._state, self.gauss_next = state
 
 
 def bezier(v, x0, x1, x2, x3):
@@ -238,8 +337,84 @@ def pick_closest(n, l):
     return before
 
 
+# cache utils
+
+class LRUCache:
+
+    """A dict that only keeps the entries that were used most recently.
+
+    Each entry has a size, 1 unless given. When the sizes add up to
+    more than ``max_size``, the entries used least recently are dropped
+    first. The newest entry always stays, even if it's too big on its own.
+
+    Parameters
+    ----------
+    max_size : int
+        How big the entries can get, all together.
+    on_evict : callable
+        Called with the key and value of each entry that's dropped
+        to make room. Defaults to ``None``.
+
+    Attributes
+    ----------
+    size : int
+        How big the entries are right now, all together.
+    """
+
+    def __init__(self, max_size, on_evict=None):
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """Returns the value for ``key``, marking it as the most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size=1):
+        """Adds an entry, dropping the least recently used ones if needed."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+
+        self._entries[key] = (value, size)
+        self.size += size
+
+        while self.size > self.max_size and len(self._entries) > 1:
+            dropped_key, (dropped, dropped_size) = self._entries.popitem(last=False)
+            self.size -= dropped_size
+            if self.on_evict is not None:
+                self.on_evict(dropped_key, dropped)
+
+    def values(self):
+        return [value for value, _ in self._entries.values()]
+
+    def clear(self):
+        """Drops every entry, without calling ``on_evict``."""
+        self._entries.clear()
+        self.size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
 # cairo utils
 
+# where each RGBA channel lives in a pixel of a cairo ARGB32 surface
+# cairo stores pixels as native-endian 32-bit integers, so on
+# little-endian machines the bytes end up as BGRA
+if sys.byteorder == "little":
+    RGBA_CHANNELS = (2, 1, 0, 3)
+else:
+    RGBA_CHANNELS = (1, 2, 3, 0)
+
 # TODO: remove this
 def bgra_to_rgba(surface):
     """Converts a Cairo surface color format from BGRA to RGBA, using Pillow/PIL.
@@ -265,6 +440,61 @@ def bgra_to_rgba(surface):
     return img.tobytes('raw', 'RGBA', 0, 1)
 
 
+def surface_from_array(array):
+    """Creates a Cairo surface from an image stored in a numpy array.
+
+    The pixels are premultiplied and reordered for Cairo
+    all at once, without going through an image file.
+
+    Parameters
+    ----------
+    array : numpy array
+        The image, with shape ``(height, width)`` for grayscale,
+        or ``(height, width, channels)`` with 1 (gray), 2 (gray and alpha),
+        3 (RGB) or 4 (RGBA) channels. Integer values go from 0 to the
+        maximum of their type, floats go from 0.0 to 1.0.
+
+    Returns
+    -------
+    :class:`cairo.ImageSurface`
+        An ARGB32 surface with the image.
+    """
+    array = numpy.asarray(array)
+
+    if array.ndim == 2:
+        array = array[:, :, None]
+
+    if array.dtype.kind == "f":
+        array = (numpy.clip(array, 0, 1) * 255 + 0.5).astype(numpy.uint8)
+    elif array.dtype != numpy.uint8:
+        array = (array.astype(numpy.float64) * (255 / numpy.iinfo(array.dtype).max) + 0.5).astype(numpy.uint8)
+
+    height, width, channels = array.shape
+
+    if channels in (1, 2):
+        rgb = numpy.repeat(array[:, :, :1], 3, axis=2)
+    else:
+        rgb = array[:, :, :3]
+
+    stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_ARGB32, width)
+    data = numpy.empty((height, stride), numpy.uint8)
+    pixels = data[:, :width * 4].reshape(height, width, 4)
+
+    if channels in (2, 4):
+        alpha = array[:, :, -1:].astype(numpy.uint16)
+        # cairo wants the color already multiplied by the alpha
+        rgb = (rgb * alpha + 127) // 255
+        pixels[:, :, RGBA_CHANNELS[3]] = alpha[:, :, 0]
+    else:
+        pixels[:, :, RGBA_CHANNELS[3]] = 255
+
+    for index in range(3):
+        pixels[:, :, RGBA_CHANNELS[index]] = rgb[:, :, index]
+
+    # the surface uses the array's memory directly, and keeps it alive
+    return cairo.ImageSurface.create_for_data(data, cairo.FORMAT_ARGB32, width, height, stride)
+
+
 def draw_image(ctx, img, x, y, w=None, h=None):
     """Draws an image on a given Cairo context.
 
@@ -279,7 +509,7 @@ def draw_image(ctx, img, x, y, w=None, h=None):
     ----------
     ctx : :class:`cairo.Context`
         The context to draw an image on.
-    img : :class:`cairo.Surface`
+    img : :class:`cairo.Surface` or :class:`glc.atlas.AtlasRegion`
         The image (as a Cairo surface) to draw.
     x : float
         Horizontal position to draw the image on.
@@ -302,12 +532,73 @@ def draw_image(ctx, img, x, y, w=None, h=None):
     ctx.translate(x, y)
     ctx.scale(w / sourcew, h / sourceh)
 
-    ctx.set_source_surface(img, 0, 0)
-    ctx.paint()
+    if isinstance(img, AtlasRegion):
+        img.paint(ctx)
+    else:
+        ctx.set_source_surface(img, 0, 0)
+        ctx.paint()
 
     ctx.restore()
 
 
+# tinted copies of surfaces, so the same tint isn't redone every frame
+# the cache is bounded, so tints that change every frame can't grow it forever
+TINT_CACHE_SIZE = 256
+
+_tint_cache = LRUCache(TINT_CACHE_SIZE)
+
+
+def tint_surface(surface, color, operator=cairo.OPERATOR_HSL_COLOR):
+    """Returns a copy of a surface with a color painted over it.
+
+    The color is only painted where the surface isn't transparent.
+    Results are cached, so tinting the same surface with the same
+    color again is just a lookup. The returned surface is shared,
+    so it shouldn't be drawn on.
+
+    Parameters
+    ----------
+    surface : :class:`cairo.ImageSurface` or :class:`glc.atlas.AtlasRegion`
+        The surface to tint. It's left untouched.
+    color : :class:`Color`
+        The color to tint with.
+    operator : int
+        The Cairo operator used to paint the color.
+        Defaults to ``cairo.OPERATOR_HSL_COLOR``.
+
+    Returns
+    -------
+    :class:`cairo.ImageSurface`
+        The tinted surface.
+    """
+    if isinstance(surface, AtlasRegion):
+        surface = surface.to_surface()
+
+    key = (id(surface), tuple(color), operator)
+    cached = _tint_cache.get(key)
+
+    # the entry keeps the surface alive, so its id can't be reused
+    if cached is not None and cached[0] is surface:
+        return cached[1]
+
+    tinted = cairo.ImageSurface(cairo.FORMAT_ARGB32, surface.get_width(), surface.get_height())
+    ctx = cairo.Context(tinted)
+
+    ctx.set_source_surface(surface, 0, 0)
+    ctx.set_operator(cairo.OPERATOR_SOURCE)
+    ctx.paint()
+
+    # the surface's own alpha is the mask
+    ctx.set_operator(operator)
+    ctx.set_source_rgba(*color)
+    ctx.mask_surface(surface, 0, 0)
+    tinted.flush()
+
+    _tint_cache.put(key, (surface, tinted))
+
+    return tinted
+
+
 def quadratic_curve_to(context, x1, y1, x2, y2):
     """Adds a quadratic Bézier spline to the path from
     the current point to position (x2, y2) in user-space
@@ -11,11 +11,13 @@
 """
 
 from numbers import Number
+from collections.abc import Sequence
 from math import floor
 from .utils import lerp, clamp, quadratic, bezier
 from .color import Color, str2color, clerp, multi_clerp
 
 import cairo
+import numpy
 
 
 # TODO: make these parsers more robust.
@@ -25,6 +27,31 @@ def is_arr(item):
     return isinstance(item, (tuple, list))
 
 
+def is_frames(item):
+    """Whether an image property holds a sequence of frames.
+
+    Besides lists and tuples, that's any other sequence
+    that isn't a string, like lazily decoded image frames.
+    """
+    return is_arr(item) or (isinstance(item, Sequence) and not isinstance(item, (str, bytes)))
+
+
+def is_constant(prop, array=False):
+    """Whether a property has the same value at any time ``t``.
+
+    ``array`` should be set for properties read as arrays
+    (with ``get_array`` or ``get_point_array``), where a list
+    on its own is just a value and not something to animate.
+    """
+    if callable(prop):
+        return False
+    if not is_arr(prop):
+        return True
+    if array:
+        return not (len(prop) == 2 and is_arr(prop[0]) and len(prop[0]) and is_arr(prop[1]) and len(prop[1]))
+    return len(prop) < 2
+
+
 def pick_from_array(prop, t, interpolate=True):
     if interpolate:
         if len(prop) == 2:
@@ -264,3 +291,240 @@ def get_cairo_constant(name, prop, t, default):
         out = prop
 
     return out
+
+
+# compiling
+#
+# the functions below turn a property into a function of t, doing
+# all the type checks and parsing above just once. the result is
+# None if the property isn't set, in which case callers use their default.
+# they should always return the same values as their get_* counterparts.
+
+
+def _constant(value):
+    return lambda t: value
+
+
+def compile_pick(prop, interpolate=True):
+    if interpolate:
+        if len(prop) == 2:
+            start, end = prop
+            delta = end - start
+            return lambda t: delta * t + start
+        if len(prop) == 3:
+            x0, x1, x2 = prop
+            return lambda t: quadratic(t, x0, x1, x2)
+        elif len(prop) == 4:
+            x0, x1, x2, x3 = prop
+            return lambda t: bezier(t, x0, x1, x2, x3)
+
+    items = tuple(prop)
+    length = len(items)
+    return lambda t: items[clamp(floor(t * length), 0, length - 1)]
+
+
+def timeline_number(prop, t):
+    """Evaluates a list of numbers to interpolate at many times at once.
+
+    Parameters
+    ----------
+    prop
+        The property value.
+    t : numpy array
+        The times to evaluate at.
+
+    Returns
+    -------
+    numpy array or ``None``
+        The values at each time, or ``None`` if the property isn't
+        a list of 2 to 4 numbers.
+    """
+    if not is_arr(prop) or not 2 <= len(prop) <= 4:
+        return None
+
+    if not all(isinstance(value, Number) and not isinstance(value, bool) for value in prop):
+        return None
+
+    # the compiled functions are plain arithmetic, so they work on arrays as well
+    return compile_pick(prop)(t)
+
+
+def compile_number(prop):
+    if prop is None:
+        return None
+
+    if isinstance(prop, Number):
+        return _constant(prop)
+    elif callable(prop):
+        return prop
+    elif is_arr(prop):
+        return compile_pick(prop)
+    elif isinstance(prop, str):
+        try:
+            return _constant(int(prop))
+        except Exception:
+            return _constant(float(prop))
+
+    return _constant(None)
+
+
+def compile_string(prop):
+    if prop is None:
+        return None
+
+    if isinstance(prop, str):
+        return _constant(prop)
+    elif callable(prop):
+        return prop
+    elif is_arr(prop):
+        return compile_pick(prop, False)
+
+    return _constant(None)
+
+
+def compile_bool(prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif isinstance(prop, (list, tuple)):
+        return compile_pick(prop, False)
+    elif isinstance(prop, str):
+        return _constant(str2bool(prop))
+
+    return _constant(prop)
+
+
+def compile_array(prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif prop and (len(prop) == 2) and is_arr(prop[0]) and len(prop[0]) and is_arr(prop[1]) and len(prop[1]):
+        pairs = tuple(zip(prop[0], prop[1]))
+        return lambda t: [lerp(t, v0, v1) for v0, v1 in pairs]
+    elif prop and len(prop) > 1:
+        return _constant(prop)
+
+    return None
+
+
+def compile_point_array(prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif prop and (len(prop) == 2) and is_arr(prop[0]) and len(prop[0]) and is_arr(prop[1]) and len(prop[1]):
+        pairs = tuple(zip(prop[0], prop[1]))
+        return lambda t: [[lerp(t, v0[0], v1[0]), lerp(t, v0[1], v1[1])] for v0, v1 in pairs]
+    elif prop and len(prop) > 1:
+        return _constant(prop)
+
+    return None
+
+
+def compile_image(mode, prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif is_frames(prop):
+        # copying other sequences could mean decoding every frame
+        items = tuple(prop) if isinstance(prop, list) else prop
+        length = len(items)
+        if mode == "wrap":
+            return lambda t: items[floor(t * length) % length]
+        return lambda t: items[clamp(floor(t * length), 0, length - 1)]
+
+    return _constant(prop)
+
+
+def compile_color(prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif isinstance(prop, Color):
+        return _constant(prop)
+    elif is_arr(prop):
+        if len(prop) == 2:
+            color_a, color_b = Color(prop[0]), Color(prop[1])
+            return lambda t: clerp(t, color_a, color_b)
+        elif len(prop) > 2:
+            colors = tuple(map(Color, prop))
+            return lambda t: multi_clerp(t, *colors)
+        return _constant(Color(prop[0]))
+    elif isinstance(prop, bool):
+        return _constant(prop)
+
+    return _constant(Color(prop))
+
+
+def compile_instances(prop):
+    """Compiles a property with a value for each instance of an instanced shape.
+
+    Numpy arrays hold one value per instance, and plain numbers are
+    shared by all of them. Lists and tuples of up to four of those are
+    interpolated like any other property, longer ones pick a value
+    based on time, and callables should return one of those.
+    The compiled function always returns a float numpy array.
+    """
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return lambda t: numpy.asarray(prop(t), numpy.float64)
+    elif is_arr(prop) and len(prop) >= 2:
+        # the compiled arithmetic works just as well on arrays,
+        # and longer lists step through their values
+        return compile_pick([numpy.asarray(value, numpy.float64) for value in prop])
+    elif is_arr(prop):
+        return _constant(numpy.asarray(prop[0], numpy.float64))
+
+    return _constant(numpy.asarray(prop, numpy.float64))
+
+
+def _color_array(value):
+    if isinstance(value, numpy.ndarray) and value.ndim == 2:
+        colors = value.astype(numpy.float64)
+        if colors.shape[1] == 3:
+            colors = numpy.concatenate((colors, numpy.ones((len(colors), 1))), axis=1)
+        return colors
+    return numpy.array([tuple(Color(value))], numpy.float64)
+
+
+def compile_instance_colors(prop):
+    """Compiles a color property for the instances of an instanced shape.
+
+    An ``(n, 3)`` or ``(n, 4)`` numpy array holds one RGB(A) color per
+    instance, with channels from 0.0 to 1.0. Anything else is a single
+    color for all of them, which can be animated as usual. The compiled
+    function returns an ``(n, 4)`` (or ``(1, 4)``) array.
+    """
+    if prop is None:
+        return None
+
+    if isinstance(prop, numpy.ndarray) and prop.ndim == 2:
+        return _constant(_color_array(prop))
+    elif callable(prop):
+        return lambda t: _color_array(prop(t))
+
+    evaluator = compile_color(prop)
+    return lambda t: _color_array(evaluator(t))
+
+
+def compile_cairo_constant(name, prop):
+    if prop is None:
+        return None
+
+    if callable(prop):
+        return prop
+    elif isinstance(prop, str):
+        return _constant(_CAIRO_CONSTANTS[name.lower()][prop.lower()])
+
+    return _constant(prop)
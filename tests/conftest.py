@@ -0,0 +1,41 @@
+"""
+
+    Shared fixtures for the tests.
+
+    Everything in glc needs pycairo (or cairocffi installed as pycairo),
+    which isn't installed along with the package, so each test module
+    skips itself when it's missing, along with anything else it needs.
+
+"""
+
+import pytest
+
+
+def _add_scene(render_list):
+    w, h = render_list.width, render_list.height
+    render_list.rect(x=w / 2, y=h / 2, w=w, h=h, fill="navy", stroke=False)
+    render_list.circle(x=w / 4, y=h / 4, radius=10, fill="orange", stroke="white")
+    render_list.circle(x=[0, w], y=h / 2, radius=[5, 20], fill="red", stroke=False)
+    render_list.rect(x=w / 2, y=h / 2, w=20, h=20, rotation=[0, 90], fill=False, stroke="yellow", line_width=3)
+    render_list.line(x0=0, y0=h - 5, x1=w, y1=h - 5, stroke="white", line_width=2)
+    return render_list
+
+
+@pytest.fixture
+def add_scene():
+    """Adds a small scene with static, animated and overlapping shapes to a render list."""
+    return _add_scene
+
+
+# some times repeat, and some go backwards, like looping animations do
+TIMES = [0, 0.1, 0.25, 0.25, 0.5, 0.8, 0.1]
+
+
+def _render_frames(render_list, times=TIMES, frame_format="rgba"):
+    return [render_list.render(t, frame_format=frame_format).copy() for t in times]
+
+
+@pytest.fixture
+def render_frames():
+    """Renders a render list at a few times, and copies each frame."""
+    return _render_frames
@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+imageio = pytest.importorskip("imageio")
+
+from glc import RenderList
+from glc.assets import AssetCache
+
+
+def write_image(path, color, size=16):
+    pixels = numpy.zeros((size, size, 4), numpy.uint8)
+    pixels[...] = color
+    imageio.imwrite(path, pixels)
+    return path
+
+
+def test_render_lists_share_decoded_images(tmp_path):
+    path = write_image(str(tmp_path / "red.png"), (255, 0, 0, 255))
+    cache = AssetCache()
+
+    first = RenderList(width=16, height=16, asset_cache=cache).image(img=path)
+    second = RenderList(width=16, height=16, asset_cache=cache).image(img=path)
+    assert first.props["image_surfaces"][0] is second.props["image_surfaces"][0]
+
+
+def test_least_recently_used_images_are_dropped(tmp_path):
+    paths = [write_image(str(tmp_path / "{}.png".format(i)), (i * 60, 0, 0, 255)) for i in range(3)]
+    cache = AssetCache(max_bytes=2 * 16 * 16 * 4)
+
+    first = cache.load_image(paths[0])[0]
+    cache.load_image(paths[1])
+    assert cache.load_image(paths[0])[0] is first
+
+    cache.load_image(paths[2])
+    assert cache.size <= cache.max_bytes
+    assert cache.load_image(paths[0])[0] is first
+
+
+def test_edited_files_are_decoded_again(tmp_path):
+    path = write_image(str(tmp_path / "image.png"), (255, 0, 0, 255))
+    cache = AssetCache()
+    before = cache.load_image(path)[0]
+
+    write_image(path, (0, 0, 255, 255), size=8)
+    after = cache.load_image(path)[0]
+    assert after is not before
+    assert after[0].get_width() == 8
+
+
+def test_directory_cache_matches_decoding(tmp_path):
+    path = write_image(str(tmp_path / "image.png"), (10, 200, 30, 255))
+    directory = str(tmp_path / "cache")
+
+    decoded = AssetCache(directory=directory).load_image(path)[0][0]
+    loaded = AssetCache(directory=directory).load_image(path)[0][0]
+
+    def pixels(surface):
+        surface.flush()
+        return bytes(surface.get_data())
+
+    assert pixels(loaded) == pixels(decoded)
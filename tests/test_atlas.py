@@ -0,0 +1,87 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+imageio = pytest.importorskip("imageio")
+
+from glc import RenderList
+from glc.atlas import Atlas, AtlasRegion
+from glc.assets import AssetCache
+from glc.utils import surface_from_array
+
+
+def solid(color, size=16):
+    pixels = numpy.zeros((size, size, 4), numpy.uint8)
+    pixels[...] = color
+    return pixels
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for name, color in (("red", (255, 0, 0, 255)), ("blue", (0, 0, 255, 255))):
+        path = str(tmp_path / (name + ".png"))
+        imageio.imwrite(path, solid(color))
+        paths.append(path)
+    return paths
+
+
+def draw(paths, atlas, **kwargs):
+    render_list = RenderList(width=64, height=64, atlas=atlas, asset_cache=AssetCache())
+    for index, path in enumerate(paths):
+        render_list.image(img=path, x=16 + index * 32, y=32, **kwargs)
+    return render_list.render(0)
+
+
+@pytest.mark.parametrize("options", [{"w": 16, "h": 16}, {"w": 16, "h": 16, "alpha": 0.5}])
+def test_atlas_draws_the_same(images, options):
+    numpy.testing.assert_array_equal(draw(images, False, **options), draw(images, True, **options))
+
+
+def test_regions_share_their_page_pattern():
+    atlas = Atlas(page_size=64)
+    blue = atlas.add(surface_from_array(solid((0, 0, 255, 255))))
+    red = atlas.add(surface_from_array(solid((255, 0, 0, 255))))
+
+    assert isinstance(red, AtlasRegion) and red.page is blue.page
+    assert red.pattern is blue.pattern is atlas.patterns[0]
+
+
+def test_atlas_regions_dont_bleed():
+    # packed next to each other, with just the gutter in between
+    atlas = Atlas(page_size=64)
+    atlas.add(surface_from_array(solid((0, 0, 255, 255))))
+    red = atlas.add(surface_from_array(solid((255, 0, 0, 255))))
+
+    render_list = RenderList(width=64, height=64)
+    render_list.context.scale(4, 4)
+    red.paint(render_list.context)
+    render_list.surface.flush()
+    # scaling the red one up must not pick up any of the blue one
+    pixels = render_list.get_frame()
+    assert (pixels[..., 0] > 0).all()
+    assert (pixels[..., 2] == 0).all()
+
+
+def test_to_surface_copies_the_region():
+    atlas = Atlas(page_size=64)
+    atlas.add(surface_from_array(solid((0, 0, 255, 255))))
+    red = atlas.add(surface_from_array(solid((255, 0, 0, 255))))
+
+    surface = red.to_surface()
+    surface.flush()
+    assert (surface.get_width(), surface.get_height()) == (16, 16)
+    assert bytes(surface.get_data()) == bytes(surface_from_array(solid((255, 0, 0, 255))).get_data())
+
+
+def test_evicted_surfaces_leave_the_atlas(images):
+    cache = AssetCache(max_bytes=1)
+    atlas = Atlas()
+    cache.add_atlas(atlas)
+
+    first = cache.load_image(images[0])[0][0]
+    atlas.add(first)
+    assert len(atlas._regions) == 1
+
+    cache.load_image(images[1])
+    assert len(atlas._regions) == 0
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc.color import Color, parse_color
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("red", (1.0, 0.0, 0.0, 1.0)),
+    ("#00ff00", (0.0, 1.0, 0.0, 1.0)),
+    (0xff0000ff, (0.0, 0.0, 1.0, 1.0)),
+    (numpy.uint32(0xff0000ff), (0.0, 0.0, 1.0, 1.0)),
+    ([0.5, 0.25, 1], (0.5, 0.25, 1.0, 1.0)),
+    ((0.5, 0.25, 1, 0.5), (0.5, 0.25, 1.0, 0.5)),
+    (numpy.array([0.5, 0.25, 1]), (0.5, 0.25, 1.0, 1.0))
+])
+def test_parse_color(value, expected):
+    assert parse_color(value) == pytest.approx(expected)
+
+
+def test_parse_color_rejects_other_lengths():
+    with pytest.raises(ValueError):
+        parse_color([0.5, 0.5])
+
+
+def test_parsed_colors_are_cached():
+    parse_color.cache_clear()
+    parse_color("orange")
+    parse_color("orange")
+    Color("orange")
+    # sequences aren't parsed, so they skip the cache
+    parse_color([1, 0.5, 0])
+
+    info = parse_color.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+
+def test_cached_colors_arent_shared():
+    color = Color("navy")
+    color.lighten(0.5)
+    assert tuple(Color("navy")[:]) == parse_color("navy")
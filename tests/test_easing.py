@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc.easing import EASING_FUNCTIONS, ARRAY_EASING_FUNCTIONS, ease_array
+
+
+# plenty of points, plus the ends and the middle where most easings switch halves
+TIMES = numpy.concatenate((numpy.linspace(0, 1, 1001), [0.25, 0.5 - 1e-9, 0.5, 0.5 + 1e-9, 0.75]))
+
+
+def test_every_easing_has_an_array_version():
+    assert sorted(ARRAY_EASING_FUNCTIONS) == sorted(EASING_FUNCTIONS)
+
+
+@pytest.mark.parametrize("name", sorted(EASING_FUNCTIONS))
+def test_array_easing_matches_scalar(name):
+    expected = [EASING_FUNCTIONS[name](t) for t in TIMES.tolist()]
+    numpy.testing.assert_allclose(ease_array(name, TIMES), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_callables_and_unknown_names():
+    numpy.testing.assert_allclose(ease_array(lambda t: t * t, TIMES), TIMES ** 2)
+    numpy.testing.assert_array_equal(ease_array("not an easing", TIMES), TIMES)
+    assert ease_array("sine", TIMES.reshape(-1, 2)).shape == (len(TIMES) // 2, 2)
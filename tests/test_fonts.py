@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("cairo")
+pytest.importorskip("numpy")
+
+from glc import RenderList
+from glc.fonts import FontCache, TextLayout
+
+
+def test_layouts_are_reused():
+    fonts = FontCache()
+    layout = fonts.get_layout("sans-serif", "normal", 20, "hello")
+
+    assert fonts.get_layout("sans-serif", "normal", 20, "hello") is layout
+    assert fonts.get_layout("sans-serif", "bold", 20, "hello") is not layout
+    assert fonts.get_layout("sans-serif", "normal", 20, "world") is not layout
+    assert fonts.get_scaled_font("sans-serif", "normal", 20) is fonts.get_scaled_font("sans-serif", "normal", 20)
+    assert fonts.get_face("serif", "bold") is fonts.get_face("serif", "bold")
+
+
+def test_layouts_have_a_glyph_list_per_char():
+    fonts = FontCache()
+    layout = fonts.get_layout("sans-serif", "normal", 20, "abca")
+
+    assert isinstance(layout, TextLayout)
+    assert [char for char, _, _ in layout.chars] == list("abca")
+    assert len(layout.glyphs) == 4
+    # the same char is only laid out once
+    assert layout.chars[0] is layout.chars[3]
+    assert layout.extents[2] > 0
+
+
+def test_text_shapes_lay_out_once():
+    fonts = FontCache()
+    render_list = RenderList(width=60, height=40, font_cache=fonts)
+    render_list.text(x=30, y=20, text="hi", size=12, rotation=[0, 90], scale_x=[1, 2])
+
+    for t in (0, 0.25, 0.5, 0.75):
+        render_list.render(t)
+
+    assert len(fonts._layouts) == 1
+    assert len(fonts._fonts) == 1
+
+
+@pytest.mark.parametrize("size_step, size, expected", [
+    (0, 13.37, 13.37),
+    (0.25, 12, 12),
+    (0.25, 13.37, 13.25),
+    (0.25, 13.4, 13.5),
+    (0.25, 0.01, 0.25),
+    (4, 13, 12),
+    (4, 15, 16)
+])
+def test_sizes_are_bucketed(size_step, size, expected):
+    assert FontCache(size_step).bucket(size) == pytest.approx(expected)
+
+
+def test_animated_sizes_share_layouts():
+    fonts = FontCache()
+    render_list = RenderList(width=60, height=40, font_cache=fonts)
+    render_list.text(x=30, y=20, text="hi", size=[10, 20])
+
+    for index in range(200):
+        render_list.render(index / 199)
+
+    # at most one layout per bucket from 10 to 20, not one per frame
+    assert 1 < len(fonts._layouts) <= 41
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("imageio")
+
+from glc import Animation
+
+
+@pytest.fixture
+def animation(add_scene):
+    def make(**kwargs):
+        a = Animation(width=40, height=30, fps=10, duration=1, **kwargs)
+        add_scene(a.render_list)
+        return a
+
+    return make
+
+
+def test_frame_cache_draws_the_same_frames(animation):
+    plain = [frame.copy() for frame in animation().iter_frames("rgba_reuse")]
+    cached = [frame.copy() for frame in animation(frame_cache=True).iter_frames("rgba_reuse")]
+    numpy.testing.assert_array_equal(plain, cached)
+
+
+def test_frame_sources_find_mirrored_frames(animation):
+    sources = animation().frame_sources()
+
+    # looping animations go back through the same frames
+    assert any(source != index for index, source in enumerate(sources))
+    for index, source in enumerate(sources):
+        assert source <= index
+
+
+def test_shaking_frames_are_never_reused():
+    a = Animation(width=40, height=30, fps=10, duration=1)
+    a.render_list.rect(x=20, y=15, w=10, h=10, shake=3)
+    assert a.frame_sources() == list(range(len(a.frame_times())))
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+from glc.utils import RGBA_CHANNELS
+
+
+def test_frame_formats_match(add_scene):
+    render_list = add_scene(RenderList(width=40, height=30))
+
+    rgba = render_list.render(0.3, frame_format="rgba")
+    reuse = render_list.render(0.3, frame_format="rgba_reuse").copy()
+    bgra = render_list.render(0.3, frame_format="bgra").copy()
+
+    numpy.testing.assert_array_equal(rgba, reuse)
+    numpy.testing.assert_array_equal(bgra[..., list(RGBA_CHANNELS)], rgba)
+
+
+def test_render_into_out(add_scene):
+    render_list = add_scene(RenderList(width=40, height=30))
+    out = numpy.zeros((30, 40, 4), numpy.uint8)
+
+    assert render_list.render(0.6, out=out) is out
+    numpy.testing.assert_array_equal(out, render_list.render(0.6))
+
+
+def test_reused_buffer_is_overwritten(add_scene):
+    render_list = add_scene(RenderList(width=40, height=30))
+    first = render_list.render(0, frame_format="rgba_reuse")
+    second = render_list.render(0.5, frame_format="rgba_reuse")
+
+    assert first is second
+    numpy.testing.assert_array_equal(second, render_list.render(0.5))
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("cairo")
+pytest.importorskip("numpy")
+pytest.importorskip("imageio")
+pytest.importorskip("PIL")
+
+from io import BytesIO
+from PIL import Image, ImageSequence
+from glc import Gif
+
+
+@pytest.fixture
+def gif(add_scene):
+    def make(**kwargs):
+        g = Gif(BytesIO(), width=40, height=30, fps=10, duration=0.5, **kwargs)
+        add_scene(g.render_list)
+        return g
+
+    return make
+
+
+def save(gif):
+    gif.save()
+    return gif.filename.getvalue()
+
+
+def test_imageio_writes_every_frame(gif):
+    g = gif(converter="imageio", color_count=16)
+
+    with Image.open(BytesIO(save(g))) as image:
+        frames = list(ImageSequence.Iterator(image))
+        assert len(frames) == len(g.frame_times())
+        for frame in frames:
+            assert frame.info["duration"] == 100
+            assert len(frame.convert("RGB").getcolors()) <= 16
+
+
+def color_tables(data):
+    """Returns whether the GIF has a global color table, and how many local ones."""
+    has_global = bool(data[10] & 0x80)
+    pos = 13 + (3 << ((data[10] & 7) + 1) if has_global else 0)
+    local = 0
+
+    def skip_sub_blocks(pos):
+        while data[pos]:
+            pos += data[pos] + 1
+        return pos + 1
+
+    while data[pos] != 0x3b:
+        if data[pos] == 0x21:
+            pos = skip_sub_blocks(pos + 2)
+        else:
+            flags = data[pos + 9]
+            pos += 10
+            if flags & 0x80:
+                local += 1
+                pos += 3 << ((flags & 7) + 1)
+            pos = skip_sub_blocks(pos + 1)
+
+    return has_global, local
+
+
+@pytest.mark.parametrize("converter", ["imageio", "native"])
+def test_global_palette_is_the_only_color_table(gif, converter):
+    g = gif(converter=converter, global_palette=True)
+    data = save(g)
+
+    assert color_tables(data) == (True, 0)
+    with Image.open(BytesIO(data)) as image:
+        assert image.n_frames == len(g.frame_times())
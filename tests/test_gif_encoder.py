@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from io import BytesIO
+from PIL import Image, ImageSequence
+from glc.gif_encoder import GifWriter
+from glc.palette import Palette
+
+
+def make_frames(width=32, height=24, count=4):
+    frames = []
+    for index in range(count):
+        frame = numpy.zeros((height, width, 4), numpy.uint8)
+        frame[..., 3] = 255
+        frame[..., :3] = (20, 40, 60)
+        # a block moving across, so each frame changes only part of the image
+        frame[4:12, index * 6:index * 6 + 8, :3] = (255, 128, 0)
+        frame[16:20, :, :3] = (index * 60, 255, index * 30)
+        frames.append(frame)
+    return frames
+
+
+def decode(data):
+    with Image.open(BytesIO(data)) as image:
+        return [numpy.asarray(frame.convert("RGBA")) for frame in ImageSequence.Iterator(image)]
+
+
+def encode(frames, **kwargs):
+    out = BytesIO()
+    height, width = frames[0].shape[:2]
+    with GifWriter(out, width, height, **kwargs) as writer:
+        for frame in frames:
+            writer.append(frame, 0.1)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("global_palette", [False, True])
+def test_round_trip(global_palette):
+    frames = make_frames()
+    palette = Palette.from_frames(frames, 255) if global_palette else None
+    decoded = decode(encode(frames, palette=palette))
+
+    assert len(decoded) == len(frames)
+    for frame, result in zip(frames, decoded):
+        numpy.testing.assert_array_equal(result[..., :3], frame[..., :3])
+
+
+def test_repeated_frames_are_merged():
+    frames = make_frames(count=2)
+    data = encode([frames[0], frames[0], frames[1]])
+
+    with Image.open(BytesIO(data)) as image:
+        assert image.n_frames == 2
+        assert image.info["duration"] == 200
+
+
+def test_transparent_round_trip():
+    frame = make_frames(count=1)[0]
+    frame[:, :8, 3] = 0
+    decoded = decode(encode([frame], transparent=True))[0]
+
+    assert (decoded[:, :8, 3] == 0).all()
+    assert (decoded[:, 8:, 3] == 255).all()
+    numpy.testing.assert_array_equal(decoded[:, 8:, :3], frame[:, 8:, :3])
+
+
+@pytest.mark.parametrize("levels", [2, 4, 256])
+def test_noisy_frames_round_trip(levels):
+    # small palettes use short codes, and noise fills the code table more than once
+    rng = numpy.random.default_rng(1)
+    frame = numpy.zeros((200, 250, 4), numpy.uint8)
+    frame[..., :3] = rng.integers(0, levels, (200, 250, 1)) * (255 // (levels - 1))
+    frame[..., 3] = 255
+    numpy.testing.assert_array_equal(decode(encode([frame]))[0][..., :3], frame[..., :3])
@@ -0,0 +1,63 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+from glc.color import Color
+
+
+def render(add_shapes, t=0.3):
+    render_list = RenderList(width=80, height=60)
+    add_shapes(render_list)
+    return render_list.render(t, frame_format="rgba").astype(int)
+
+
+def assert_same_image(a, b):
+    # the paths are the same, only worked out in a different order
+    assert numpy.abs(a - b).max() <= 2
+
+
+COUNT = 5
+XS = numpy.arange(COUNT) * 15.0 + 10
+FILLS = numpy.array([[1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 1], [1, 1, 0]], numpy.float64)
+
+
+def test_circles_match_circle_shapes():
+    radii = numpy.array([2, 3, 4, 5, 6], numpy.float64)
+
+    def instanced(render_list):
+        # per-instance positions, an interpolated list of arrays and per-instance colors
+        render_list.circles(x=XS, y=[20, 40], radius=[radii, radii * 1.5], fill=FILLS)
+
+    def shapes(render_list):
+        for x, radius, fill in zip(XS, radii, FILLS):
+            render_list.circle(x=x, y=[20, 40], radius=[radius, radius * 1.5], fill=Color(*fill, 1), stroke=False)
+
+    assert_same_image(render(instanced), render(shapes))
+
+
+@pytest.mark.parametrize("fill", [False, "orange"])
+def test_rects_match_rect_shapes(fill):
+    rotations = numpy.arange(COUNT) * 20.0
+
+    def instanced(render_list):
+        # broadcast sizes and a single animated stroke color
+        render_list.rects(x=XS, y=30, w=8, h=[6, 12], rotation=rotations, fill=fill, stroke=["white", "navy"])
+
+    def shapes(render_list):
+        for x, rotation in zip(XS, rotations):
+            render_list.rect(x=x, y=30, w=8, h=[6, 12], rotation=rotation, fill=fill, stroke=["white", "navy"])
+
+    assert_same_image(render(instanced), render(shapes))
+
+
+def test_uncentered_rects_match_rect_shapes():
+    def instanced(render_list):
+        render_list.rects(x=XS, y=XS / 2, w=6, h=4, centered=False, fill=FILLS, stroke=False)
+
+    def shapes(render_list):
+        for x, fill in zip(XS, FILLS):
+            render_list.rect(x=x, y=x / 2, w=6, h=4, centered=False, fill=Color(*fill, 1), stroke=False)
+
+    assert_same_image(render(instanced), render(shapes))
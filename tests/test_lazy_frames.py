@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+imageio = pytest.importorskip("imageio")
+
+from glc import RenderList
+from glc.assets import AssetCache, LazyFrames, decode_image, gif_durations
+
+
+DURATIONS = [20, 50, 30, 120, 40]
+
+
+@pytest.fixture
+def gif(tmp_path):
+    path = str(tmp_path / "frames.gif")
+    frames = []
+    for index in range(len(DURATIONS)):
+        frame = numpy.zeros((16, 16, 4), numpy.uint8)
+        frame[...] = (index * 60, 0, 255 - index * 60, 255)
+        frames.append(frame)
+    imageio.mimwrite(path, frames, duration=DURATIONS, loop=0)
+    return path
+
+
+def pixels(surface):
+    surface.flush()
+    return bytes(surface.get_data())
+
+
+def test_gif_durations_match_decoding(gif):
+    durations = gif_durations(gif)
+    assert durations == decode_image(gif)[1]
+    assert durations == DURATIONS
+
+
+def test_gif_durations_of_other_files(tmp_path):
+    path = str(tmp_path / "image.png")
+    imageio.imwrite(path, numpy.zeros((4, 4, 4), numpy.uint8))
+    assert gif_durations(path) is None
+
+
+def test_lazy_frames_match_eager(gif):
+    eager = RenderList(width=16, height=16, asset_cache=AssetCache()).image(img=gif)
+    lazy = RenderList(width=16, height=16, asset_cache=AssetCache()).image(img=gif, lazy=True)
+
+    frames = lazy.props["image_surfaces"]
+    assert isinstance(frames, LazyFrames)
+    assert len(frames) == len(eager.props["image_surfaces"])
+    assert lazy.frame_durations == eager.frame_durations == DURATIONS
+    assert lazy.duration == eager.duration
+    assert not lazy.is_static()
+
+    # out of order, and going back to frames that were dropped
+    for index in (3, 0, 4, 1, 3):
+        assert pixels(frames[index]) == pixels(eager.props["image_surfaces"][index])
+
+
+def test_lazy_frames_keep_a_few_frames(gif):
+    frames = LazyFrames(gif, read_ahead=1, max_frames=2)
+    frames[0]
+    frames[2]
+    assert len(frames._frames) == 2
+    assert 0 not in frames._frames
+
+
+@pytest.fixture
+def rewinds(monkeypatch):
+    """Counts how often a reader is asked for a frame before the last one it read."""
+    def watch(frames):
+        reader = frames._get_reader()
+        get_data = reader.get_data
+        calls = []
+
+        def record(index):
+            calls.append(index)
+            return get_data(index)
+
+        monkeypatch.setattr(reader, "get_data", record)
+        return lambda: sum(b < a for a, b in zip(calls, calls[1:]))
+
+    return watch
+
+
+def test_lazy_frames_wrap_around(gif, rewinds):
+    eager = decode_image(gif)[0]
+    frames = LazyFrames(gif, read_ahead=1, max_frames=2)
+    count = rewinds(frames)
+
+    # looping through the frames twice
+    order = list(range(len(DURATIONS))) * 2
+    for index in order:
+        assert pixels(frames[index]) == pixels(eager[index])
+    assert count() == 1
+
+
+def test_lazy_frames_played_backwards(gif, rewinds):
+    eager = decode_image(gif)[0]
+    frames = LazyFrames(gif, read_ahead=1, max_frames=3)
+    count = rewinds(frames)
+
+    # ping-pong playback
+    order = list(range(len(DURATIONS))) + list(range(len(DURATIONS) - 2, -1, -1))
+    for index in order:
+        assert pixels(frames[index]) == pixels(eager[index])
+    # the frames before the first one decoded again are kept too
+    assert count() == 1
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("cairo")
+
+from glc.utils import LRUCache
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_sizes_add_up():
+    evicted = []
+    cache = LRUCache(10, lambda key, value: evicted.append(key))
+    cache.put("a", "small", 4)
+    cache.put("b", "small", 4)
+    cache.put("a", "bigger", 6)
+    assert cache.size == 10 and not evicted
+
+    # the newest entry stays, even if it's too big on its own
+    cache.put("c", "huge", 50)
+    assert evicted == ["b", "a"]
+    assert len(cache) == 1 and cache.size == 50
+
+
+def test_clear_doesnt_evict():
+    evicted = []
+    cache = LRUCache(10, lambda key, value: evicted.append(key))
+    cache.put("a", 1)
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0 and not evicted
+    assert cache.get("a", "missing") == "missing"
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc.palette import Palette, exact_colors, median_cut, nearest_colors
+
+
+def test_palette_colors_map_to_themselves():
+    colors = numpy.array([[0, 0, 0], [5, 5, 5], [255, 0, 0], [250, 3, 3], [100, 100, 100]], numpy.uint8)
+    palette = Palette(colors)
+    assert palette.map(colors).tolist() == list(range(len(colors)))
+
+
+def test_map_matches_nearest_in_shared_cells():
+    palette = Palette(numpy.array([[0, 0, 0], [5, 5, 5], [200, 200, 200]], numpy.uint8))
+    pixels = numpy.array([[1, 1, 1], [4, 4, 4], [6, 6, 6], [190, 210, 200]], numpy.uint8)
+    assert palette.map(pixels).tolist() == [0, 1, 1, 2]
+
+
+def test_map_is_close_to_nearest():
+    rng = numpy.random.default_rng(0)
+    pixels = rng.integers(0, 256, (2000, 3), dtype=numpy.uint8)
+    palette = Palette(median_cut(pixels, 64))
+
+    mapped = palette.colors[palette.map(pixels)].astype(float)
+    nearest = palette.colors[nearest_colors(pixels, palette.colors)].astype(float)
+
+    def distances(colors):
+        return numpy.sqrt(((colors - pixels) ** 2).sum(axis=1))
+
+    # cells without a palette color are mapped through their center,
+    # which can only be off by the size of a cell
+    cell_diagonal = 3 ** 0.5 * (1 << 3)
+    assert (distances(mapped) <= distances(nearest) + cell_diagonal).all()
+
+
+def test_few_colors_are_kept_exactly():
+    pixels = numpy.array([[[1, 2, 3], [1, 2, 3], [9, 9, 9]]], numpy.uint8)
+    indices, colors = exact_colors(pixels, 4)
+    assert colors[indices].tolist() == pixels.tolist()
+    assert exact_colors(pixels, 1) is None
+
+
+def test_from_pixels_keeps_unique_colors():
+    pixels = numpy.array([[0, 0, 0], [5, 5, 5], [5, 5, 5], [10, 20, 30]], numpy.uint8)
+    palette = Palette.from_pixels(pixels, 16)
+    assert palette.colors[palette.map(pixels)].tolist() == pixels.tolist()
@@ -0,0 +1,64 @@
+import pytest
+
+cairo = pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+
+
+@pytest.mark.parametrize("options", [
+    {"partial_redraw": True},
+    {"cache_static": True, "partial_redraw": True}
+])
+@pytest.mark.parametrize("frame_format", ["rgba", "rgba_reuse"])
+def test_partial_redraw_draws_the_same_frames(add_scene, render_frames, options, frame_format):
+    plain = render_frames(add_scene(RenderList(width=60, height=40)), frame_format=frame_format)
+    redrawn = render_frames(add_scene(RenderList(width=60, height=40, **options)), frame_format=frame_format)
+    numpy.testing.assert_array_equal(plain, redrawn)
+
+
+def test_partial_redraw_follows_changes(add_scene, render_frames):
+    plain = add_scene(RenderList(width=60, height=40))
+    redrawn = add_scene(RenderList(width=60, height=40, partial_redraw=True))
+    render_frames(redrawn)
+
+    for render_list in (plain, redrawn):
+        render_list.shapes[0].set_prop(fill="green")
+        render_list.shapes[1].set_ease("linear")
+        render_list.circle(x=30, y=20, radius=8, fill="white")
+        render_list.circle(x=5, y=5, radius=4, fill="black", parent=render_list.shapes[1])
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(redrawn))
+
+
+def test_partial_redraw_keeps_the_context_state(add_scene, render_frames):
+    plain = add_scene(RenderList(width=60, height=40))
+    redrawn = add_scene(RenderList(width=60, height=40, partial_redraw=True))
+
+    for render_list in (plain, redrawn):
+        render_list.context.translate(6, 4)
+        render_list.context.scale(0.75, 0.75)
+        render_list.context.set_antialias(cairo.ANTIALIAS_NONE)
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(redrawn))
+
+    for render_list in (plain, redrawn):
+        render_list.context.rotate(0.3)
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(redrawn))
+
+
+def test_partial_redraw_reports_dirty_rects(add_scene):
+    render_list = add_scene(RenderList(width=60, height=40, partial_redraw=True))
+    render_list.render(0.2)
+    assert render_list.dirty_rects is None
+
+    render_list.render(0.2)
+    assert render_list.dirty_rects == []
+
+    render_list.render(0.4)
+    assert render_list.dirty_rects
+
+    render_list.context.set_antialias(cairo.ANTIALIAS_NONE)
+    render_list.render(0.4)
+    assert render_list.dirty_rects is None
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("imageio")
+
+from glc import Animation
+
+
+@pytest.fixture
+def animation(add_scene):
+    def make(pipeline, duration=1):
+        a = Animation(width=40, height=30, fps=10, duration=duration)
+        a.set_pipeline(pipeline)
+        add_scene(a.render_list)
+        return a
+
+    return make
+
+
+@pytest.mark.parametrize("frame_format", ["rgba", "rgba_reuse", "bgra"])
+def test_pipeline_renders_the_same_frames(animation, frame_format):
+    serial = [frame.copy() for frame in animation(0).iter_frames(frame_format)]
+    pipelined = [frame.copy() for frame in animation(2).iter_frames(frame_format)]
+    numpy.testing.assert_array_equal(pipelined, serial)
+
+
+def test_pipeline_raises_render_errors(animation):
+    def radius(t):
+        if t > 0.5:
+            raise RuntimeError("broken shape")
+        return 5
+
+    a = animation(2)
+    a.render_list.circle(x=10, y=10, radius=radius)
+
+    with pytest.raises(RuntimeError, match="broken shape"):
+        for _ in a.iter_frames():
+            pass
+
+
+def test_closing_early_stops_the_render_thread(animation):
+    before = threading.active_count()
+
+    frames = animation(1, duration=4).iter_frames()
+    next(frames)
+    # the thread is now waiting for room in the queue
+    assert threading.active_count() > before
+
+    frames.close()
+    assert threading.active_count() == before
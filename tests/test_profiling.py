@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+from glc.profiling import Profiler
+
+
+def test_profiling_doesnt_change_frames(add_scene):
+    plain = add_scene(RenderList(width=40, height=30)).render(0.3)
+
+    render_list = add_scene(RenderList(width=40, height=30))
+    profiler = Profiler().attach(render_list)
+    numpy.testing.assert_array_equal(render_list.render(0.3), plain)
+
+    profiler.detach()
+    assert "render" not in vars(render_list)
+
+
+def test_every_shape_gets_its_own_record(add_scene):
+    render_list = add_scene(RenderList(width=40, height=30))
+    parent = render_list.container(x=10, y=10)
+    render_list.circle(x=0, y=0, radius=3, parent=parent)
+    render_list.circles(x=numpy.arange(5) * 5.0, y=[0, 20], radius=2)
+
+    profiler = Profiler().attach(render_list)
+    render_list.render(0.2)
+    render_list.render(0.4)
+
+    shape_count = len(render_list.shapes) + 1
+    assert len(profiler.shapes) == shape_count
+    assert all(record["calls"] == 2 for record in profiler.shapes.values())
+
+    # instances read their props through evaluators
+    circles = next(record for record in profiler.shapes.values() if record["type"] == "Circles")
+    assert circles["props"] > 0
+
+    data = json.loads(profiler.to_json())
+    assert data["frame_count"] == 2
+    assert profiler.folded().startswith("frame")
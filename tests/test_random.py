@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+from glc.color import random_hsva, random_rgba
+from glc.utils import SplitMix64, mix_seed
+
+
+def test_splitmix_reference_output():
+    # the first output of SplitMix64 seeded with 0, from the reference implementation
+    assert SplitMix64(0).getrandbits(64) == 0xe220a8397b1dcdaf
+
+
+def test_splitmix_same_seed_same_sequence():
+    a, b = SplitMix64(1234), SplitMix64(1234)
+    assert [a.random() for _ in range(100)] == [b.random() for _ in range(100)]
+
+
+def test_splitmix_different_seeds_differ():
+    a, b = SplitMix64(1), SplitMix64(2)
+    assert [a.random() for _ in range(10)] != [b.random() for _ in range(10)]
+
+
+def test_splitmix_random_range():
+    rng = SplitMix64(5)
+    values = [rng.random() for _ in range(1000)]
+    assert all(0 <= value < 1 for value in values)
+    assert all(-3 <= rng.randint(-3, 3) <= 3 for _ in range(100))
+
+
+def test_splitmix_state_round_trip():
+    rng = SplitMix64(99)
+    rng.random()
+    state = rng.getstate()
+    first = [rng.random() for _ in range(5)]
+    rng.setstate(state)
+    assert [rng.random() for _ in range(5)] == first
+
+
+def test_string_seeds_are_stable():
+    # not hash(), which changes between runs
+    assert mix_seed("abc", 1, 2) == 3414991595010052290
+    assert mix_seed("abc", 1, 2) != mix_seed("abd", 1, 2)
+    assert mix_seed(0, 1) != mix_seed(0, 2)
+
+
+def shaky(seed):
+    render_list = RenderList(width=40, height=40, seed=seed)
+    render_list.rect(x=20, y=20, w=10, h=10, fill="black", shake=5)
+    render_list.splat(x=20, y=20, fill="red", variation=3)
+    return render_list
+
+
+def test_same_seed_draws_the_same(render_frames):
+    numpy.testing.assert_array_equal(render_frames(shaky(3)), render_frames(shaky(3)))
+
+
+def test_different_seeds_draw_differently(render_frames):
+    a, b = render_frames(shaky(3)), render_frames(shaky(4))
+    assert any((x != y).any() for x, y in zip(a, b))
+
+
+def test_random_is_the_same_for_a_frame():
+    render_list = shaky(3)
+    numpy.testing.assert_array_equal(render_list.render(0.3), render_list.render(0.3))
+
+
+def random_colors(render_list):
+    return [
+        tuple(random_hsva(0, 360, 0.5, 1, 0.5, 1, rng=render_list.rng)),
+        tuple(random_rgba(0, 1, 0, 1, 0, 1, 0, 1, rng=render_list.rng))
+    ]
+
+
+def test_same_seed_builds_the_same_scene():
+    assert random_colors(RenderList(seed=7)) == random_colors(RenderList(seed=7))
+    assert random_colors(RenderList(seed=7)) != random_colors(RenderList(seed=8))
+
+
+def test_changing_the_seed_starts_over():
+    render_list = RenderList(seed=1)
+    random_colors(render_list)
+    render_list.set_seed(7)
+    assert random_colors(render_list) == random_colors(RenderList(seed=7))
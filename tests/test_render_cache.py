@@ -0,0 +1,137 @@
+from io import BytesIO
+
+import pytest
+
+pytest.importorskip("cairo")
+pytest.importorskip("numpy")
+
+from glc import Animation, Gif
+from glc.fonts import FontCache
+from glc.render_cache import SceneHasher, RenderCache, DirectoryCache, scene_hash
+
+
+@pytest.fixture
+def animation(add_scene):
+    def make(fill="orange", size=lambda t: 10 + t * 5):
+        a = Animation(width=40, height=30, fps=10, duration=1)
+        add_scene(a.render_list)
+        a.render_list.circle(x=20, y=15, radius=size, fill=fill)
+        return a
+
+    return make
+
+
+def test_same_scene_same_hash(animation):
+    assert scene_hash(animation()) == scene_hash(animation())
+
+
+def test_settings_change_the_hash(animation):
+    a = animation()
+    assert scene_hash(a, converter="native") != scene_hash(a, converter="imageio")
+
+
+@pytest.mark.parametrize("change", [
+    lambda a: a.render_list.shapes[0].set_prop(fill="green"),
+    lambda a: a.render_list.shapes[1].set_ease("linear"),
+    lambda a: a.render_list.rect(x=1, y=1, w=2, h=2),
+    lambda a: a.set_fps(20),
+    lambda a: a.set_seed(5),
+    lambda a: a.set_bg_color("red")
+])
+def test_changes_change_the_hash(animation, change):
+    a = animation()
+    before = scene_hash(a)
+    change(a)
+    assert scene_hash(a) != before
+
+
+def test_edited_functions_change_the_hash(animation):
+    assert scene_hash(animation(size=lambda t: 10 + t * 5)) != scene_hash(animation(size=lambda t: 10 + t * 6))
+
+
+def test_closed_over_values_change_the_hash(animation):
+    def make(scale):
+        return animation(size=lambda t: 10 + t * scale)
+
+    assert scene_hash(make(5)) == scene_hash(make(5))
+    assert scene_hash(make(5)) != scene_hash(make(6))
+
+
+def test_paths_are_hashed_by_contents(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"first")
+    before = SceneHasher().update_path(str(path)).hexdigest()
+    plain = SceneHasher().update(str(path)).hexdigest()
+
+    path.write_bytes(b"second, and longer")
+    assert SceneHasher().update_path(str(path)).hexdigest() != before
+    # strings that aren't path props are just strings
+    assert SceneHasher().update(str(path)).hexdigest() == plain
+
+
+def text_animation(emoji_path, text, **kwargs):
+    a = Animation(width=40, height=30, fps=10, duration=1, emoji_path=emoji_path, **kwargs)
+    a.render_list.text(x=20, y=15, text=text)
+    return a
+
+
+@pytest.mark.parametrize("text", ["hi \U0001f600", lambda t: "hi \U0001f600"])
+def test_edited_emoji_change_the_hash(tmp_path, text):
+    emoji = tmp_path / "1f600.png"
+    emoji.write_bytes(b"first")
+    before = scene_hash(text_animation(str(tmp_path), text))
+
+    emoji.write_bytes(b"second, and longer")
+    assert scene_hash(text_animation(str(tmp_path), text)) != before
+
+
+def test_unused_emoji_dont_change_the_hash(tmp_path):
+    (tmp_path / "1f600.png").write_bytes(b"first")
+    before = scene_hash(text_animation(str(tmp_path), "hi \U0001f600"))
+
+    (tmp_path / "1f601.png").write_bytes(b"another")
+    assert scene_hash(text_animation(str(tmp_path), "hi \U0001f600")) == before
+
+
+def test_font_size_step_changes_the_hash(tmp_path):
+    coarse = text_animation(str(tmp_path), "hi", font_cache=FontCache(size_step=4))
+    fine = text_animation(str(tmp_path), "hi", font_cache=FontCache(size_step=0.5))
+    assert scene_hash(coarse) != scene_hash(fine)
+
+
+def test_render_cache_is_abstract():
+    with pytest.raises(TypeError):
+        RenderCache()
+
+
+def test_directory_cache_round_trip(tmp_path):
+    cache = DirectoryCache(str(tmp_path / "cache"))
+    assert cache.load("missing") is None
+
+    cache.store("key", b"data")
+    assert cache.load("key") == b"data"
+
+
+class CountingCache(DirectoryCache):
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.stored = 0
+
+    def store(self, key, data):
+        self.stored += 1
+        super().store(key, data)
+
+
+def test_saved_gifs_are_reused(tmp_path, add_scene):
+    cache = CountingCache(str(tmp_path))
+    outputs = []
+
+    for _ in range(2):
+        gif = Gif(BytesIO(), width=40, height=30, fps=5, duration=1, converter="native", render_cache=cache)
+        add_scene(gif.render_list)
+        gif.save()
+        outputs.append(gif.filename.getvalue())
+
+    assert cache.stored == 1
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("cairo")
+
+from glc import RenderList
+
+
+def test_shapes_are_compiled_when_added():
+    render_list = RenderList(width=10, height=10)
+    circle = render_list.circle(x=[0, 10])
+    assert circle._version > 0
+
+    circle.get_number("x", 0.5, 0)
+    version = circle._version
+    circle.set_ease("linear")
+    assert circle._version > version
+    assert not circle._evaluators
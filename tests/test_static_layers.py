@@ -0,0 +1,45 @@
+import pytest
+
+cairo = pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from glc import RenderList
+
+
+@pytest.mark.parametrize("frame_format", ["rgba", "rgba_reuse"])
+def test_static_layers_draw_the_same_frames(add_scene, render_frames, frame_format):
+    plain = render_frames(add_scene(RenderList(width=60, height=40)), frame_format=frame_format)
+    cached = render_frames(add_scene(RenderList(width=60, height=40, cache_static=True)), frame_format=frame_format)
+    numpy.testing.assert_array_equal(plain, cached)
+
+
+def test_static_layers_follow_changes(add_scene, render_frames):
+    plain = add_scene(RenderList(width=60, height=40))
+    cached = add_scene(RenderList(width=60, height=40, cache_static=True))
+    render_frames(cached)
+
+    for render_list in (plain, cached):
+        render_list.shapes[0].set_prop(fill="green")
+        render_list.shapes[1].set_ease("linear")
+        render_list.circle(x=30, y=20, radius=8, fill="white")
+        render_list.circle(x=5, y=5, radius=4, fill="black", parent=render_list.shapes[1])
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(cached))
+
+
+def test_static_layers_keep_the_context_state(add_scene, render_frames):
+    plain = add_scene(RenderList(width=60, height=40))
+    cached = add_scene(RenderList(width=60, height=40, cache_static=True))
+
+    for render_list in (plain, cached):
+        render_list.context.translate(6, 4)
+        render_list.context.scale(0.75, 0.75)
+        render_list.context.set_antialias(cairo.ANTIALIAS_NONE)
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(cached))
+
+    for render_list in (plain, cached):
+        render_list.context.set_antialias(cairo.ANTIALIAS_DEFAULT)
+        render_list.context.rotate(0.3)
+
+    numpy.testing.assert_array_equal(render_frames(plain), render_frames(cached))
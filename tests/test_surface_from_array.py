@@ -0,0 +1,64 @@
+import struct
+import zlib
+
+import pytest
+
+cairo = pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+
+from io import BytesIO
+from glc.utils import surface_from_array
+
+
+# png color types by channel count
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+
+def encode_png(array):
+    """Writes a (height, width, channels) uint8 or uint16 array as a PNG."""
+    height, width, channels = array.shape
+    depth = array.dtype.itemsize * 8
+    rows = array.astype(">u{}".format(array.dtype.itemsize)).reshape(height, -1)
+    raw = b"".join(b"\x00" + row.tobytes() for row in rows)
+
+    def chunk(tag, data):
+        body = tag + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", width, height, depth, COLOR_TYPES[channels], 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def pixels(surface):
+    surface.flush()
+    data = numpy.frombuffer(surface.get_data(), numpy.uint8).reshape(surface.get_height(), surface.get_stride())
+    return data[:, :surface.get_width() * 4]
+
+
+def make_image(channels, dtype):
+    rng = numpy.random.default_rng(channels)
+    top = numpy.iinfo(dtype).max
+    image = rng.integers(0, top + 1, (7, 9, channels), dtype=dtype)
+    if channels in (2, 4):
+        # fully transparent, fully opaque and everything in between
+        image[0, :, -1] = 0
+        image[1, :, -1] = top
+    return image
+
+
+@pytest.mark.parametrize("dtype", [numpy.uint8, numpy.uint16])
+@pytest.mark.parametrize("channels", [1, 2, 3, 4])
+def test_matches_cairo_png_loader(channels, dtype):
+    image = make_image(channels, dtype)
+    expected = pixels(cairo.ImageSurface.create_from_png(BytesIO(encode_png(image))))
+    numpy.testing.assert_array_equal(pixels(surface_from_array(image)), expected)
+
+
+def test_two_dimensional_arrays_are_gray():
+    image = make_image(1, numpy.uint8)
+    numpy.testing.assert_array_equal(pixels(surface_from_array(image[:, :, 0])), pixels(surface_from_array(image)))
+
+
+def test_float_arrays_go_from_zero_to_one():
+    image = make_image(4, numpy.uint8)
+    numpy.testing.assert_array_equal(pixels(surface_from_array(image / 255)), pixels(surface_from_array(image)))
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("cairo")
+pytest.importorskip("numpy")
+
+from glc import Animation
+from glc.easing import EASING_FUNCTIONS
+
+
+def make(ease, loop):
+    a = Animation(width=40, height=30, fps=10, duration=1.3)
+    circle = a.render_list.circle(x=[0, 40], y=[5, 30, 10], radius=[2, 4, 8, 3], phase=0.2, speed_mult=1.5)
+    child = a.render_list.circle(x=[0, 5], y=0, radius=1, parent=circle)
+
+    values = []
+    for shape in (circle, child):
+        shape.set_ease(ease)
+        shape.set_loop(loop)
+        shape.draw = record(shape, values)
+
+    return a, values
+
+
+def record(shape, values):
+    def draw(context, t):
+        values.extend(shape.get_number(prop, t, 0) for prop in ("x", "y", "radius"))
+    return draw
+
+
+@pytest.mark.parametrize("ease", sorted(EASING_FUNCTIONS))
+@pytest.mark.parametrize("loop", [False, True])
+def test_prepared_timeline_matches_direct_evaluation(ease, loop):
+    prepared, prepared_values = make(ease, loop)
+    direct, direct_values = make(ease, loop)
+
+    times = prepared.frame_times()
+    prepared.render_list.prepare_timeline(times)
+
+    for t in times:
+        prepared.render_list.render(t)
+        direct.render_list.render(t)
+
+    # rendering looked the values up instead of dropping the timeline
+    assert prepared.render_list.shapes[0]._timeline is not None
+    assert prepared_values == pytest.approx(direct_values)
@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip("cairo")
+
+from glc import RenderList
+from glc.color import Color
+from glc.easing import EASING_FUNCTIONS
+from glc import value_parser as vp
+
+
+TIMES = [0, 0.1, 0.25, 0.5, 0.75, 0.9, 1]
+
+CASES = [
+    (vp.get_number, vp.compile_number, 5),
+    (vp.get_number, vp.compile_number, 2.5),
+    (vp.get_number, vp.compile_number, "12"),
+    (vp.get_number, vp.compile_number, "1.5"),
+    (vp.get_number, vp.compile_number, [0, 10]),
+    (vp.get_number, vp.compile_number, (3, -4, 8)),
+    (vp.get_number, vp.compile_number, [0, 10, -5, 2]),
+    (vp.get_number, vp.compile_number, [1, 2, 3, 4, 5, 6]),
+    (vp.get_number, vp.compile_number, lambda t: t * t),
+    (vp.get_string, vp.compile_string, "hello"),
+    (vp.get_string, vp.compile_string, ["a", "b", "c"]),
+    (vp.get_string, vp.compile_string, lambda t: str(t)),
+    (vp.get_bool, vp.compile_bool, True),
+    (vp.get_bool, vp.compile_bool, "yes"),
+    (vp.get_bool, vp.compile_bool, [True, False, True]),
+    (vp.get_bool, vp.compile_bool, lambda t: t > 0.5),
+    (vp.get_array, vp.compile_array, [4, 2]),
+    (vp.get_array, vp.compile_array, [[0, 4], [10, 2]]),
+    (vp.get_array, vp.compile_array, lambda t: [t, 1]),
+    (vp.get_point_array, vp.compile_point_array, [[0, 0], [10, 10], [5, 0]]),
+    (vp.get_point_array, vp.compile_point_array, [[[0, 0], [5, 5]], [[10, 0], [0, 10]]]),
+    (vp.get_color, vp.compile_color, "red"),
+    (vp.get_color, vp.compile_color, "#336699"),
+    (vp.get_color, vp.compile_color, 0x00ff00),
+    (vp.get_color, vp.compile_color, Color("blue")),
+    (vp.get_color, vp.compile_color, ["red", "blue"]),
+    (vp.get_color, vp.compile_color, ["red", "lime", "blue", "white"]),
+    (vp.get_color, vp.compile_color, ["orange"]),
+    (vp.get_color, vp.compile_color, False),
+    (vp.get_color, vp.compile_color, lambda t: Color(t, 0, 1 - t)),
+]
+
+
+def plain(value):
+    # colors compare by their channels
+    if isinstance(value, Color):
+        return pytest.approx(tuple(value[:]))
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    if isinstance(value, float):
+        return pytest.approx(value)
+    return value
+
+
+@pytest.mark.parametrize("getter, compiler, prop", CASES)
+def test_compiled_matches_legacy(getter, compiler, prop):
+    evaluator = compiler(prop)
+    for t in TIMES:
+        expected = getter(prop, t, None)
+        actual = evaluator(t)
+        if isinstance(actual, Color):
+            actual = tuple(actual[:])
+        assert plain(expected) == actual
+
+
+@pytest.mark.parametrize("ease", sorted(EASING_FUNCTIONS) + [lambda t: t ** 3])
+@pytest.mark.parametrize("loop", [False, True])
+def test_eased_shape_props_match_legacy(ease, loop):
+    render_list = RenderList(width=10, height=10)
+    props = {"x": [0, 10], "y": [5, -5, 20], "fill": ["red", "blue"]}
+    circle = render_list.circle(**props)
+    circle.set_ease(ease)
+    circle.set_loop(loop)
+
+    for t in TIMES:
+        eased = circle.interpolate(t)
+        assert circle.get_number("x", eased, 0) == pytest.approx(vp.get_number(props["x"], eased, 0))
+        assert circle.get_number("y", eased, 0) == pytest.approx(vp.get_number(props["y"], eased, 0))
+        fill = circle.get_color("fill", eased, None)
+        assert tuple(fill[:]) == pytest.approx(tuple(vp.get_color(props["fill"], eased, None)[:]))
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("cairo")
+numpy = pytest.importorskip("numpy")
+pytest.importorskip("imageio")
+
+from glc import Animation, animation as animation_module
+
+
+@pytest.fixture
+def animation(add_scene):
+    def make(workers):
+        a = Animation(width=40, height=30, fps=10, duration=1)
+        a.set_workers(workers)
+        add_scene(a.render_list)
+        return a
+
+    return make
+
+
+@pytest.mark.skipif(not animation_module._can_fork(), reason="workers are only forked on Linux")
+@pytest.mark.parametrize("frame_format", ["rgba", "bgra"])
+def test_workers_render_the_same_frames_in_order(animation, frame_format):
+    serial = [frame.copy() for frame in animation(1).iter_frames(frame_format)]
+    parallel = [frame.copy() for frame in animation(2).iter_frames(frame_format)]
+
+    assert len(parallel) == len(serial)
+    for a, b in zip(serial, parallel):
+        assert a.tobytes() == b.tobytes()
+
+
+def test_workers_fall_back_to_serial_without_fork(animation, monkeypatch):
+    def parallel(*args):
+        raise AssertionError("forked without fork")
+
+    expected = [frame.copy() for frame in animation(1).iter_frames("rgba")]
+
+    monkeypatch.setattr(animation_module, "_can_fork", lambda: False)
+    monkeypatch.setattr(Animation, "_iter_frames_parallel", parallel)
+    frames = [frame.copy() for frame in animation(2).iter_frames("rgba")]
+
+    numpy.testing.assert_array_equal(frames, expected)